@@ -0,0 +1,62 @@
+"""
+Compares the lookup-table base256 conversions with the former implementation based on `CHARSET.index()`.
+
+Usage: python3 benchmarks/base256.py [-n NUMBER]
+"""
+
+import argparse
+import os
+import timeit
+
+from feistel import (
+    CHARSET,
+    readable2bytearray,
+    readables2bytearrays,
+    to_base256_readable,
+    to_base256_readables,
+)
+
+
+def legacy_to_base256_readable(item: bytearray) -> str:
+    return "".join(map(lambda index: CHARSET[index], item))
+
+
+def legacy_readable2bytearray(readable: str) -> bytearray:
+    return bytearray(list(map(CHARSET.index, readable)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    for length in [8, 64, 512, 4096]:
+        item = bytearray(os.urandom(length))
+        readable = to_base256_readable(item)
+        assert legacy_to_base256_readable(item) == readable
+        assert legacy_readable2bytearray(readable) == readable2bytearray(readable)
+        for name, legacy, current, value in [
+            ("encode", legacy_to_base256_readable, to_base256_readable, item),
+            ("decode", legacy_readable2bytearray, readable2bytearray, readable),
+        ]:
+            before = timeit.timeit(lambda: legacy(value), number=args.number)
+            after = timeit.timeit(lambda: current(value), number=args.number)
+            print(
+                f"{name} length={length:<5} "
+                f"legacy={before / args.number * 1e6:9.2f}us "
+                f"table={after / args.number * 1e6:9.2f}us "
+                f"speedup={before / after:6.1f}x"
+            )
+
+    items = [bytearray(os.urandom(16)) for _ in range(args.number)]
+    readables = to_base256_readables(items)
+    for name, fn, values in [
+        ("bulk encode", to_base256_readables, items),
+        ("bulk decode", readables2bytearrays, readables),
+    ]:
+        elapsed = timeit.timeit(lambda: fn(values), number=10) / 10
+        print(f"{name} {len(values)} values of 16 bytes: {elapsed * 1e3:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
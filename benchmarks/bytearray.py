@@ -0,0 +1,82 @@
+"""
+Compares the integer-based byte arithmetic (`add_bytes()`, `xor_bytes()`) with the former list-based implementation,
+per call and per round of the FPE cipher.
+
+Usage: python3 benchmarks/bytearray.py [-n NUMBER]
+"""
+
+import argparse
+import os
+import timeit
+
+from feistel import (
+    add_bytes,
+    extract,
+    FPECipher,
+    SHA_256,
+    string2bytearray,
+    xor_bytes,
+)
+
+KEY = "8ed9dcc1701c064f0fd7ae235f15143f989920e0ee9658bb7882c8d7d5f05692"
+
+
+def legacy_add_bytes(b1: bytearray, b2: bytearray) -> bytearray:
+    arr = list[list[int]]()
+    for p1, p2 in zip([x for x in b1], [x for x in b2]):
+        value = (p1 + p2) % 256
+        arr.append(
+            [value]
+            if value < 128
+            else [194, value] if value < 192 else [195, value - 64]
+        )
+    return bytearray([item for sublist in arr for item in sublist])
+
+
+def legacy_xor_bytes(b1: bytearray, b2: bytearray) -> bytearray:
+    return bytearray([p1 ^ p2 for p1, p2 in zip([x for x in b1], [x for x in b2])])
+
+
+class LegacyFPECipher(FPECipher):
+    # Round function using the former addition
+    def _round_bytes(self, item: bytearray, idx: int) -> bytearray:
+        addition = legacy_add_bytes(item, self._schedule.bytes(len(item))[idx])
+        hashed = self._hash(addition)
+        extracted = extract(hashed.hex(), idx, len(item))
+        return string2bytearray(extracted)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    legacy = LegacyFPECipher(SHA_256, KEY * 8, 10)
+    current = FPECipher(SHA_256, KEY * 8, 10)
+    for length in [4, 16, 64, 256]:
+        b1, b2 = bytearray(os.urandom(length)), bytearray(os.urandom(length))
+        item = memoryview(bytearray(os.urandom(length)))
+        assert add_bytes(b1, b2) == legacy_add_bytes(b1, b2)
+        assert xor_bytes(b1, b2) == legacy_xor_bytes(b1, b2)
+        assert current._round_bytes(item, 3) == legacy._round_bytes(item, 3)
+        for name, before, after in [
+            ("add_bytes", lambda: legacy_add_bytes(b1, b2), lambda: add_bytes(b1, b2)),
+            ("xor_bytes", lambda: legacy_xor_bytes(b1, b2), lambda: xor_bytes(b1, b2)),
+            (
+                "round",
+                lambda: legacy._round_bytes(item, 3),
+                lambda: current._round_bytes(item, 3),
+            ),
+        ]:
+            legacy_time = min(timeit.repeat(before, number=args.number, repeat=3))
+            current_time = min(timeit.repeat(after, number=args.number, repeat=3))
+            print(
+                f"{name:<10} length={length:<4} "
+                f"legacy={legacy_time / args.number * 1e9:8.0f}ns "
+                f"current={current_time / args.number * 1e9:8.0f}ns "
+                f"speedup={legacy_time / current_time:5.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Compares the obfuscation of a pandas column with `Series.map`, one call per cell, with the deduplicated
+`encrypt_column()` for several ratios of distinct values.
+
+Usage: python3 benchmarks/frame.py [-n NUMBER] [-r ROUNDS]
+"""
+
+import argparse
+import random
+import timeit
+
+import pandas as pd
+
+from feistel import FPECipher, SHA_256
+from feistel.frame import encrypt_column
+
+KEY = "8ed9dcc1701c064f0fd7ae235f15143f989920e0ee9658bb7882c8d7d5f05692"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=100000)
+    parser.add_argument("-r", "--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    cipher = FPECipher(SHA_256, KEY, args.rounds)
+    rng = random.Random(0)
+    for ratio in [1.0, 0.1, 0.01]:
+        distinct = [
+            f"user-{rng.getrandbits(32):010d}"
+            for _ in range(max(1, int(args.number * ratio)))
+        ]
+        strings = pd.Series(rng.choices(distinct, k=args.number))
+        numbers = pd.Series(
+            rng.choices([rng.getrandbits(40) for _ in distinct], k=args.number)
+        )
+        assert (
+            encrypt_column(cipher, strings).tolist()
+            == strings.map(cipher.encrypt).tolist()
+        )
+        results = {
+            "map": timeit.timeit(lambda: strings.map(cipher.encrypt), number=1),
+            "column": timeit.timeit(lambda: encrypt_column(cipher, strings), number=1),
+            "map_numbers": timeit.timeit(
+                lambda: numbers.map(cipher.encrypt_number), number=1
+            ),
+            "column_numbers": timeit.timeit(
+                lambda: encrypt_column(cipher, numbers, True), number=1
+            ),
+        }
+        print(
+            f"{ratio:>5.0%} distinct "
+            + " ".join(
+                f"{name}={elapsed / args.number * 1e9:8.0f}ns"
+                for name, elapsed in results.items()
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Compares, for each engine, the cost of hashing a round-sized message with the resolved hasher, the `H()` function
+with the former dispatch on the engine name, and the raw digest of the underlying library.
+
+Usage: python3 benchmarks/hash.py [-n NUMBER] [-s SIZE]
+"""
+
+import argparse
+import hashlib
+import timeit
+
+from Crypto.Hash import keccak
+
+from feistel import BLAKE2B, hasher, KECCAK, SHA_256, SHA_3
+
+
+def legacy_H(msg: bytearray, using: str) -> bytes:
+    if using == BLAKE2B:
+        b2b = hashlib.blake2b(digest_size=32)
+        b2b.update(msg)
+        return b2b.digest()
+    elif using == KECCAK:
+        k = keccak.new(digest_bits=256)
+        k.update(msg)
+        return k.digest()
+    elif using == SHA_256:
+        h = hashlib.sha256()
+        h.update(msg)
+        return h.digest()
+    elif using == SHA_3:
+        s3 = hashlib.sha3_256()
+        s3.update(msg)
+        return s3.digest()
+    else:
+        raise Exception("unknown hash algorithm")
+
+
+RAW = {
+    BLAKE2B: lambda msg: hashlib.blake2b(msg, digest_size=32).digest(),
+    KECCAK: lambda msg: keccak.new(digest_bits=256, data=msg).digest(),
+    SHA_256: lambda msg: hashlib.sha256(msg).digest(),
+    SHA_3: lambda msg: hashlib.sha3_256(msg).digest(),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=100000)
+    parser.add_argument("-s", "--size", type=int, default=16)
+    args = parser.parse_args()
+
+    msg = bytearray(b"x" * args.size)
+    for engine in [BLAKE2B, KECCAK, SHA_256, SHA_3]:
+        fn = hasher(engine)
+        assert fn(msg) == legacy_H(msg, engine) == RAW[engine](msg)
+        results = {
+            "raw": timeit.timeit(lambda: RAW[engine](msg), number=args.number),
+            "legacy": timeit.timeit(lambda: legacy_H(msg, engine), number=args.number),
+            "hasher": timeit.timeit(lambda: fn(msg), number=args.number),
+        }
+        print(
+            f"{engine:<13}"
+            + " ".join(
+                f"{name}={elapsed / args.number * 1e9:8.0f}ns"
+                for name, elapsed in results.items()
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Measures the cold start of the library and of the command line in fresh interpreters, ie. the time of
+`import feistel` and `python3 -m feistel --help` above a bare interpreter, and lists the slowest imported modules.
+With `--max-ms`, exits with a non-zero code when importing the library takes longer.
+
+Usage: python3 benchmarks/import_time.py [-n NUMBER] [--top TOP] [--max-ms MAX_MS]
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+COMMANDS = {
+    "python": ["-c", "pass"],
+    "import feistel": ["-c", "import feistel"],
+    "feistel-py --help": ["-m", "feistel", "--help"],
+}
+
+
+def measure(args: list[str], number: int) -> float:
+    elapsed = []
+    for _ in range(number):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], check=True, capture_output=True)
+        elapsed.append(time.perf_counter() - start)
+    return min(elapsed)
+
+
+def slowest_modules(top: int) -> list[tuple[int, str]]:
+    found = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import feistel"],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    modules = []
+    for line in found.stderr.splitlines()[1:]:
+        _, _, cumulative, name = [
+            part.strip() for part in line.replace(":", "|", 1).split("|")
+        ]
+        modules.append((int(cumulative), name))
+    return sorted(modules, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=10)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--max-ms", type=float)
+    args = parser.parse_args()
+
+    results = {
+        name: measure(command, args.number) for name, command in COMMANDS.items()
+    }
+    for name, elapsed in results.items():
+        print(f"{name:<20} {elapsed * 1e3:8.1f}ms")
+    overhead = (results["import feistel"] - results["python"]) * 1e3
+    print(f"{'import overhead':<20} {overhead:8.1f}ms\n")
+    for cumulative, name in slowest_modules(args.top):
+        print(f"{cumulative / 1e3:8.1f}ms {name}")
+
+    if args.max_ms is not None and overhead > args.max_ms:
+        print(f"import overhead above {args.max_ms}ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Compares the per-number cost of the FPE cipher going through bytes, as before the integer engine,
+with the integer engine for numbers of each width.
+
+Usage: python3 benchmarks/integers.py [-n NUMBER] [-r ROUNDS]
+"""
+
+import argparse
+from array import array
+import math
+import random
+import timeit
+
+from feistel import FPECipher, readable2bytearray, SHA_256
+
+KEY = "8ed9dcc1701c064f0fd7ae235f15143f989920e0ee9658bb7882c8d7d5f05692"
+
+
+def legacy_encrypt_number(cipher: FPECipher, n: int) -> int:
+    if n < 128:
+        if n == 0:
+            return 0
+        string = n.to_bytes(2, "big").decode()
+        return int.from_bytes(readable2bytearray(cipher.encrypt(string)), "big")
+    size = math.ceil(math.log2(n) / 8)
+    bits = 8 if size > 4 else 4 if size > 2 else size
+    return int.from_bytes(
+        cipher.encrypt_bytes(bytearray(n.to_bytes(bits, "big"))), "big"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=10000)
+    parser.add_argument("-r", "--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    cipher = FPECipher(SHA_256, KEY, args.rounds)
+    rng = random.Random(0)
+    for bits in [7, 8, 16, 32, 64]:
+        numbers = [
+            rng.randrange(1 << (bits - 1), 1 << bits) for _ in range(args.number)
+        ]
+        numbers = [n for n in numbers if n not in [256, 1 << 16, 1 << 32]]
+        expected = [legacy_encrypt_number(cipher, n) for n in numbers]
+        assert cipher.encrypt_numbers(numbers) == expected
+        results = {
+            "legacy": timeit.timeit(
+                lambda: [legacy_encrypt_number(cipher, n) for n in numbers], number=1
+            ),
+            "engine": timeit.timeit(lambda: cipher.encrypt_numbers(numbers), number=1),
+            "array": timeit.timeit(
+                lambda: cipher.encrypt_numbers(array("Q", numbers)), number=1
+            ),
+        }
+        print(
+            f"{bits:>2} bits "
+            + " ".join(
+                f"{name}={elapsed / len(numbers) * 1e9:8.0f}ns"
+                for name, elapsed in results.items()
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Compares the per-value cost of the FPE cipher with and without the precomputed key schedule.
+
+Usage: python3 benchmarks/key_schedule.py [-n NUMBER]
+"""
+
+import argparse
+import timeit
+
+from feistel import (
+    add_bytes,
+    extract,
+    FPECipher,
+    H,
+    SHA_256,
+    string2bytearray,
+)
+
+KEY = "8ed9dcc1701c064f0fd7ae235f15143f989920e0ee9658bb7882c8d7d5f05692"
+
+
+class LegacyFPECipher(FPECipher):
+    # Round function deriving the round key on every call, as before the key schedule
+    def _round_bytes(self, item: bytearray, idx: int) -> bytearray:
+        addition = add_bytes(item, string2bytearray(extract(self.key, idx, len(item))))
+        hashed = H(addition, self.engine)
+        extracted = extract(hashed.hex(), idx, len(item))
+        return string2bytearray(extracted)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    for rounds in [10, 128]:
+        for length in [8, 64, 512]:
+            data = "x" * length
+            legacy = LegacyFPECipher(SHA_256, KEY * 4, rounds)
+            current = FPECipher(SHA_256, KEY * 4, rounds)
+            assert legacy.encrypt(data) == current.encrypt(data)
+            before = timeit.timeit(lambda: legacy.encrypt(data), number=args.number)
+            after = timeit.timeit(lambda: current.encrypt(data), number=args.number)
+            print(
+                f"rounds={rounds:<4} length={length:<4} "
+                f"legacy={before / args.number * 1e6:9.1f}us/value "
+                f"schedule={after / args.number * 1e6:9.1f}us/value "
+                f"saving={(before - after) / args.number * 1e6:8.1f}us/value"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Compares the number of round function evaluations and the time of the FPE cipher value by value with the batch methods,
+which evaluate each distinct half-block only once per round, on log-style datasets.
+
+Usage: python3 benchmarks/prefix.py [-n NUMBER] [-r ROUNDS]
+"""
+
+import argparse
+import random
+import timeit
+
+from feistel import FPECipher, SHA_256
+
+KEY = "8ed9dcc1701c064f0fd7ae235f15143f989920e0ee9658bb7882c8d7d5f05692"
+
+
+class CountingFPECipher(FPECipher):
+    calls = 0
+
+    def _round_bytes(self, item, idx):
+        CountingFPECipher.calls += 1
+        return super()._round_bytes(item, idx)
+
+
+def datasets(rng: random.Random, number: int) -> dict[str, list[str]]:
+    paths = [f"/api/v2/customers/{rng.randrange(10000):05d}/orders" for _ in range(200)]
+    users = [f"{rng.getrandbits(24):06x}" for _ in range(number)]
+    return {
+        # Requests of a web server log, some pages being much more visited than others
+        "urls": [
+            "https://www.example.com" + path
+            for path in rng.choices(paths, weights=range(200, 0, -1), k=number)
+        ],
+        # Emails of a single domain, the local parts being of the same length
+        "emails": [f"{user}@mail.example.com" for user in users],
+        # Distinct values without anything in common
+        "random": [f"{rng.getrandbits(128):032x}" for _ in range(number)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=10000)
+    parser.add_argument("-r", "--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    cipher = CountingFPECipher(SHA_256, KEY, args.rounds)
+    for name, values in datasets(random.Random(0), args.number).items():
+        expected = [cipher.encrypt(value) for value in values]
+        assert cipher.encrypt_many(values) == expected
+        assert cipher.decrypt_many(expected) == [cipher.decrypt(e) for e in expected]
+
+        results = {}
+        for mode, fn in [
+            ("scalar", lambda: [cipher.encrypt(value) for value in values]),
+            ("batch", lambda: cipher.encrypt_many(values)),
+        ]:
+            CountingFPECipher.calls = 0
+            elapsed = timeit.timeit(fn, number=1)
+            results[mode] = (CountingFPECipher.calls, elapsed)
+        print(
+            f"{name:<8}"
+            + " ".join(
+                f"{mode}={calls:>7} rounds {elapsed / len(values) * 1e9:8.0f}ns"
+                for mode, (calls, elapsed) in results.items()
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
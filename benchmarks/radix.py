@@ -0,0 +1,55 @@
+"""
+Measures the per-string cost of the radix cipher and the average number of Feistel permutations
+needed by cycle-walking for each alphabet and length, ie. each domain size.
+
+Usage: python3 benchmarks/radix.py [-n NUMBER] [-r ROUNDS]
+"""
+
+import argparse
+import random
+import timeit
+
+from feistel import ALPHANUMERIC, DIGITS, HEX, RadixCipher, SHA_256
+
+KEY = "8ed9dcc1701c064f0fd7ae235f15143f989920e0ee9658bb7882c8d7d5f05692"
+
+
+class CountingRadixCipher(RadixCipher):
+    permutations = 0
+
+    def _permute(self, value, domain):
+        self.permutations += 1
+        return super()._permute(value, domain)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--number", type=int, default=2000)
+    parser.add_argument("-r", "--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for name, alphabet in [("digits", DIGITS), ("hex", HEX), ("alnum", ALPHANUMERIC)]:
+        cipher = CountingRadixCipher(SHA_256, KEY, args.rounds, alphabet)
+        for length in [4, 9, 16, 32]:
+            data = [
+                "".join(rng.choice(alphabet) for _ in range(length))
+                for _ in range(args.number)
+            ]
+            cipher.permutations = 0
+            obfuscated = cipher.encrypt_many(data)
+            walks = cipher.permutations / len(data)
+            assert cipher.decrypt_many(obfuscated) == data
+            elapsed = min(
+                timeit.repeat(lambda: cipher.encrypt_many(data), number=1, repeat=3)
+            )
+            domain = cipher._domain(length)
+            print(
+                f"{name:>6} x{length:<3} domain=2^{(domain.size - 1).bit_length():<4} "
+                f"fill={domain.size / (1 << (domain.left + domain.right)):5.3f} "
+                f"permutations={walks:5.3f} {elapsed / len(data) * 1e6:8.1f}us"
+            )
+
+
+if __name__ == "__main__":
+    main()
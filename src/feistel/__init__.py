@@ -6,3 +6,29 @@ from .utils import *
 from .cipher import *
 from .custom import *
 from .fpe import *
+from .parallel import *
+from .radix import *
+from .factory import *
+
+# Optional modules, only imported on first access, eg. `feistel.aio.AsyncCipher`
+_LAZY_MODULES = [
+    "aio",
+    "bench",
+    "cache",
+    "client",
+    "fixed",
+    "frame",
+    "jobs",
+    "profiling",
+    "server",
+    "stream",
+    "vectorized",
+]
+
+
+def __getattr__(name: str):
+    if name in _LAZY_MODULES:
+        import importlib
+
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,5 +1,5 @@
 import argparse
-import ast
+import sys
 
 
 from feistel import (
@@ -11,16 +11,31 @@ from feistel import (
     SHA_256,
 )
 
+# NB: The modules of the other commands and formats are imported when used, to keep the startup time low
+
 
 CUSTOM = "custom"
 FEISTEL = "feistel"
 FPE = "fpe"
 
+JOB = "job"
+LOAD = "load"
+SERVE = "serve"
+
+DEFAULT_BUFFER_SIZE = 1 << 20
 
-def main(args):
-    if not args.input or not args.operation:
+
+def main(args=None):
+    if args is None:
+        if sys.argv[1:2] == [SERVE]:
+            return serve(parse_serve_args(sys.argv[2:]))
+        if sys.argv[1:2] == [LOAD]:
+            return load(parse_load_args(sys.argv[2:]))
+        if sys.argv[1:2] == [JOB]:
+            return job(parse_job_args(sys.argv[2:]))
+        args = parse_args()
+    if (not args.input and not args.file) or not args.operation:
         raise Exception("Missing mandatory parameters")
-    data = str(args.input)
     operation = str(args.operation)
     if operation != "cipher" and operation != "decipher":
         raise Exception("Invalid operation")
@@ -30,21 +45,55 @@ def main(args):
         if args.cipher and args.cipher in [FEISTEL, CUSTOM, FPE]
         else FEISTEL
     )
+    cipher = build_cipher(args, cipher_type)
+    if not args.profile:
+        return process(args, cipher, cipher_type, operation)
+
+    from feistel.profiling import format_stats, Profiler
+
+    # An instrumented cipher stays in the current process
+    args.workers = None
+    profiler = Profiler()
+    try:
+        process(args, profiler.instrument(cipher), cipher_type, operation)
+    finally:
+        print(format_stats(profiler.stats()), file=sys.stderr)
+
+
+def process(args, cipher, cipher_type: str, operation: str):
+    if args.file:
+        stream(args, cipher, operation == "decipher")
+        return
+
+    data = str(args.input)
+    if (
+        cipher_type != FPE
+        and operation == "decipher"
+        and data.startswith("b'")
+        and data.endswith("'")
+    ):
+        import ast
+
+        data = ast.literal_eval(args.input)
+
+    if operation == "cipher":
+        print(cipher.encrypt(data))
+    else:
+        print(cipher.decrypt(data))
+
+
+def build_cipher(args, cipher_type: str):
     if cipher_type == FEISTEL:
-        if operation == "decipher" and data.startswith("b'") and data.endswith("'"):
-            data = ast.literal_eval(args.input)
         key = str(args.key)
         if not key:
             raise Exception("missing mandatory key")
         rounds = int(args.rounds) if args.rounds else 10
-        cipher = Cipher(key, rounds)
+        return Cipher(key, rounds)
     elif cipher_type == CUSTOM:
-        if operation == "decipher" and data.startswith("b'") and data.endswith("'"):
-            data = ast.literal_eval(args.input)
         keys = str(args.key).split(",")
         if len(keys) == 0:
             raise Exception("missing mandatory keys")
-        cipher = CustomCipher(keys)
+        return CustomCipher(keys)
     else:
         key = str(args.key)
         if not key:
@@ -54,17 +103,145 @@ def main(args):
         else:
             engine = Engine(args.engine)
         rounds = int(args.rounds) if args.rounds else 10
-        cipher = FPECipher(engine, key, rounds)
+        return FPECipher(engine, key, rounds)
 
-    if operation == "cipher":
-        print(cipher.encrypt(data))
-    else:
-        print(cipher.decrypt(data))
 
+def stream(args, cipher, decrypt: bool):
+    from feistel.fixed import FIXED
+    from feistel.stream import (
+        ColumnObfuscator,
+        CSV,
+        JSONL,
+        obfuscate_csv,
+        obfuscate_jsonl,
+    )
 
-if __name__ == "__main__":
+    data_format = args.format or (JSONL if args.file.endswith(".jsonl") else CSV)
+    if data_format == FIXED:
+        return obfuscate_file(args, cipher, decrypt)
+    if data_format not in [CSV, JSONL]:
+        raise Exception("Invalid format")
+    columns = _names(args.columns)
+    numbers = _names(args.numbers)
+    buffer_size = int(args.buffer_size) if args.buffer_size else DEFAULT_BUFFER_SIZE
+    workers = int(args.workers) if args.workers else None
+
+    source = _open(args.file, sys.stdin, "r", buffer_size)
+    sink = _open(args.output or "-", sys.stdout, "w", buffer_size)
+    try:
+        with ColumnObfuscator(cipher, columns, numbers, decrypt, workers) as obfuscator:
+            if data_format == CSV:
+                obfuscate_csv(obfuscator, source, sink)
+            else:
+                obfuscate_jsonl(obfuscator, source, sink)
+    finally:
+        sink.close()
+        source.close()
+
+
+def obfuscate_file(args, cipher, decrypt: bool):
+    from feistel.fixed import obfuscate_fixed, parse_fields
+
+    if not isinstance(cipher, FPECipher):
+        raise Exception("fixed-width files are only supported by the FPE cipher")
+    if args.file == "-" or not args.record_length or not args.fields:
+        raise Exception("Missing mandatory parameters")
+    if not args.output and not args.in_place:
+        raise Exception("Missing output file")
+    workers = int(args.workers) if args.workers else None
+    obfuscate_fixed(
+        cipher,
+        args.file,
+        int(args.record_length),
+        parse_fields(args.fields),
+        args.output,
+        decrypt,
+        workers,
+    )
+
+
+def serve(args):
+    import asyncio
+
+    from feistel.server import load_profiles, Server
+
+    if not args.config or not args.listen:
+        raise Exception("Missing mandatory parameters")
+    workers = int(args.workers) if args.workers is not None else None
+    server = Server(load_profiles(args.config), workers)
+    try:
+        asyncio.run(server.serve_forever(args.listen))
+    except KeyboardInterrupt:
+        pass
+
+
+def load(args):
+    import json
+
+    from feistel.client import load as generate_load
+
+    if not args.connect or not args.profile:
+        raise Exception("Missing mandatory parameters")
+    report = generate_load(
+        args.connect,
+        args.profile,
+        args.operation,
+        batch_size=args.batch_size,
+        pipeline=args.pipeline,
+        connections=args.connections,
+        duration=args.duration,
+    )
+    print(json.dumps(report, indent=2))
+
+
+def job(args):
+    from feistel.jobs import BulkJob, format_metrics, list_partitions
+
+    if (
+        not args.input
+        or not args.output
+        or not args.key
+        or not args.columns + args.numbers
+    ):
+        raise Exception("Missing mandatory parameters")
+    operation = str(args.operation)
+    if operation != "cipher" and operation != "decipher":
+        raise Exception("Invalid operation")
+    cipher_type = args.cipher if args.cipher in [FEISTEL, CUSTOM, FPE] else FEISTEL
+    old_cipher = None
+    if args.old_key:
+        if operation == "decipher":
+            raise Exception("re-keying only applies to the cipher operation")
+        old = argparse.Namespace(
+            key=args.old_key,
+            engine=args.old_engine or args.engine,
+            rounds=args.old_rounds or args.rounds,
+        )
+        old_cipher = build_cipher(old, cipher_type)
+    partitions = list_partitions(args.input)
+    if not partitions:
+        raise Exception("no partition to process")
+    bulk_job = BulkJob(
+        partitions,
+        args.output,
+        build_cipher(args, cipher_type),
+        _names(args.columns),
+        _names(args.numbers),
+        old_cipher=old_cipher,
+        decrypt=operation == "decipher",
+        checkpoints=args.checkpoints,
+        workers=int(args.workers) if args.workers else None,
+        progress=lambda metrics: print(format_metrics(metrics), file=sys.stderr),
+        interval=args.interval,
+    )
+    bulk_job.run()
+
+
+def parse_args(argv: list[str] | None = None):
     parser = argparse.ArgumentParser()
-    parser.add_argument("input", help="The string to obfuscate (watch for quotes)")
+    parser.add_argument(
+        "input", nargs="?", help="The string to obfuscate (watch for quotes)"
+    )
     parser.add_argument(
         "-c", "--cipher", help="The type of cipher: feistel [default] | custom | fpe"
     )
@@ -76,6 +253,155 @@ if __name__ == "__main__":
     parser.add_argument(
         "-o", "--operation", help="The operation to process : cipher | decipher"
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "-f",
+        "--file",
+        help="The CSV or JSONL file to stream instead of input [- for stdin]",
+    )
+    parser.add_argument(
+        "--format",
+        help="The format of the streamed file: csv | jsonl | fixed [default from extension]",
+    )
+    parser.add_argument(
+        "--columns", help="The comma-separated columns or keys to obfuscate as strings"
+    )
+    parser.add_argument(
+        "--numbers",
+        help="The comma-separated columns or keys to obfuscate as numbers (fpe only)",
+    )
+    parser.add_argument(
+        "--record-length", help="The length in bytes of the records of a fixed file"
+    )
+    parser.add_argument(
+        "--fields",
+        help="The comma-separated <offset>:<length>[:bytes|number] fields of a fixed file",
+    )
+    parser.add_argument("--output", help="The output file [default stdout]")
+    parser.add_argument(
+        "--in-place",
+        action="store_true",
+        help="Process the fixed file in place instead of writing an output file",
+    )
+    parser.add_argument(
+        "--buffer-size",
+        help="The size of the read/write buffers in bytes [default 1 MiB]",
+    )
+    parser.add_argument(
+        "--workers", help="The (optional) number of processes to use when streaming"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print the breakdown of the time spent in each stage of the cipher to stderr",
+    )
+    return parser.parse_args(argv)
+
 
-    main(args)
+def parse_serve_args(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="feistel-py serve")
+    parser.add_argument(
+        "--config",
+        help="The JSON file of the profiles (name -> cipher, key, engine, rounds)",
+    )
+    parser.add_argument(
+        "--listen", help="The address to listen on: unix:<path> | <host>:<port>"
+    )
+    parser.add_argument(
+        "--workers",
+        help="The number of worker processes [default one per core, 0 for none]",
+    )
+    return parser.parse_args(argv)
+
+
+def parse_load_args(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="feistel-py load")
+    parser.add_argument(
+        "--connect", help="The address of the server: unix:<path> | <host>:<port>"
+    )
+    parser.add_argument("--profile", help="The profile to use")
+    parser.add_argument(
+        "-o", "--operation", default="encrypt", help="The operation [default encrypt]"
+    )
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--pipeline", type=int, default=8)
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5.0)
+    return parser.parse_args(argv)
+
+
+def parse_job_args(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="feistel-py job")
+    parser.add_argument(
+        "--input",
+        help="The directory of the CSV or JSONL partitions, or a glob pattern of their files",
+    )
+    parser.add_argument("--output", help="The directory of the processed partitions")
+    parser.add_argument(
+        "--checkpoints",
+        help="The directory of the checkpoints [default <output>/.checkpoints]",
+    )
+    parser.add_argument(
+        "-c", "--cipher", help="The type of cipher: feistel [default] | custom | fpe"
+    )
+    parser.add_argument("-e", "--engine", help="The hashing engine [default sha-256]")
+    parser.add_argument("-k", "--key", help="The key(s) to use")
+    parser.add_argument(
+        "-r", "--rounds", help="The (optional) number of rounds [default 10]"
+    )
+    parser.add_argument(
+        "-o",
+        "--operation",
+        default="cipher",
+        help="The operation to process : cipher [default] | decipher",
+    )
+    parser.add_argument(
+        "--old-key",
+        help="The former key(s) to decrypt with before encrypting (re-keying)",
+    )
+    parser.add_argument(
+        "--old-engine", help="The former hashing engine [default the engine]"
+    )
+    parser.add_argument(
+        "--old-rounds", help="The former number of rounds [default the rounds]"
+    )
+    parser.add_argument(
+        "--columns",
+        default="",
+        help="The comma-separated columns or keys to obfuscate as strings",
+    )
+    parser.add_argument(
+        "--numbers",
+        default="",
+        help="The comma-separated columns or keys to obfuscate as numbers (fpe only)",
+    )
+    parser.add_argument(
+        "--workers", help="The (optional) number of processes to use per partition"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=10.0,
+        help="The number of seconds between progress lines on stderr [default 10]",
+    )
+    return parser.parse_args(argv)
+
+
+def _names(value: str | None) -> list[str]:
+    return [name for name in value.split(",") if name] if value else []
+
+
+def _open(path: str, std, mode: str, buffer_size: int):
+    if path == "-":
+        return open(
+            std.fileno(),
+            mode,
+            buffering=buffer_size,
+            encoding="utf-8",
+            newline="",
+            closefd=False,
+        )
+    return open(path, mode, buffering=buffer_size, encoding="utf-8", newline="")
+
+
+if __name__ == "__main__":
+    main()
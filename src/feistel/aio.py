@@ -0,0 +1,224 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Iterable
+
+from feistel.parallel import apply_batch
+
+DEFAULT_LINGER = 0.001
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_INFLIGHT = 4
+DEFAULT_MAX_QUEUE = 10000
+
+
+class AsyncCipher:
+    def __init__(
+        self,
+        cipher: Any,
+        executor: Executor | None = None,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        max_inflight: int = DEFAULT_MAX_INFLIGHT,
+        linger: float = DEFAULT_LINGER,
+    ):
+        """
+        The AsyncCipher is an asyncio facade to any cipher (`Cipher`, `CustomCipher` or `FPECipher`) which never blocks
+        the event loop: the work is offloaded to the passed executor (the default executor of the loop if `None`,
+        or eg. a `ProcessPoolExecutor`).
+        Concurrent calls are coalesced into micro-batches of at most `max_batch` values, waiting at most `linger` seconds
+        for a batch to fill up, with at most `max_inflight` batches running at once.
+        Calls wait for room when `max_queue` values are already pending, which applies backpressure to the callers.
+        Call `close()` once done.
+        """
+        assert (
+            max_batch >= 1 and max_queue >= 1 and max_inflight >= 1 and linger >= 0
+        ), "AsyncCipherError: wrong arguments"
+        self.cipher = cipher
+        self.executor = executor
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self.max_inflight = max_inflight
+        self.linger = linger
+        self._queue: asyncio.Queue | None = None
+        self._batcher: asyncio.Task | None = None
+        self._inflight: asyncio.Semaphore | None = None
+        self._running = set[asyncio.Task]()
+
+    async def encrypt(self, data: Any) -> Any:
+        """
+        Obfuscate the passed data
+        """
+        return await self._submit("encrypt", data)
+
+    async def encrypt_number(self, n: int) -> int:
+        """
+        Obfuscate the passed number (FPE only)
+        """
+        return await self._submit("encrypt_number", n)
+
+    async def encrypt_number_as_string(self, n: str) -> str:
+        """
+        Obfuscate the passed number as string (FPE only)
+        """
+        return await self._submit("encrypt_number_as_string", n)
+
+    async def encrypt_many(self, data: Iterable) -> list:
+        """
+        Obfuscate all the passed data in the executor by chunks of `max_batch` values, returning the results in the same order
+        """
+        return await self._run_many("encrypt", data)
+
+    async def decrypt(self, obfuscated: Any) -> Any:
+        """
+        Deobfuscate the passed data
+        """
+        return await self._submit("decrypt", obfuscated)
+
+    async def decrypt_number(self, obfuscated: int) -> int:
+        """
+        Deobfuscate the passed number (FPE only)
+        """
+        return await self._submit("decrypt_number", obfuscated)
+
+    async def decrypt_number_as_string(self, n: str) -> str:
+        """
+        Deobfuscate the passed number as string (FPE only)
+        """
+        return await self._submit("decrypt_number_as_string", n)
+
+    async def decrypt_many(self, obfuscated: Iterable) -> list:
+        """
+        Deobfuscate all the passed data in the executor by chunks of `max_batch` values, returning the results in the same order
+        """
+        return await self._run_many("decrypt", obfuscated)
+
+    async def close(self):
+        """
+        Wait for the pending calls to complete and stop batching
+        """
+        if self._batcher is None:
+            return
+        await self._queue.join()
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        if self._running:
+            await asyncio.gather(*self._running)
+        self._batcher = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    # private methods
+
+    async def _submit(self, operation: str, value: Any) -> Any:
+        if self._batcher is None:
+            self._queue = asyncio.Queue(self.max_queue)
+            self._batcher = asyncio.create_task(self._batch())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((operation, value, future))
+        return await future
+
+    async def _run_many(self, operation: str, values: Iterable) -> list:
+        # Each chunk takes a slot of `max_inflight` like the micro-batches, so that bulk calls share the same limit
+        loop = asyncio.get_running_loop()
+        inflight = self._semaphore()
+
+        async def run(chunk: list) -> list:
+            async with inflight:
+                return await loop.run_in_executor(
+                    self.executor, _apply, self.cipher, [operation] * len(chunk), chunk
+                )
+
+        values = list(values)
+        chunks = await asyncio.gather(
+            *(
+                run(values[start : start + self.max_batch])
+                for start in range(0, len(values), self.max_batch)
+            )
+        )
+        results = [result for chunk in chunks for result in chunk]
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return results
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        if self._inflight is None:
+            self._inflight = asyncio.Semaphore(self.max_inflight)
+        return self._inflight
+
+    async def _batch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.linger
+            while len(batch) < self.max_batch:
+                if self._queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(
+                            await asyncio.wait_for(self._queue.get(), remaining)
+                        )
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self._queue.get_nowait())
+
+            await self._semaphore().acquire()
+            task = asyncio.create_task(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: list[tuple[str, Any, asyncio.Future]]):
+        loop = asyncio.get_running_loop()
+        try:
+            operations = [operation for operation, _, _ in batch]
+            values = [value for _, value, _ in batch]
+            try:
+                results = await loop.run_in_executor(
+                    self.executor, _apply, self.cipher, operations, values
+                )
+            except Exception as e:
+                results = [e] * len(batch)
+            for (_, _, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        finally:
+            self._inflight.release()
+            for _ in batch:
+                self._queue.task_done()
+
+
+def _apply(cipher: Any, operations: list[str], values: list) -> list:
+    # Executed in the executor: the values of each operation go through the batch method of the cipher if any,
+    # errors being returned per value so that a batch never fails as a whole
+    indices = dict[str, list[int]]()
+    for idx, operation in enumerate(operations):
+        indices.setdefault(operation, []).append(idx)
+    results: list = [None] * len(values)
+    for operation, group in indices.items():
+        try:
+            batch = apply_batch(cipher, operation, [values[idx] for idx in group])
+            for idx, result in zip(group, batch):
+                results[idx] = result
+            continue
+        except Exception:
+            # Processed again value by value to only fail the wrong ones
+            pass
+        for idx in group:
+            try:
+                results[idx] = getattr(cipher, operation)(values[idx])
+            except Exception as e:
+                results[idx] = e
+    return results
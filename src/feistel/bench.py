@@ -0,0 +1,287 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from feistel import __version__
+from feistel.cipher import Cipher
+from feistel.custom import CustomCipher
+from feistel.fpe import FPECipher
+from feistel.utils import (
+    AES_PRF,
+    BLAKE2B,
+    BLAKE2B_KEYED,
+    BLAKE2S_KEYED,
+    HMAC_SHA_256,
+    KECCAK,
+    SHA_256,
+    SHA_3,
+    SHAKE_128,
+)
+
+CUSTOM = "custom"
+FEISTEL = "feistel"
+FPE = "fpe"
+
+DEFAULT_ENGINES = [
+    BLAKE2B,
+    KECCAK,
+    SHA_256,
+    SHA_3,
+    AES_PRF,
+    BLAKE2B_KEYED,
+    BLAKE2S_KEYED,
+    HMAC_SHA_256,
+    SHAKE_128,
+]
+DEFAULT_LENGTHS = [2, 16, 128, 1024, 4096]
+DEFAULT_NUMBERS = [123, 123456789, 18446744073709551615]
+DEFAULT_ROUNDS = [2, 10, 128]
+DEFAULT_THRESHOLD = 0.1
+
+KEY = "8ed9dcc1701c064f0fd7ae235f15143f989920e0ee9658bb7882c8d7d5f05692"
+
+
+class Case:
+    def __init__(self, name: str, fn: Callable[[], Any], size: int):
+        """
+        A Case is a single operation to measure, `size` being the length of its input
+        """
+        self.name = name
+        self.fn = fn
+        self.size = size
+
+
+def build_cases(
+    ciphers: list[str] = [FEISTEL, CUSTOM, FPE],
+    engines: list[str] = DEFAULT_ENGINES,
+    rounds: list[int] = DEFAULT_ROUNDS,
+    lengths: list[int] = DEFAULT_LENGTHS,
+    numbers: list[int] = DEFAULT_NUMBERS,
+) -> list[Case]:
+    """
+    Returns the cases to measure for all the combinations of the passed arguments
+    """
+    cases = list[Case]()
+    for r in rounds:
+        instances = list[tuple[str, Any]]()
+        if FEISTEL in ciphers:
+            instances.append((f"{FEISTEL}/r{r}", Cipher(KEY, r)))
+        if CUSTOM in ciphers:
+            keys = [KEY[idx % len(KEY) :] + KEY[: idx % len(KEY)] for idx in range(r)]
+            instances.append((f"{CUSTOM}/r{r}", CustomCipher(keys)))
+        if FPE in ciphers:
+            for engine in engines:
+                instances.append((f"{FPE}/{engine}/r{r}", FPECipher(engine, KEY, r)))
+
+        for prefix, cipher in instances:
+            for length in lengths:
+                data = "".join(chr(ord("a") + idx % 26) for idx in range(length))
+                obfuscated = cipher.encrypt(data)
+                cases.append(
+                    Case(
+                        f"{prefix}/encrypt/{length}",
+                        _bind(cipher.encrypt, data),
+                        length,
+                    )
+                )
+                cases.append(
+                    Case(
+                        f"{prefix}/decrypt/{length}",
+                        _bind(cipher.decrypt, obfuscated),
+                        length,
+                    )
+                )
+            if isinstance(cipher, FPECipher):
+                for n in numbers:
+                    cases.append(
+                        Case(
+                            f"{prefix}/encrypt_number/{n}",
+                            _bind(cipher.encrypt_number, n),
+                            len(str(n)),
+                        )
+                    )
+                    cases.append(
+                        Case(
+                            f"{prefix}/encrypt_number_as_string/{n}",
+                            _bind(cipher.encrypt_number_as_string, str(n).zfill(20)),
+                            20,
+                        )
+                    )
+    return cases
+
+
+def measure(case: Case, min_time: float = 0.2, max_iterations: int = 10000) -> dict:
+    """
+    Run the passed case for at least `min_time` seconds (unless `max_iterations` is reached first)
+    and return its throughput, latency percentiles and allocations per operation.
+    Allocations are measured with `tracemalloc` as the peak of memory allocated while running one operation,
+    and the memory still allocated after it.
+    """
+    case.fn()  # warm-up, eg. to fill the key schedule
+    latencies = list[int]()
+    deadline = time.perf_counter() + min_time
+    while len(latencies) < max_iterations and (
+        len(latencies) == 0 or time.perf_counter() < deadline
+    ):
+        start = time.perf_counter_ns()
+        case.fn()
+        latencies.append(time.perf_counter_ns() - start)
+    latencies.sort()
+
+    # Allocations are traced in a separate run as tracing slows everything down
+    iterations = min(len(latencies), 100)
+    peaks = 0
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        for _ in range(iterations):
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            case.fn()
+            peaks += tracemalloc.get_traced_memory()[1] - current
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    total = sum(latencies)
+    return {
+        "size": case.size,
+        "iterations": len(latencies),
+        "ops_per_sec": len(latencies) / total * 1e9 if total > 0 else 0.0,
+        "p50_us": _percentile(latencies, 0.5) / 1e3,
+        "p90_us": _percentile(latencies, 0.9) / 1e3,
+        "p99_us": _percentile(latencies, 0.99) / 1e3,
+        "alloc_bytes_per_op": peaks / iterations,
+        "retained_bytes_per_op": (after - before) / iterations,
+    }
+
+
+def run(cases: list[Case], min_time: float = 0.2, verbose: bool = False) -> dict:
+    """
+    Measure all the passed cases and return a report ready to be saved as JSON
+    """
+    results = dict[str, dict]()
+    for case in cases:
+        results[case.name] = measure(case, min_time)
+        if verbose:
+            print(
+                f"{case.name:<55} {results[case.name]['ops_per_sec']:12.1f} ops/s",
+                file=sys.stderr,
+            )
+    return {
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(
+    report: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD
+) -> list[dict]:
+    """
+    Returns the cases of the report whose throughput dropped by more than `threshold` (eg. 0.1 for 10%)
+    compared to the baseline report
+    """
+    regressions = list[dict]()
+    for name, result in report["results"].items():
+        reference = baseline["results"].get(name)
+        if reference is None or reference["ops_per_sec"] == 0:
+            continue
+        ratio = result["ops_per_sec"] / reference["ops_per_sec"]
+        if ratio < 1 - threshold:
+            regressions.append(
+                {
+                    "name": name,
+                    "baseline_ops_per_sec": reference["ops_per_sec"],
+                    "ops_per_sec": result["ops_per_sec"],
+                    "ratio": ratio,
+                }
+            )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python3 -m feistel.bench")
+    parser.add_argument(
+        "--ciphers", help="The comma-separated ciphers [default feistel,custom,fpe]"
+    )
+    parser.add_argument(
+        "--engines", help="The comma-separated FPE engines [default all]"
+    )
+    parser.add_argument(
+        "--rounds", help="The comma-separated numbers of rounds [default 2,10,128]"
+    )
+    parser.add_argument(
+        "--lengths",
+        help="The comma-separated string lengths [default 2,16,128,1024,4096]",
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.2,
+        help="The minimum time per case in seconds",
+    )
+    parser.add_argument("--filter", help="Only run the cases whose name contains this")
+    parser.add_argument("-o", "--output", help="The JSON file to save the report to")
+    parser.add_argument("-b", "--baseline", help="The JSON report to compare with")
+    parser.add_argument(
+        "-t",
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="The relative throughput drop considered a regression [default 0.1]",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    cases = build_cases(
+        _list(args.ciphers, str) or [FEISTEL, CUSTOM, FPE],
+        _list(args.engines, str) or DEFAULT_ENGINES,
+        _list(args.rounds, int) or DEFAULT_ROUNDS,
+        _list(args.lengths, int) or DEFAULT_LENGTHS,
+    )
+    if args.filter:
+        cases = [case for case in cases if args.filter in case.name]
+    report = run(cases, args.min_time, args.verbose)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression['name']}: {regression['baseline_ops_per_sec']:.1f} -> "
+                f"{regression['ops_per_sec']:.1f} ops/s ({regression['ratio']:.0%})",
+                file=sys.stderr,
+            )
+        if regressions:
+            return 1
+    return 0
+
+
+def _bind(fn: Callable, arg: Any) -> Callable[[], Any]:
+    return lambda: fn(arg)
+
+
+def _list(value: str | None, cast: Callable) -> list:
+    return [cast(item) for item in value.split(",") if item] if value else []
+
+
+def _percentile(values: list[int], rank: float) -> float:
+    return float(values[min(len(values) - 1, int(rank * len(values)))])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+from collections import OrderedDict
+import hashlib
+import sys
+import threading
+from typing import Any, Hashable, Iterable
+
+DEFAULT_MAX_ENTRIES = 100000
+DEFAULT_MAX_BYTES = 64 << 20
+
+# Operations cached in both directions, mapped to their inverse
+_INVERSES = {
+    "encrypt": "decrypt",
+    "encrypt_number": "decrypt_number",
+    "encrypt_number_as_string": "decrypt_number_as_string",
+    "encrypt_string": "decrypt_string",
+}
+_INVERSES.update({inverse: op for op, inverse in list(_INVERSES.items())})
+
+
+class ResultCache:
+    def __init__(
+        self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        """
+        The ResultCache is a bounded LRU store of cipher results, evicting the least recently used entries
+        once it holds more than `max_entries` entries or its entries are estimated to weigh more than `max_bytes`.
+        It may be shared by several `CachedCipher` instances: entries are keyed by the fingerprint of each cipher.
+        """
+        assert max_entries > 0 and max_bytes > 0, "ResultCacheError: wrong arguments"
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0
+        self._entries = OrderedDict[Hashable, tuple[Any, int]]()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Returns the cached result for the passed key, or `None`
+        """
+        with self._lock:
+            found = self._entries.get(key)
+            if found is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return found[0]
+
+    def put(self, key: Hashable, value: Any):
+        """
+        Store the passed result, evicting the least recently used entries if need be
+        """
+        weight = _weight(key) + _weight(value)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self._entries[key] = (value, weight)
+            self.size += weight
+            while len(self._entries) > self.max_entries or (
+                self.size > self.max_bytes and len(self._entries) > 1
+            ):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        """
+        Remove all the entries (counters are kept)
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> dict:
+        """
+        Returns the counters of the cache
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "size": self.size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CachedCipher:
+    def __init__(self, cipher: Any, cache: ResultCache | None = None):
+        """
+        The CachedCipher memoizes the results of the passed cipher (`Cipher`, `CustomCipher` or `FPECipher`),
+        which pays off with repetitive data like identifiers or country codes.
+        Both directions are cached, and computing an obfuscated value also primes the entry to decipher it.
+        Entries are keyed by a fingerprint of the cipher class and whole configuration (key(s), engine, rounds, alphabet...),
+        so that a cache shared by several instances never mixes up their results.
+
+        NB: A primed entry holds the result of the deciphering by the cipher, which is not always the original data
+        (see the quirks of the `FPECipher`), so that every miss of an obfuscation also computes its deciphering.
+        """
+        self.cipher = cipher
+        self.cache = cache if cache is not None else ResultCache()
+        self.fingerprint = fingerprint(cipher)
+
+    def encrypt(self, data: Any) -> Any:
+        """
+        Cached `encrypt()` of the cipher
+        """
+        return self._call("encrypt", data)
+
+    def encrypt_many(self, data: Iterable) -> list:
+        """
+        Cached `encrypt_many()` of the cipher
+        """
+        return [self._call("encrypt", item) for item in data]
+
+    def encrypt_number(self, n: int) -> int:
+        """
+        Cached `encrypt_number()` of the cipher
+        """
+        return self._call("encrypt_number", n)
+
+    def encrypt_number_as_string(self, n: str) -> str:
+        """
+        Cached `encrypt_number_as_string()` of the cipher
+        """
+        return self._call("encrypt_number_as_string", n)
+
+    def encrypt_numbers(self, numbers: Iterable[int]) -> list[int]:
+        """
+        Cached `encrypt_numbers()` of the cipher
+        """
+        return [self._call("encrypt_number", n) for n in numbers]
+
+    def encrypt_string(self, string: str) -> str:
+        """
+        Cached `encrypt_string()` of the cipher
+        """
+        return self._call("encrypt_string", string)
+
+    def decrypt(self, obfuscated: Any) -> Any:
+        """
+        Cached `decrypt()` of the cipher
+        """
+        return self._call("decrypt", obfuscated)
+
+    def decrypt_many(self, obfuscated: Iterable) -> list:
+        """
+        Cached `decrypt_many()` of the cipher
+        """
+        return [self._call("decrypt", item) for item in obfuscated]
+
+    def decrypt_number(self, obfuscated: int) -> int:
+        """
+        Cached `decrypt_number()` of the cipher
+        """
+        return self._call("decrypt_number", obfuscated)
+
+    def decrypt_number_as_string(self, n: str) -> str:
+        """
+        Cached `decrypt_number_as_string()` of the cipher
+        """
+        return self._call("decrypt_number_as_string", n)
+
+    def decrypt_numbers(self, obfuscated: Iterable[int]) -> list[int]:
+        """
+        Cached `decrypt_numbers()` of the cipher
+        """
+        return [self._call("decrypt_number", n) for n in obfuscated]
+
+    def decrypt_string(self, obfuscated: str) -> str:
+        """
+        Cached `decrypt_string()` of the cipher
+        """
+        return self._call("decrypt_string", obfuscated)
+
+    def stats(self) -> dict:
+        """
+        Returns the counters of the underlying cache
+        """
+        return self.cache.stats()
+
+    # private methods
+
+    def _call(self, operation: str, value: Any) -> Any:
+        key = (self.fingerprint, operation, _hashable(value))
+        found = self.cache.get(key)
+        if found is not None:
+            return _copy(found)
+
+        result = getattr(self.cipher, operation)(value)
+        self.cache.put(key, _copy(result))
+        if operation.startswith("encrypt"):
+            # Deciphering is not always the exact inverse (eg. trailing zero bytes, widths of numbers):
+            # the primed entry holds the actual result of the cipher, so that it never depends on the history of the cache
+            inverse = _INVERSES[operation]
+            try:
+                original = getattr(self.cipher, inverse)(_copy(result))
+            except Exception:
+                return result
+            self.cache.put(
+                (self.fingerprint, inverse, _hashable(result)), _copy(original)
+            )
+        return result
+
+
+def fingerprint(cipher: Any) -> str:
+    """
+    Returns an identifier of the class and the whole configuration of the passed cipher, ie. the arguments it is rebuilt
+    from when pickled (eg. the alphabet of a `RadixCipher`) or else its public attributes, which does not disclose its key(s)
+    """
+    return hashlib.sha256(repr(_configuration(cipher)).encode()).hexdigest()
+
+
+def _configuration(value: Any) -> Any:
+    # Plain and comparable description of the passed value, the nested ciphers (eg. wrapped ones) included
+    if value is None or isinstance(value, (str, bytes, int, float)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return tuple(_configuration(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _configuration(v)) for k, v in value.items()))
+    cls = type(value)
+    if cls.__reduce__ is not object.__reduce__:
+        state = value.__reduce__()[1]
+    else:
+        state = {
+            name: item
+            for name, item in getattr(value, "__dict__", {}).items()
+            if not name.startswith("_")
+        }
+        if not state:
+            # Nothing to compare: the instance only matches itself
+            state = id(value)
+    return (cls.__module__, cls.__qualname__, _configuration(state))
+
+
+def _copy(value: Any) -> Any:
+    # Byte arrays are mutable: never hand the cached instance out
+    return bytearray(value) if isinstance(value, bytearray) else value
+
+
+def _hashable(value: Any) -> Hashable:
+    if isinstance(value, (bytearray, memoryview)):
+        return ("bytes", bytes(value))
+    if isinstance(value, bytes):
+        return ("bytes", value)
+    return (type(value).__name__, value)
+
+
+def _weight(value: Any) -> int:
+    if isinstance(value, tuple):
+        return sys.getsizeof(value) + sum(_weight(item) for item in value)
+    return sys.getsizeof(value)
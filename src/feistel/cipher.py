@@ -1,7 +1,27 @@
-from feistel.utils import add, extract, hash, pad, split, string2bytearray, unpad, xor
+from typing import Iterable
+
+from feistel.utils import (
+    add,
+    extract,
+    hasher,
+    KeySchedule,
+    pad,
+    PADDING_BYTES,
+    SHA_256,
+    split,
+    string2bytearray,
+    unpad,
+    xor,
+    xor_into,
+)
+
+# Names exported by the package
+__all__ = ["Cipher"]
 
 
 class Cipher:
+    __slots__ = ("_key", "_rounds", "_schedule", "_hash", "_ascii")
+
     def __init__(self, key: str, rounds: int):
         """
         The Cipher class is the main entry point to the Feistel cipher if you want to use the SHA-256 hash function at each round.
@@ -10,8 +30,25 @@ class Cipher:
         Once instantiated, use the encrypt() or decrypt() methods on the Cipher instance with the appropriate data.
         """
         assert key and rounds >= 2, "CipherError: wrong arguments"
-        self.key = key
-        self.rounds = rounds
+        self._key = key
+        self._rounds = rounds
+        self._schedule = KeySchedule([key], rounds)
+        self._hash = hasher(SHA_256)
+        self._ascii = key.isascii()
+
+    @property
+    def key(self) -> str:
+        """
+        The base key (read-only)
+        """
+        return self._key
+
+    @property
+    def rounds(self) -> int:
+        """
+        The number of rounds (read-only)
+        """
+        return self._rounds
 
     def encrypt(self, data: str) -> bytearray:
         """
@@ -20,6 +57,9 @@ class Cipher:
         if len(data) == 0:
             return bytearray()
 
+        if self._ascii and data.isascii():
+            return self.encrypt_bytes(data.encode())
+
         if len(data) % 2 == 1:
             data = pad(data)
 
@@ -29,12 +69,40 @@ class Cipher:
             raise Exception("invalid string: unable to split")
 
         parts = [left, right]
-        for i in range(0, self.rounds):
+        for i in range(0, self._rounds):
             tmp = xor(parts[0], self._round(parts[1], i))
             parts = [parts[1], tmp]
 
         return string2bytearray(parts[0] + parts[1])
 
+    def encrypt_bytes(self, data: bytes | bytearray | memoryview) -> bytearray:
+        """
+        Obfuscate the passed UTF-8 bytes, giving the same result as `encrypt()` on the decoded string
+
+        NB: ASCII data is processed in a preallocated buffer without going through strings
+        """
+        buffer = bytearray(data)
+        if not self._ascii or not buffer.isascii():
+            return self.encrypt(buffer.decode())
+        if len(buffer) % 2 == 1:
+            buffer[0:0] = PADDING_BYTES
+
+        # Apply the balanced Feistel cipher in place, swapping the roles of both halves at each round
+        half = len(buffer) // 2
+        view = memoryview(buffer)
+        left, right = view[:half], view[half:]
+        for i in range(0, self._rounds):
+            xor_into(left, self._round_bytes(right, i))
+            left, right = right, left
+
+        return bytearray(left) + right
+
+    def encrypt_many(self, data: Iterable[str]) -> list[bytearray]:
+        """
+        Obfuscate all the passed data at once, returning the results in the same order
+        """
+        return [self.encrypt(item) for item in data]
+
     def decrypt(self, obfuscated: bytes | bytearray) -> str:
         """
         Deobfuscate the passed data
@@ -43,18 +111,64 @@ class Cipher:
         if len(obfuscated) == 0:
             return ""
 
+        if self._ascii and obfuscated.isascii():
+            return self.decrypt_bytes(obfuscated).decode()
+
         o = obfuscated.decode()
 
         # Apply the balanced Feistel cipher
         b, a = split(o)
-        for i in range(0, self.rounds):
-            tmp = xor(a, self._round(b, self.rounds - i - 1))
+        for i in range(0, self._rounds):
+            tmp = xor(a, self._round(b, self._rounds - i - 1))
             a = b
             b = tmp
 
         return unpad(b + a)
 
+    def decrypt_bytes(self, obfuscated: bytes | bytearray | memoryview) -> bytearray:
+        """
+        Deobfuscate the passed data to UTF-8 bytes, giving the same result as the encoded string of `decrypt()`
+
+        NB: ASCII data is processed in a preallocated buffer without going through strings
+        """
+        buffer = bytearray(obfuscated)
+        if not self._ascii or not buffer.isascii():
+            return string2bytearray(self.decrypt(buffer))
+        assert len(buffer) % 2 == 0, "CipherError: invalid obfuscated data"
+
+        # Apply the balanced Feistel cipher in place, swapping the roles of both halves at each round
+        half = len(buffer) // 2
+        view = memoryview(buffer)
+        b, a = view[:half], view[half:]
+        for i in range(0, self._rounds):
+            xor_into(a, self._round_bytes(b, self._rounds - i - 1))
+            a, b = b, a
+
+        return (bytearray(b) + a).lstrip(PADDING_BYTES)
+
+    def decrypt_many(self, obfuscated: Iterable[bytes | bytearray]) -> list[str]:
+        """
+        Deobfuscate all the passed data at once, returning the results in the same order
+        """
+        return [self.decrypt(item) for item in obfuscated]
+
+    def __reduce__(self):
+        # Rebuilt from its configuration, which also identifies it (see `feistel.cache.fingerprint()`)
+        return (
+            type(self),
+            (
+                self._key,
+                self._rounds,
+            ),
+        )
+
     def _round(self, item: str, idx: int) -> str:
-        addition = add(item, extract(self.key, idx, len(item)))
-        hex_hashed = hash(string2bytearray(addition)).hex()
+        addition = add(item, self._schedule.strings(len(item))[idx])
+        hex_hashed = self._hash(string2bytearray(addition)).hex()
         return extract(hex_hashed, idx, len(item))
+
+    def _round_bytes(self, item: memoryview, idx: int) -> bytes:
+        # NB: Both item and round key are ASCII, so that the sum of two characters fits in a byte
+        addition = bytes(map(int.__add__, item, self._schedule.bytes(len(item))[idx]))
+        hashed = self._hash(addition.decode("latin-1").encode()).hex()
+        return extract(hashed, idx, len(item)).encode()
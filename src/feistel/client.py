@@ -0,0 +1,182 @@
+import json
+import socket
+import threading
+import time
+from typing import Iterable
+
+from feistel.server import FRAME_HEADER, MAX_FRAME_SIZE, parse_address
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_CONNECTIONS = 4
+DEFAULT_PIPELINE = 8
+
+
+class Client:
+    def __init__(self, address: str, timeout: float | None = None):
+        """
+        The Client talks to a `feistel-py serve` process listening on the passed address,
+        ie. `unix:<path>` or `<host>:<port>`
+        """
+        target = parse_address(address)
+        if isinstance(target, str):
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._socket.settimeout(timeout)
+        self._socket.connect(target)
+        self._reader = self._socket.makefile("rb")
+        self._next_id = 0
+
+    def call(self, profile: str, operation: str, values: list) -> list:
+        """
+        Apply the passed operation (eg. `encrypt` or `decrypt_number`) of the profile to all the values
+        in one round-trip
+        """
+        return self.pipeline([(profile, operation, values)])[0]
+
+    def encrypt(self, profile: str, values: list) -> list:
+        """
+        Obfuscate the passed values with the cipher of the profile
+        """
+        return self.call(profile, "encrypt", values)
+
+    def decrypt(self, profile: str, values: list) -> list:
+        """
+        Deobfuscate the passed values with the cipher of the profile
+        """
+        return self.call(profile, "decrypt", values)
+
+    def pipeline(self, requests: Iterable[tuple[str, str, list]]) -> list[list]:
+        """
+        Send all the passed requests (profile, operation, values) before reading their responses,
+        returning the results in the order of the requests
+        """
+        ids = list[int]()
+        frames = list[bytes]()
+        for profile, operation, values in requests:
+            self._next_id += 1
+            ids.append(self._next_id)
+            payload = json.dumps(
+                {
+                    "id": self._next_id,
+                    "profile": profile,
+                    "op": operation,
+                    "values": values,
+                },
+                ensure_ascii=False,
+            ).encode()
+            frames.append(FRAME_HEADER.pack(len(payload)) + payload)
+        self._socket.sendall(b"".join(frames))
+
+        # Responses may come back in any order
+        responses = dict[int, dict]()
+        while len(responses) < len(ids):
+            response = json.loads(self._read_frame())
+            responses[response.get("id")] = response
+        results = list[list]()
+        for request_id in ids:
+            response = responses[request_id]
+            if "error" in response:
+                raise Exception(response["error"])
+            results.append(response["values"])
+        return results
+
+    def close(self):
+        self._reader.close()
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    # private methods
+
+    def _read_frame(self) -> bytes:
+        header = self._reader.read(FRAME_HEADER.size)
+        if len(header) < FRAME_HEADER.size:
+            raise ConnectionError("connection closed by the server")
+        (size,) = FRAME_HEADER.unpack(header)
+        if size > MAX_FRAME_SIZE:
+            raise ConnectionError(f"invalid frame size: {size}")
+        payload = self._reader.read(size)
+        if len(payload) < size:
+            raise ConnectionError("connection closed by the server")
+        return payload
+
+
+def load(
+    address: str,
+    profile: str,
+    operation: str = "encrypt",
+    values: list | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    pipeline: int = DEFAULT_PIPELINE,
+    connections: int = DEFAULT_CONNECTIONS,
+    duration: float = 5.0,
+) -> dict:
+    """
+    Generate load against a server for `duration` seconds: each connection sends `pipeline` requests
+    of `batch_size` values at a time. Returns the throughput and the latency percentiles of the round-trips.
+    """
+    assert (
+        batch_size >= 1 and pipeline >= 1 and connections >= 1
+    ), "LoadError: wrong arguments"
+    if values is None:
+        values = (
+            list(range(1, batch_size + 1))
+            if "number" in operation and "string" not in operation
+            else [f"value-{idx:08d}" for idx in range(batch_size)]
+        )
+    batch = [values[idx % len(values)] for idx in range(batch_size)]
+    requests = [(profile, operation, batch)] * pipeline
+
+    latencies = list[int]()
+    errors = list[Exception]()
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        local = list[int]()
+        try:
+            with Client(address) as client:
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter_ns()
+                    client.pipeline(requests)
+                    local.append(time.perf_counter_ns() - start)
+        except Exception as e:
+            with lock:
+                errors.append(e)
+        with lock:
+            latencies.extend(local)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(connections)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if errors:
+        raise errors[0]
+
+    latencies.sort()
+    requests_count = len(latencies) * pipeline
+    return {
+        "connections": connections,
+        "pipeline": pipeline,
+        "batch_size": batch_size,
+        "requests": requests_count,
+        "requests_per_sec": requests_count / elapsed,
+        "values_per_sec": requests_count * batch_size / elapsed,
+        "p50_ms": _percentile(latencies, 0.5) / 1e6,
+        "p99_ms": _percentile(latencies, 0.99) / 1e6,
+    }
+
+
+def _percentile(values: list[int], rank: float) -> float:
+    if not values:
+        return 0.0
+    return float(values[min(len(values) - 1, int(rank * len(values)))])
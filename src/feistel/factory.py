@@ -0,0 +1,147 @@
+from collections import OrderedDict
+import threading
+from typing import Any, Hashable
+
+from feistel.cipher import Cipher
+from feistel.custom import CustomCipher
+from feistel.fpe import FPECipher
+from feistel.utils import Engine, SHA_256
+
+# Names exported by the package
+__all__ = ["CipherRegistry", "evict_ciphers", "get_cipher"]
+
+CUSTOM = "custom"
+FEISTEL = "feistel"
+FPE = "fpe"
+
+DEFAULT_MAX_CIPHERS = 1024
+
+
+class CipherRegistry:
+    def __init__(self, max_entries: int = DEFAULT_MAX_CIPHERS):
+        """
+        The CipherRegistry interns cipher instances by configuration, so that each (kind, key(s), engine, rounds) is
+        only built once and its derived data (key schedules, hashers, round tables) is shared by all its users.
+        It is bounded to `max_entries` ciphers, the least recently used ones being evicted first.
+        Use `evict()` when rotating keys to drop the ciphers of a retired key.
+
+        NB: Returned ciphers are shared and must not be modified.
+        """
+        assert max_entries > 0, "CipherRegistryError: wrong arguments"
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._ciphers = OrderedDict[Hashable, Any]()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        kind: str,
+        key: str | list[str],
+        engine: Engine = SHA_256,
+        rounds: int = 10,
+    ) -> Cipher | CustomCipher | FPECipher:
+        """
+        Returns the cipher of the passed configuration, building it on first use.
+        The `feistel` cipher always uses SHA-256 and the keys of a `custom` cipher are passed as a list
+        (its number of rounds being the number of keys).
+        """
+        config = _config(kind, key, engine, rounds)
+        with self._lock:
+            found = self._ciphers.get(config)
+            if found is not None:
+                self._ciphers.move_to_end(config)
+                self.hits += 1
+                return found
+            self.misses += 1
+
+        # Built outside of the lock: another thread may intern the same configuration first
+        cipher = _build(kind, key, engine, rounds)
+        with self._lock:
+            found = self._ciphers.setdefault(config, cipher)
+            self._ciphers.move_to_end(config)
+            while len(self._ciphers) > self.max_entries:
+                self._ciphers.popitem(last=False)
+                self.evictions += 1
+            return found
+
+    def evict(self, key: str | list[str] | None = None) -> int:
+        """
+        Remove the ciphers using the passed key, including the `custom` ciphers having it among their keys
+        (or using exactly the passed list of keys), or all the ciphers by default, returning the number of removed ciphers
+        """
+        keys = tuple(key) if isinstance(key, list) else key
+        with self._lock:
+            evicted = [
+                config
+                for config in self._ciphers
+                if keys is None
+                or config[1] == keys
+                or (isinstance(config[1], tuple) and keys in config[1])
+            ]
+            for config in evicted:
+                del self._ciphers[config]
+            return len(evicted)
+
+    def stats(self) -> dict:
+        """
+        Returns the counters of the registry
+        """
+        with self._lock:
+            return {
+                "entries": len(self._ciphers),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def __len__(self) -> int:
+        return len(self._ciphers)
+
+
+_registry = CipherRegistry()
+
+
+def get_cipher(
+    kind: str,
+    key: str | list[str],
+    engine: Engine = SHA_256,
+    rounds: int = 10,
+) -> Cipher | CustomCipher | FPECipher:
+    """
+    Returns the interned cipher of the passed configuration from the default registry (see `CipherRegistry.get()`), eg.
+    `get_cipher("fpe", "some-32-byte-long-key-to-be-safe", SHA_256, 10)`
+    """
+    return _registry.get(kind, key, engine, rounds)
+
+
+def evict_ciphers(key: str | list[str] | None = None) -> int:
+    """
+    Remove the ciphers using the passed key (or all of them) from the default registry (see `CipherRegistry.evict()`)
+    """
+    return _registry.evict(key)
+
+
+def _build(
+    kind: str, key: str | list[str], engine: Engine, rounds: int
+) -> Cipher | CustomCipher | FPECipher:
+    if kind == FPE:
+        return FPECipher(engine, key, rounds)
+    elif kind == FEISTEL:
+        return Cipher(key, rounds)
+    else:
+        return CustomCipher(key)
+
+
+def _config(kind: str, key: str | list[str], engine: Engine, rounds: int) -> tuple:
+    # Only the parameters used by each kind of cipher are part of its configuration
+    if kind == FPE:
+        return (kind, key, engine, rounds)
+    elif kind == FEISTEL:
+        return (kind, key, None, rounds)
+    elif kind == CUSTOM:
+        if not isinstance(key, list):
+            raise Exception("the keys of a custom cipher must be passed as a list")
+        return (kind, tuple(key), None, len(key))
+    raise Exception(f"invalid cipher: {kind}")
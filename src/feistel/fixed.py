@@ -0,0 +1,197 @@
+from concurrent.futures import ProcessPoolExecutor
+import mmap
+import os
+import shutil
+
+from feistel.fpe import FPECipher
+
+BYTES = "bytes"
+NUMBER = "number"
+
+FIXED = "fixed"
+
+_OVERFLOWING = {1 << 8, 1 << 16, 1 << 32}
+
+
+class Field:
+    def __init__(self, offset: int, length: int, kind: str = BYTES):
+        """
+        A Field is a range of `length` bytes at `offset` in each record of a fixed-width file.
+        Its kind is either:
+        - `bytes`: the bytes are obfuscated as they are (see `FPECipher.encrypt_into()`);
+        - `number`: the bytes hold a big-endian unsigned integer obfuscated with `FPECipher.encrypt_number()`.
+
+        NB: An obfuscated number may need more bytes than the original one, so number fields should be 2, 4 or 8 bytes long.
+        """
+        assert (
+            offset >= 0 and length > 0 and kind in [BYTES, NUMBER]
+        ), "FieldError: wrong arguments"
+        self.offset = offset
+        self.length = length
+        self.kind = kind
+
+    def __repr__(self) -> str:
+        return f"Field({self.offset}, {self.length}, {self.kind!r})"
+
+
+def obfuscate_fixed(
+    cipher: FPECipher,
+    source: str,
+    record_length: int,
+    fields: list[Field],
+    output: str | None = None,
+    decrypt: bool = False,
+    workers: int | None = None,
+) -> int:
+    """
+    Obfuscate (or deobfuscate) the passed fields of every record of a fixed-width file, returning the number of records.
+    Without output, the source is memory-mapped and processed in place. Otherwise, it is copied to a temporary file
+    next to the output, which is processed the same way and renamed over the output on success only.
+    The `number` fields of all the records are checked beforehand, so that a number that cannot be obfuscated
+    in its field (see `FPECipher.encrypt_number()`) fails without modifying any file.
+    If `workers` is set, the records are split in as many ranges processed by separate processes.
+    """
+    assert (
+        isinstance(cipher, FPECipher) and record_length > 0 and len(fields) > 0
+    ), "FixedError: wrong arguments"
+    _check_fields(fields, record_length)
+
+    size = os.path.getsize(source)
+    if size % record_length != 0:
+        raise Exception("invalid record length: the file size is not a multiple of it")
+    count = size // record_length
+    if count == 0:
+        if output is not None:
+            shutil.copyfile(source, output)
+        return 0
+    _check_numbers(cipher, source, record_length, fields, decrypt, count)
+    if output is None:
+        _process(cipher, source, record_length, fields, decrypt, count, workers)
+        return count
+
+    path = f"{output}.{os.getpid()}.tmp"
+    shutil.copyfile(source, path)
+    try:
+        _process(cipher, path, record_length, fields, decrypt, count, workers)
+        os.replace(path, output)
+    except BaseException:
+        os.remove(path)
+        raise
+    return count
+
+
+def parse_fields(value: str) -> list[Field]:
+    """
+    Returns the fields described as comma-separated `<offset>:<length>[:<kind>]` items, eg. `0:10,10:8:number`
+    """
+    fields = list[Field]()
+    for item in value.split(","):
+        if not item:
+            continue
+        parts = item.split(":")
+        if len(parts) not in [2, 3]:
+            raise Exception(f"invalid field: {item}")
+        fields.append(Field(int(parts[0]), int(parts[1]), *parts[2:]))
+    return fields
+
+
+def _check_fields(fields: list[Field], record_length: int):
+    end = 0
+    for field in sorted(fields, key=lambda f: f.offset):
+        if field.offset < end or field.offset + field.length > record_length:
+            raise Exception(f"invalid field: {field}")
+        end = field.offset + field.length
+
+
+def _check_numbers(
+    cipher: FPECipher,
+    path: str,
+    record_length: int,
+    fields: list[Field],
+    decrypt: bool,
+    count: int,
+):
+    # Only the numbers that may not fit are actually processed, raising the error of the cipher
+    numbers = [field for field in fields if field.kind == NUMBER]
+    if not numbers:
+        return
+    transform_number = cipher.decrypt_number if decrypt else cipher.encrypt_number
+    with (
+        open(path, "rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+    ):
+        for position in range(0, count * record_length, record_length):
+            for field in numbers:
+                offset = position + field.offset
+                n = int.from_bytes(mapped[offset : offset + field.length], "big")
+                if not _fits(n, field.length):
+                    transform_number(n).to_bytes(field.length, "big")
+
+
+def _fits(n: int, length: int) -> bool:
+    # Whether the number is known to be processed into at most `length` bytes: the numbers are (de)obfuscated
+    # on 1 or 2, 4 or 8 bytes depending on their size, except around 256, 65536, 2^32 and beyond 2^64 which may overflow
+    if n == 0:
+        return True
+    if n >= 1 << 64 or n in _OVERFLOWING:
+        return False
+    return (2 if n < 1 << 16 else 4 if n < 1 << 32 else 8) <= length
+
+
+def _process(
+    cipher: FPECipher,
+    path: str,
+    record_length: int,
+    fields: list[Field],
+    decrypt: bool,
+    count: int,
+    workers: int | None,
+):
+    if workers is None or workers <= 1 or count < workers:
+        _process_range(cipher, path, record_length, fields, decrypt, 0, count)
+        return
+
+    step = -(-count // workers)
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [
+            pool.submit(
+                _process_range,
+                cipher,
+                path,
+                record_length,
+                fields,
+                decrypt,
+                start,
+                min(start + step, count),
+            )
+            for start in range(0, count, step)
+        ]
+        for future in futures:
+            future.result()
+
+
+def _process_range(
+    cipher: FPECipher,
+    path: str,
+    record_length: int,
+    fields: list[Field],
+    decrypt: bool,
+    start: int,
+    stop: int,
+):
+    transform_into = cipher.decrypt_into if decrypt else cipher.encrypt_into
+    transform_number = cipher.decrypt_number if decrypt else cipher.encrypt_number
+    with open(path, "r+b") as f, mmap.mmap(f.fileno(), 0) as mapped:
+        with memoryview(mapped) as view:
+            for position in range(
+                start * record_length, stop * record_length, record_length
+            ):
+                for field in fields:
+                    offset = position + field.offset
+                    if field.kind == BYTES:
+                        transform_into(view, offset, field.length)
+                    else:
+                        end = offset + field.length
+                        n = transform_number(int.from_bytes(view[offset:end], "big"))
+                        view[offset:end] = n.to_bytes(field.length, "big")
+        mapped.flush()
@@ -1,4 +1,5 @@
-import math
+from array import array
+from typing import Callable, Iterable
 
 
 from feistel.utils import (
@@ -6,33 +7,81 @@ from feistel.utils import (
     add_bytes,
     Engine,
     extract,
-    H,
+    hasher,
     is_available_engine,
+    is_keyed_engine,
+    KeySchedule,
     NEUTRAL_BYTES,
     Readable,
     readable2bytearray,
-    split_bytes,
+    RoundFunction,
     string2bytearray,
     to_base256_readable,
-    xor_bytes,
+    xor_into,
 )
 
+# Names exported by the package
+__all__ = ["MAX_BATCH_ROUNDS", "FPECipher"]
+
+# Maximum number of round outputs memoized during a batch
+MAX_BATCH_ROUNDS = 1 << 16
+
+_LOW_BITS = [0, 0x7F, 0x7F7F, 0x7F7F7F, 0x7F7F7F7F]
+_MASKS = [0, 0xFF, 0xFFFF, 0xFFFFFF, 0xFFFFFFFF]
+
 
 class FPECipher:
+    __slots__ = (
+        "_engine",
+        "_key",
+        "_rounds",
+        "_schedule",
+        "_prf",
+        "_hash",
+        "_byte_rounds",
+    )
+
     def __init__(self, engine: Engine, key: str, rounds: int):
         """
         The FPECipher class is the latest entry point to the Feistel cipher lib providing full Format-Preserving Encryption.
         It makes use of one of the four hash algorithm added to the library (Blake-2b, Keccak, SHA-256 and SHA-3) to hash
         messages using the passed base key and at least 2 rounds.
+        Keyed engines (eg. HMAC-SHA256, keyed Blake-2b/2s, SHAKE128, AES or any registered one) are also available:
+        their output is used as it is in the rounds, so that they are cheaper but give different results.
         For optimal security, use a 256-bits key. And 10 rounds is a good start.
         Once instantiated, use the `encrypt()` or `decrypt()` methods on the `FPECipher` instance with the appropriate data.
         """
         assert (
             is_available_engine(engine) and key and rounds >= 2
         ), "FPECipherError: wrong arguments"
-        self.engine = engine
-        self.key = key
-        self.rounds = rounds
+        self._engine = engine
+        self._key = key
+        self._rounds = rounds
+        self._schedule = KeySchedule([key], rounds)
+        self._prf = RoundFunction(engine, key) if is_keyed_engine(engine) else None
+        self._hash = hasher(engine) if self._prf is None else None
+        self._byte_rounds: list[list[int]] | None = None
+
+    @property
+    def engine(self) -> Engine:
+        """
+        The hash or keyed engine of the rounds (read-only)
+        """
+        return self._engine
+
+    @property
+    def key(self) -> str:
+        """
+        The base key (read-only)
+        """
+        return self._key
+
+    @property
+    def rounds(self) -> int:
+        """
+        The number of rounds (read-only)
+        """
+        return self._rounds
 
     def encrypt(self, data: str) -> Readable:
         """
@@ -51,44 +100,45 @@ class FPECipher:
 
         NB: The returned byte array should be made readable if need be
         """
-        parts = split_bytes(bytes)
-
-        # Apply the FPE Feistel cipher
-        for i in range(0, self.rounds):
-            left = parts[1].copy()
-            if len(parts[1]) < len(parts[0]):
-                parts[1].extend(NEUTRAL_BYTES)
-            rnd = self._round_bytes(parts[1], i)
-            tmp = parts[0].copy()
-            crop = False
-            if len(tmp) + 1 == len(rnd):
-                tmp.extend(NEUTRAL_BYTES)
-                crop = True
-            right = xor_bytes(tmp, rnd)
-            if crop:
-                right = right[: len(right) - 1]
-            parts = [left, right]
-
-        return parts[0] + parts[1]
+        b = bytearray(bytes)
+        self.encrypt_into(b)
+        return b
 
-    def encrypt_number(self, n: int) -> int:
+    def encrypt_into(self, buffer, offset: int = 0, length: int | None = None) -> int:
         """
-        Obfuscate numbers
+        Obfuscate in place the `length` bytes (all the remaining ones by default) from `offset` of the passed writable
+        buffer (eg. a `bytearray`, `memoryview` or `mmap`), returning the number of obfuscated bytes.
+        The result is the same as `encrypt_bytes()` but nothing is allocated at each round but the hash.
+        """
+        return self._encrypt_view(_window(buffer, offset, length), self._round_bytes)
+
+    def encrypt_many(self, data: Iterable[str]) -> list[Readable]:
+        """
+        Obfuscate all the passed data at once, returning the results in the same order.
+        Duplicated values are only processed once and the round function is only evaluated once per distinct half-block
+        and round within the batch, so that values of the same length sharing their second half (eg. the domain of emails)
+        save the hash of their first round.
         """
-        if n < 128:
-            if n == 0:
-                return 0
-            b = n.to_bytes(2, "big")
-            string = b.decode()
-            return int.from_bytes(readable2bytearray(self.encrypt(string)), "big")
+        round_bytes = _memoized(self._round_bytes)
+        results = dict[str, Readable]()
 
-        size = math.ceil(math.log2(n) / 8)
-        bits = 8 if size > 4 else 4 if size > 2 else size
-        buf = n.to_bytes(bits, "big")
+        def encrypt(string: str) -> Readable:
+            found = results.get(string)
+            if found is None:
+                b = bytearray(string, "utf-8")
+                self._encrypt_view(memoryview(b), round_bytes)
+                found = results[string] = to_base256_readable(b)
+            return found
 
-        b = self.encrypt_bytes(bytearray(buf))
+        return [encrypt(string) for string in data]
 
-        return int.from_bytes(b, "big")
+    def encrypt_number(self, n: int) -> int:
+        """
+        Obfuscate numbers
+        """
+        if n == 0:
+            return 0
+        return self._encrypt_int(n, _encryption_width(n))
 
     def encrypt_number_as_string(self, n: str) -> str:
         """
@@ -97,6 +147,18 @@ class FPECipher:
         obfuscated = self.encrypt_number(int(n))
         return str(obfuscated).zfill(len(n))
 
+    def encrypt_numbers(self, numbers: Iterable[int]) -> list[int] | array:
+        """
+        Obfuscate all the passed numbers at once, returning the results in the same order.
+        If an `array` is passed (eg. `array('Q')` of unsigned 64-bit integers), an array of the same type is returned.
+        """
+        results = [
+            self._encrypt_int(n, _encryption_width(n)) if n != 0 else 0 for n in numbers
+        ]
+        return (
+            array(numbers.typecode, results) if isinstance(numbers, array) else results
+        )
+
     def encrypt_string(self, string: str) -> Readable:
         """
         Obfuscate strings
@@ -120,30 +182,37 @@ class FPECipher:
 
         NB: The returned byte array should be cast into a UTF-8 string or an integer if need be
         """
-        # Apply FPE Feistel cipher
-        left, right = split_bytes(bytes)
-        if self.rounds % 2 != 0 and len(left) != len(right):
-            left.extend([right[0]])
-            right = right[1:].copy()
-        for i in range(0, self.rounds):
-            leftRound = left.copy()
-            if len(left) < len(right):
-                leftRound.extend(NEUTRAL_BYTES)
-            rnd = self._round_bytes(leftRound, self.rounds - i - 1)
-            rightRound = right.copy()
-            extended = False
-            if len(rightRound) + 1 == len(rnd):
-                rightRound.extend([left[len(left) - 1]])
-                extended = True
-            if i == self.rounds - 1 and rightRound[len(rightRound) - 1] == 0:
-                extended = True
-            tmp = xor_bytes(rightRound, rnd)
-            right = left.copy()
-            if extended:
-                tmp = tmp[: len(tmp) - 1]
-            left = tmp.copy()
-
-        return left + right
+        b = bytearray(bytes)
+        n = self.decrypt_into(b)
+        return b[len(b) - n :]
+
+    def decrypt_into(self, buffer, offset: int = 0, length: int | None = None) -> int:
+        """
+        Deobfuscate in place the `length` bytes (all the remaining ones by default) from `offset` of the passed writable
+        buffer (eg. a `bytearray`, `memoryview` or `mmap`), returning the number of deobfuscated bytes.
+
+        NB: When `decrypt_bytes()` would return one byte less, the result is right-aligned in the window with a leading
+        zero byte (so that its integer value is kept) and the returned number is one less than `length`.
+        """
+        return self._decrypt_view(_window(buffer, offset, length), self._round_bytes)
+
+    def decrypt_many(self, obfuscated: Iterable[Readable]) -> list[str]:
+        """
+        Deobfuscate all the passed data at once, returning the results in the same order.
+        As with `encrypt_many()`, duplicated values and distinct half-blocks of each round are only processed once.
+        """
+        round_bytes = _memoized(self._round_bytes)
+        results = dict[str, str]()
+
+        def decrypt(readable: Readable) -> str:
+            found = results.get(readable)
+            if found is None:
+                b = readable2bytearray(readable)
+                n = self._decrypt_view(memoryview(b), round_bytes)
+                found = results[readable] = b[len(b) - n :].decode("utf-8")
+            return found
+
+        return [decrypt(readable) for readable in obfuscated]
 
     def decrypt_number(self, obfuscated: int) -> int:
         """
@@ -151,17 +220,7 @@ class FPECipher:
         """
         if obfuscated == 0:
             return 0
-        size = math.ceil(math.log2(obfuscated) / 8)
-        if size > 4:
-            buf = obfuscated.to_bytes(8, "big")
-        elif size > 2:
-            buf = obfuscated.to_bytes(4, "big")
-        else:
-            buf = obfuscated.to_bytes(2, "big")
-
-        b = self.decrypt_bytes(bytearray(buf))
-
-        return int.from_bytes(b, "big")
+        return self._decrypt_int(obfuscated, _decryption_width(obfuscated))
 
     def decrypt_number_as_string(self, n: str) -> str:
         """
@@ -170,21 +229,232 @@ class FPECipher:
         deobfuscated = self.decrypt_number(int(n))
         return str(deobfuscated).zfill(len(n))
 
+    def decrypt_numbers(self, obfuscated: Iterable[int]) -> list[int] | array:
+        """
+        Deobfuscate all the passed numbers at once, returning the results in the same order.
+        If an `array` is passed (eg. `array('Q')` of unsigned 64-bit integers), an array of the same type is returned.
+        """
+        results = [
+            self._decrypt_int(n, _decryption_width(n)) if n != 0 else 0
+            for n in obfuscated
+        ]
+        if isinstance(obfuscated, array):
+            return array(obfuscated.typecode, results)
+        return results
+
     def decrypt_string(self, obfuscated: str) -> str:
         """
         Deobfuscate strings
         """
         return self.decrypt(Readable(obfuscated))
 
+    def __reduce__(self):
+        # Rebuilt from its configuration, eg. in worker processes, as lazily loaded hashers are not picklable
+        return (type(self), (self._engine, self._key, self._rounds))
+
     # private methods
 
+    def _encrypt_view(self, view: memoryview, round_bytes: Callable) -> int:
+        n = len(view)
+        if n == 0:
+            return 0
+        half = n // 2
+        left, right = view[:half], view[half:]
+        scratch = bytearray(n - half + 1)
+
+        # Apply the FPE Feistel cipher, the halves being swapped by reference only
+        for i in range(0, self._rounds):
+            rnd = round_bytes(_padded(right, len(left), scratch), i)
+            xor_into(left, memoryview(rnd)[: len(left)])
+            left, right = right, left
+
+        if self._rounds % 2 != 0:
+            _rotate(view, half, scratch)
+        return n
+
+    def _decrypt_view(self, view: memoryview, round_bytes: Callable) -> int:
+        n = len(view)
+        if n == 0:
+            return 0
+        half = n // 2
+        if self._rounds % 2 != 0 and half != n - half:
+            half += 1
+        left, right = view[:half], view[half:]
+        scratch = bytearray(n - n // 2 + 1)
+
+        # Apply FPE Feistel cipher, the halves being swapped by reference only
+        truncated = False
+        for i in range(0, self._rounds):
+            rnd = round_bytes(_padded(left, len(right), scratch), self._rounds - i - 1)
+            if i == self._rounds - 1 and len(left) <= len(right):
+                truncated = right[len(right) - 1] == 0
+            xor_into(right, memoryview(rnd)[: len(right)])
+            left, right = right, left
+
+        if self._rounds % 2 != 0:
+            _rotate(view, half, scratch)
+        if truncated:
+            # Drop the last byte of the left part and right-align the result
+            size = len(left)
+            view[1:size] = view[: size - 1]
+            view[0] = 0
+            return n - 1
+        return n
+
     def _round(self, item: str, idx: int) -> str:
-        addition = add(item, extract(self.key, idx, len(item)))
-        hex_hashed = H(string2bytearray(addition), self.engine).hex()
+        addition = add(item, self._schedule.strings(len(item))[idx])
+        hex_hashed = self._hash(string2bytearray(addition)).hex()
         return extract(hex_hashed, idx, len(item))
 
     def _round_bytes(self, item: bytearray, idx: int) -> bytearray:
-        addition = add_bytes(item, string2bytearray(extract(self.key, idx, len(item))))
-        hashed = H(addition, self.engine)
+        if self._prf is not None:
+            return self._prf(item, idx, len(item))
+        addition = add_bytes(item, self._schedule.bytes(len(item))[idx])
+        hashed = self._hash(addition)
         extracted = extract(hashed.hex(), idx, len(item))
         return string2bytearray(extracted)
+
+    # Integer engine: the numbers are split in halves of at most 4 bytes processed as integers,
+    # giving the same results as `encrypt_bytes()` and `decrypt_bytes()` on their big-endian bytes
+
+    def _encrypt_int(self, n: int, width: int) -> int:
+        if width == 1:
+            # The left half is empty: only the odd rounds change the number, using a neutral byte as right half
+            if self._prf is None:
+                # Same failure as `add_bytes()` in the bytes path when a one-character round key (non-ASCII) is not one byte
+                assert all(
+                    len(key) == 1 for key in self._schedule.bytes(1)
+                ), "Error: to be added, byte arrays must be of the same length"
+            for i in range(1, self._rounds, 2):
+                n ^= self._round_byte(0, i)
+            return n
+        size = width // 2
+        left, right = n >> (8 * size), n & _MASKS[size]
+        if size == 1:
+            for i in range(0, self._rounds):
+                left, right = right, left ^ self._round_byte(right, i)
+        else:
+            keys = self._schedule.bytes(size)
+            for i in range(0, self._rounds):
+                left, right = right, left ^ self._round_int(right, size, keys[i], i)
+        return (left << (8 * size)) | right
+
+    def _decrypt_int(self, obfuscated: int, width: int) -> int:
+        size = width // 2
+        left, right = obfuscated >> (8 * size), obfuscated & _MASKS[size]
+        keys = self._schedule.bytes(size)
+        for i in range(0, self._rounds - 1):
+            idx = self._rounds - i - 1
+            rnd = (
+                self._round_byte(left, idx)
+                if size == 1
+                else self._round_int(left, size, keys[idx], idx)
+            )
+            left, right = right ^ rnd, left
+        rnd = (
+            self._round_byte(left, 0)
+            if size == 1
+            else self._round_int(left, size, keys[0], 0)
+        )
+        if right & 0xFF == 0:
+            # Same as `decrypt_bytes()`: the last byte of the left part is dropped
+            return ((right ^ rnd) >> 8 << (8 * size)) | left
+        return ((right ^ rnd) << (8 * size)) | left
+
+    def _round_byte(self, item: int, idx: int) -> int:
+        # Round function of 1-byte halves, memoized in a table of the 256 possible values per round
+        if self._byte_rounds is None:
+            self._byte_rounds = [[-1] * 256 for _ in range(self._rounds)]
+        table = self._byte_rounds[idx]
+        found = table[item]
+        if found < 0:
+            found = table[item] = self._round_int(
+                item, 1, self._schedule.bytes(1)[idx], idx
+            )
+        return found
+
+    def _round_int(self, item: int, size: int, key: bytes, idx: int) -> int:
+        if self._prf is not None:
+            return int.from_bytes(
+                self._prf(item.to_bytes(size, "big"), idx, size), "big"
+            )
+        assert (
+            len(key) == size
+        ), "Error: to be added, byte arrays must be of the same length"
+        # Byte-wise addition modulo 256 without carries between bytes (see `add_bytes()`)
+        k = int.from_bytes(key, "big")
+        low = _LOW_BITS[size]
+        added = ((item & low) + (k & low)) ^ ((item ^ k) & _MASKS[size] & ~low)
+        addition = added.to_bytes(size, "big").decode("latin-1").encode()
+        hex_hashed = self._hash(addition).hex()
+        return int.from_bytes(extract(hex_hashed, idx, size).encode(), "big")
+
+
+def _decryption_width(obfuscated: int) -> int:
+    if obfuscated < 0:
+        raise ValueError("math domain error")
+    size = ((obfuscated - 1).bit_length() + 7) // 8
+    width = 8 if size > 4 else 4 if size > 2 else 2
+    if obfuscated >= 1 << (8 * width):
+        raise OverflowError("int too big to convert")
+    return width
+
+
+def _encryption_width(n: int) -> int:
+    # Same as the byte size of the number rounded up to 1, 2, 4 or 8 bytes, except that numbers below 128 take 2 bytes
+    # and that 256, 65536 and 2^32 overflow their width
+    if n < 0:
+        raise OverflowError("can't convert negative int to unsigned")
+    if n < 128:
+        return 2
+    size = ((n - 1).bit_length() + 7) // 8
+    width = 8 if size > 4 else 4 if size > 2 else size
+    if n >= 1 << (8 * width):
+        raise OverflowError("int too big to convert")
+    return width
+
+
+def _memoized(round_bytes: Callable) -> Callable:
+    # Round function caching its outputs by half-block and round for the duration of a batch, up to `MAX_BATCH_ROUNDS`
+    memo = dict[tuple[bytes, int], bytes]()
+
+    def memoized(item: memoryview, idx: int) -> bytes:
+        key = (bytes(item), idx)
+        found = memo.get(key)
+        if found is None:
+            if len(memo) >= MAX_BATCH_ROUNDS:
+                memo.clear()
+            found = memo[key] = round_bytes(item, idx)
+        return found
+
+    return memoized
+
+
+def _padded(item: memoryview, length: int, scratch: bytearray) -> memoryview:
+    # Returns the item, or a copy of it in the scratch space extended with a neutral byte up to the passed length
+    if len(item) >= length:
+        return item
+    size = len(item)
+    scratch[:size] = item
+    scratch[size:length] = NEUTRAL_BYTES * (length - size)
+    return memoryview(scratch)[:length]
+
+
+def _rotate(view: memoryview, size: int, scratch: bytearray):
+    # Move the first `size` bytes of the view to its end
+    n = len(view)
+    scratch[:size] = view[:size]
+    view[: n - size] = view[size:]
+    view[n - size :] = memoryview(scratch)[:size]
+
+
+def _window(buffer, offset: int, length: int | None) -> memoryview:
+    view = memoryview(buffer).cast("B")
+    if view.readonly:
+        raise TypeError("FPECipherError: the buffer must be writable")
+    if length is None:
+        length = len(view) - offset
+    assert (
+        offset >= 0 and length >= 0 and offset + length <= len(view)
+    ), "FPECipherError: wrong arguments"
+    return view[offset : offset + length]
@@ -0,0 +1,151 @@
+from typing import Any
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+
+from feistel.fpe import FPECipher
+from feistel.parallel import apply_batch, DEFAULT_CHUNK_SIZE, ParallelCipher
+
+
+def encrypt_column(
+    cipher: Any,
+    values: Any,
+    numbers: bool = False,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Any:
+    """
+    Obfuscate a whole column, ie. a pandas `Series` or an Arrow `Array` or `ChunkedArray`, each distinct value being
+    encrypted only once.
+    Strings are returned as strings with the `FPECipher` and as binary with the other ciphers. With `numbers` (FPE only),
+    integers are obfuscated with `encrypt_number()` as unsigned 64-bit integers and strings with `encrypt_number_as_string()`.
+    Nulls are kept and the result is an Arrow array (or a `Series` backed by it for a `Series`).
+    If `workers` is set, the distinct values are processed by a `ParallelCipher` with that number of processes.
+
+    NB: This module requires the optional `pyarrow` dependency (and `pandas` for series), eg. `pip install feistel-py[arrow]`
+    """
+    return _transform(cipher, values, numbers, False, workers, chunk_size)
+
+
+def decrypt_column(
+    cipher: Any,
+    values: Any,
+    numbers: bool = False,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Any:
+    """
+    Deobfuscate a whole column (see `encrypt_column()`), each distinct value being decrypted only once
+    """
+    return _transform(cipher, values, numbers, True, workers, chunk_size)
+
+
+def obfuscate_frame(
+    cipher: Any,
+    frame: Any,
+    columns: list[str],
+    numbers: list[str] = [],
+    decrypt: bool = False,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Any:
+    """
+    Returns a copy of the passed pandas `DataFrame` or Arrow `Table` with the selected columns encrypted (or decrypted),
+    the values of the `numbers` columns being processed as numbers (FPE only)
+    """
+    assert len(columns) + len(numbers) > 0, "ObfuscateFrameError: wrong arguments"
+    names = list(frame.column_names if isinstance(frame, pa.Table) else frame.columns)
+    for column in columns + numbers:
+        if column not in names:
+            raise Exception(f"unknown column: {column}")
+    result = frame if isinstance(frame, pa.Table) else frame.copy(deep=False)
+    for column in columns + numbers:
+        number = column in numbers
+        if isinstance(result, pa.Table):
+            index = result.column_names.index(column)
+            processed = _transform(
+                cipher, result.column(index), number, decrypt, workers, chunk_size
+            )
+            result = result.set_column(index, column, processed)
+        else:
+            result[column] = _transform(
+                cipher, result[column], number, decrypt, workers, chunk_size
+            )
+    return result
+
+
+# Helpers
+
+
+def _transform(
+    cipher: Any,
+    values: Any,
+    numbers: bool,
+    decrypt: bool,
+    workers: int | None,
+    chunk_size: int,
+) -> Any:
+    series = None
+    if not isinstance(values, (pa.Array, pa.ChunkedArray)):
+        series = values
+        values = pa.array(series, from_pandas=True)
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+
+    # Categorical columns are already encoded, the other ones are encoded to get their distinct values
+    encoded = (
+        values if pa.types.is_dictionary(values.type) else pc.dictionary_encode(values)
+    )
+    distinct = encoded.dictionary
+    operation, output_type = _operation(cipher, distinct.type, numbers, decrypt)
+    results = _apply(cipher, operation, distinct.to_pylist(), workers, chunk_size)
+    if output_type == pa.binary():
+        results = [bytes(result) for result in results]
+    result = pa.array(results, output_type).take(encoded.indices)
+
+    if series is None:
+        return result
+    import pandas as pd
+
+    return pd.Series(
+        pd.arrays.ArrowExtensionArray(result), index=series.index, name=series.name
+    )
+
+
+def _operation(
+    cipher: Any, value_type: pa.DataType, numbers: bool, decrypt: bool
+) -> tuple[str, pa.DataType]:
+    # Returns the operation of the cipher to apply to values of the passed type and the type of its results
+    prefix = "decrypt" if decrypt else "encrypt"
+    strings = pa.types.is_string(value_type) or pa.types.is_large_string(value_type)
+    if numbers:
+        if not isinstance(cipher, FPECipher):
+            raise Exception("numbers are only supported by the FPE cipher")
+        if pa.types.is_integer(value_type):
+            return prefix + "_number", pa.uint64()
+        if strings:
+            return prefix + "_number_as_string", value_type
+    elif isinstance(cipher, FPECipher):
+        if strings:
+            return prefix, value_type
+    elif not decrypt and strings:
+        return prefix, pa.binary()
+    elif decrypt and (
+        pa.types.is_binary(value_type) or pa.types.is_large_binary(value_type)
+    ):
+        return prefix, pa.string()
+    raise Exception(f"invalid column type: {value_type}")
+
+
+def _apply(
+    cipher: Any,
+    operation: str,
+    values: list,
+    workers: int | None,
+    chunk_size: int,
+) -> list:
+    if workers is not None and workers > 1:
+        with ParallelCipher(cipher, workers, chunk_size) as parallel:
+            return list(parallel.map(operation, values))
+    return apply_batch(cipher, operation, values)
@@ -0,0 +1,290 @@
+import glob
+import hashlib
+import io
+import json
+import os
+import time
+from typing import Any, Callable, Iterable, Iterator
+
+from feistel.cache import fingerprint
+from feistel.parallel import DEFAULT_CHUNK_SIZE
+from feistel.stream import (
+    ColumnObfuscator,
+    CSV,
+    JSONL,
+    obfuscate_csv,
+    obfuscate_jsonl,
+)
+
+CHECKPOINTS = ".checkpoints"
+
+
+class BulkJob:
+    def __init__(
+        self,
+        partitions: list[str],
+        output: str,
+        cipher: Any,
+        columns: list[str],
+        numbers: list[str] = [],
+        old_cipher: Any = None,
+        decrypt: bool = False,
+        checkpoints: str | None = None,
+        workers: int | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress: Callable[[dict], Any] | None = None,
+        interval: float = 10.0,
+    ):
+        """
+        The BulkJob encrypts (or decrypts) the selected columns of a partitioned input, ie. a list of CSV or JSONL files,
+        each partition being streamed chunk by chunk through a `ColumnObfuscator` to the file of the same name in the
+        `output` directory.
+        If an `old_cipher` is passed, the values are re-keyed in one pass: decrypted with it, then encrypted with `cipher`.
+        Once a partition is written, a checkpoint is saved in the `checkpoints` directory (`output/.checkpoints` by default),
+        so that a restarted job skips the completed partitions. Outputs and checkpoints are written atomically.
+        If a `progress` callback is passed, it is called with the current metrics (see `BulkJob.metrics()`) at the end of
+        each partition and at most every `interval` seconds in between.
+
+        NB: A checkpoint is only valid for the same input file (size and modification time) and the same job configuration,
+        the ciphers being compared by their fingerprint (see `feistel.cache.fingerprint()`).
+        """
+        assert (
+            len(partitions) > 0
+            and len(columns) + len(numbers) > 0
+            and not (decrypt and old_cipher is not None)
+            and interval >= 0
+        ), "BulkJobError: wrong arguments"
+        names = [os.path.basename(partition) for partition in partitions]
+        if len(set(names)) != len(names):
+            raise Exception("partitions must have distinct file names")
+        self.partitions = partitions
+        self.output = output
+        self.cipher = cipher
+        self.columns = columns
+        self.numbers = numbers
+        self.old_cipher = old_cipher
+        self.decrypt = decrypt
+        self.checkpoints = checkpoints or os.path.join(output, CHECKPOINTS)
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.interval = interval
+        self._fingerprint = _fingerprint(
+            [cipher, old_cipher], columns, numbers, decrypt
+        )
+        self._metrics = dict[str, Any]()
+        self._last_progress = time.monotonic()
+
+    def run(self) -> dict:
+        """
+        Process all the partitions that were not completed yet, returning the final metrics
+        """
+        os.makedirs(self.output, exist_ok=True)
+        os.makedirs(self.checkpoints, exist_ok=True)
+        pending = [p for p in self.partitions if not self.is_completed(p)]
+        self._metrics = {
+            "partitions": len(self.partitions),
+            "skipped": len(self.partitions) - len(pending),
+            "completed": 0,
+            "rows": 0,
+            "bytes": 0,
+            "total_bytes": sum(os.path.getsize(p) for p in pending),
+            "start": time.monotonic(),
+        }
+        for partition in pending:
+            rows = self._process(partition)
+            self._metrics["completed"] += 1
+            self._save_checkpoint(partition, rows)
+            self._report()
+        if not pending:
+            self._report()
+        return self.metrics()
+
+    def metrics(self) -> dict:
+        """
+        Returns the progress of the current (or last) run: partitions, rows and bytes processed, rows per second and
+        estimated time to completion in seconds, based on the size of the remaining partitions
+        """
+        m = self._metrics
+        if not m:
+            return {}
+        elapsed = time.monotonic() - m["start"]
+        remaining = m["total_bytes"] - m["bytes"]
+        return {
+            "partitions": m["partitions"],
+            "skipped": m["skipped"],
+            "completed": m["completed"],
+            "rows": m["rows"],
+            "bytes": m["bytes"],
+            "total_bytes": m["total_bytes"],
+            "elapsed": elapsed,
+            "rows_per_sec": m["rows"] / elapsed if elapsed > 0 else 0.0,
+            "eta": (remaining * elapsed / m["bytes"] if m["bytes"] > 0 else None),
+        }
+
+    def is_completed(self, partition: str) -> bool:
+        """
+        Tell whether the passed partition was processed by this job, with its current content
+        """
+        try:
+            with open(self._checkpoint_path(partition), encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return False
+        stat = os.stat(partition)
+        return (
+            checkpoint.get("job") == self._fingerprint
+            and checkpoint.get("size") == stat.st_size
+            and checkpoint.get("mtime_ns") == stat.st_mtime_ns
+            and os.path.exists(self._output_path(partition))
+        )
+
+    # private methods
+
+    def _process(self, partition: str) -> int:
+        data_format = JSONL if partition.endswith(".jsonl") else CSV
+        target = self._output_path(partition)
+        done = self._metrics["bytes"]
+        obfuscators = self._obfuscators()
+        try:
+            with open(partition, "rb") as raw:
+                source = io.TextIOWrapper(raw, encoding="utf-8", newline="")
+                pipeline = _Pipeline(
+                    obfuscators, lambda rows: self._tick(rows, done + raw.tell())
+                )
+                with _atomic(target) as sink:
+                    if data_format == CSV:
+                        count = obfuscate_csv(pipeline, source, sink)
+                    else:
+                        count = obfuscate_jsonl(pipeline, source, sink)
+        finally:
+            for obfuscator in obfuscators:
+                obfuscator.close()
+        self._metrics["bytes"] = done + os.path.getsize(partition)
+        return count
+
+    def _obfuscators(self) -> list[ColumnObfuscator]:
+        if self.old_cipher is not None:
+            return [
+                self._obfuscator(self.old_cipher, True),
+                self._obfuscator(self.cipher, False),
+            ]
+        return [self._obfuscator(self.cipher, self.decrypt)]
+
+    def _obfuscator(self, cipher: Any, decrypt: bool) -> ColumnObfuscator:
+        return ColumnObfuscator(
+            cipher,
+            self.columns,
+            self.numbers,
+            decrypt,
+            self.workers,
+            self.chunk_size,
+        )
+
+    def _tick(self, rows: int, position: int):
+        self._metrics["rows"] += rows
+        self._metrics["bytes"] = position
+        if time.monotonic() - self._last_progress >= self.interval:
+            self._report()
+
+    def _report(self):
+        self._last_progress = time.monotonic()
+        if self.progress is not None:
+            self.progress(self.metrics())
+
+    def _save_checkpoint(self, partition: str, rows: int):
+        stat = os.stat(partition)
+        checkpoint = {
+            "partition": partition,
+            "job": self._fingerprint,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "rows": rows,
+            "completed_at": time.time(),
+        }
+        with _atomic(self._checkpoint_path(partition)) as f:
+            json.dump(checkpoint, f)
+
+    def _checkpoint_path(self, partition: str) -> str:
+        return os.path.join(self.checkpoints, os.path.basename(partition) + ".json")
+
+    def _output_path(self, partition: str) -> str:
+        return os.path.join(self.output, os.path.basename(partition))
+
+
+def list_partitions(path: str) -> list[str]:
+    """
+    Returns the sorted CSV and JSONL files of the passed directory, or the files matching the passed glob pattern
+    """
+    if os.path.isdir(path):
+        return sorted(
+            os.path.join(path, name)
+            for name in os.listdir(path)
+            if name.endswith(".csv") or name.endswith(".jsonl")
+        )
+    return sorted(p for p in glob.glob(path) if os.path.isfile(p))
+
+
+def format_metrics(metrics: dict) -> str:
+    """
+    Returns a one-line human-readable summary of the passed metrics (see `BulkJob.metrics()`)
+    """
+    eta = metrics["eta"]
+    return (
+        f"{metrics['completed'] + metrics['skipped']}/{metrics['partitions']} partitions"
+        f" ({metrics['skipped']} skipped), {metrics['rows']} rows,"
+        f" {metrics['rows_per_sec']:.0f} rows/s,"
+        f" ETA {'-' if eta is None else f'{eta:.0f}s'}"
+    )
+
+
+class _Pipeline:
+    # Chains the obfuscators of a job (eg. decryption with the old key, then encryption with the new one),
+    # counting the processed rows
+    def __init__(self, obfuscators: list[ColumnObfuscator], tick: Callable[[int], Any]):
+        self.columns = obfuscators[0].columns
+        self.numbers = obfuscators[0].numbers
+        self._obfuscators = obfuscators
+        self._tick = tick
+
+    def transform(self, rows: Iterable[dict]) -> Iterator[dict]:
+        for obfuscator in self._obfuscators:
+            rows = obfuscator.transform(rows)
+        count = 0
+        for row in rows:
+            yield row
+            count += 1
+            if count == self._obfuscators[0].chunk_size:
+                self._tick(count)
+                count = 0
+        self._tick(count)
+
+
+class _atomic:
+    # Text file written to a temporary file, then renamed over the target on success only
+    def __init__(self, path: str):
+        self.path = path
+        self._tmp = f"{path}.{os.getpid()}.tmp"
+
+    def __enter__(self):
+        self._file = open(self._tmp, "w", encoding="utf-8", newline="")
+        return self._file
+
+    def __exit__(self, exc_type, *args):
+        if exc_type is not None:
+            self._file.close()
+            os.remove(self._tmp)
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self._tmp, self.path)
+
+
+def _fingerprint(
+    ciphers: list[Any], columns: list[str], numbers: list[str], decrypt: bool
+) -> str:
+    # Digest of the configuration of a job, the ciphers being identified as in a shared result cache
+    config = [fingerprint(cipher) if cipher is not None else None for cipher in ciphers]
+    payload = json.dumps([config, columns, numbers, decrypt])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -0,0 +1,147 @@
+from collections import deque
+from itertools import islice
+import os
+from typing import Any, Iterable, Iterator, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor, Future
+
+# Names exported by the package
+__all__ = ["ParallelCipher"]
+
+DEFAULT_CHUNK_SIZE = 1000
+
+# Batch methods of the ciphers, by operation
+BATCH_OPERATIONS = {
+    "encrypt": "encrypt_many",
+    "decrypt": "decrypt_many",
+    "encrypt_number": "encrypt_numbers",
+    "decrypt_number": "decrypt_numbers",
+}
+
+# Cipher of the current worker process, set once by the pool initializer
+_worker_cipher = None
+
+
+class ParallelCipher:
+    def __init__(
+        self,
+        cipher: Any,
+        workers: int | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        min_parallel: int | None = None,
+    ):
+        """
+        The ParallelCipher spreads the work of a cipher (`Cipher`, `CustomCipher` or `FPECipher`) over a pool of processes.
+        The cipher configuration is sent once to each worker, then the values are streamed in chunks of `chunk_size` items
+        and the results are returned in the original order.
+        Inputs with less than `min_parallel` values (two chunks per worker by default) are processed in the current process.
+        Use it as a context manager or call `close()` to shut the pool down.
+        """
+        workers = workers if workers is not None else os.cpu_count() or 1
+        assert workers >= 1 and chunk_size >= 1, "ParallelCipherError: wrong arguments"
+        self.cipher = cipher
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.min_parallel = (
+            min_parallel if min_parallel is not None else 2 * workers * chunk_size
+        )
+        self._pool: "Executor | None" = None
+
+    def map(self, operation: str, values: Iterable) -> Iterator:
+        """
+        Apply the passed operation of the cipher (eg. `encrypt` or `decrypt_number_as_string`) to all the values,
+        yielding the results in order
+        """
+        fn = getattr(self.cipher, operation)
+        values = iter(values)
+        head = list(islice(values, self.min_parallel))
+        if self.workers == 1 or len(head) < self.min_parallel:
+            yield from map(fn, head)
+            yield from map(fn, values)
+            return
+
+        pending = deque["Future"]()
+        for chunk in _chunks(head, values, self.chunk_size):
+            pending.append(self._executor().submit(_run_chunk, operation, chunk))
+            if len(pending) >= 2 * self.workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+    def encrypt_many(self, data: Iterable) -> list:
+        """
+        Obfuscate all the passed data in parallel, returning the results in the same order
+        """
+        return list(self.map("encrypt", data))
+
+    def decrypt_many(self, obfuscated: Iterable) -> list:
+        """
+        Deobfuscate all the passed data in parallel, returning the results in the same order
+        """
+        return list(self.map("decrypt", obfuscated))
+
+    def encrypt_numbers(self, numbers: Iterable[int]) -> list[int]:
+        """
+        Obfuscate all the passed numbers in parallel (FPE only), returning the results in the same order
+        """
+        return list(self.map("encrypt_number", numbers))
+
+    def decrypt_numbers(self, obfuscated: Iterable[int]) -> list[int]:
+        """
+        Deobfuscate all the passed numbers in parallel (FPE only), returning the results in the same order
+        """
+        return list(self.map("decrypt_number", obfuscated))
+
+    def close(self):
+        """
+        Shut the pool of processes down
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    # private methods
+
+    def _executor(self) -> "Executor":
+        if self._pool is None:
+            # Imported when needed only, as it pulls multiprocessing and logging in
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._pool = ProcessPoolExecutor(
+                self.workers, initializer=_init_worker, initargs=(self.cipher,)
+            )
+        return self._pool
+
+
+def apply_batch(cipher: Any, operation: str, values: list) -> list:
+    """
+    Apply the passed operation of the cipher to all the values, at once through its batch method if it has one
+    (eg. `encrypt_many()` for `encrypt`, which shares the work between the values), returning the results in order
+    """
+    batch = getattr(cipher, BATCH_OPERATIONS.get(operation, ""), None)
+    if batch is not None:
+        return list(batch(values))
+    return [getattr(cipher, operation)(value) for value in values]
+
+
+def _init_worker(cipher: Any):
+    global _worker_cipher
+    _worker_cipher = cipher
+
+
+def _run_chunk(operation: str, chunk: list) -> list:
+    return apply_batch(_worker_cipher, operation, chunk)
+
+
+def _chunks(head: list, tail: Iterator, size: int) -> Iterator[list]:
+    for start in range(0, len(head), size):
+        yield head[start : start + size]
+    while chunk := list(islice(tail, size)):
+        yield chunk
@@ -0,0 +1,216 @@
+from array import array
+import threading
+import time
+from typing import Any, Callable
+
+CONVERSION = "conversion"
+FEISTEL = "feistel"
+HASH = "hash"
+ROUND = "round"
+
+STAGES = [HASH, ROUND, FEISTEL, CONVERSION]
+
+# Methods of the ciphers timed by stage, the public operations being timed as conversions
+_HASH_SLOTS = ["_hash", "_prf"]
+_ROUND_SLOTS = ["_round", "_round_bytes", "_round_int"]
+_FEISTEL_SLOTS = [
+    "encrypt_bytes",
+    "decrypt_bytes",
+    "encrypt_into",
+    "decrypt_into",
+    "_encrypt_int",
+    "_decrypt_int",
+    "_encrypt_view",
+    "_decrypt_view",
+    "_permute",
+    "_invert",
+]
+
+_PROFILED_CLASSES = dict[type, type]()
+
+
+class Profiler:
+    def __init__(
+        self,
+        exporter: Callable[[dict], Any] | None = None,
+        interval: float = 10.0,
+    ):
+        """
+        The Profiler records the calls, processed bytes and time spent in each stage of the ciphers it instruments:
+        - `hash`: the hash function (or keyed engine) of the rounds;
+        - `round`: the rest of the round function, ie. the addition of the round key and the extraction of the hash;
+        - `feistel`: the rest of the network on bytes or integers, ie. the XOR and the swaps of the halves;
+        - `conversion`: the rest of the operations, ie. the conversions from and to strings, base256 or hexadecimal.
+        Each stage is only charged its own time, excluding the stages it calls.
+        If an `exporter` is passed, it is called with the current stats at most every `interval` seconds.
+
+        NB: Instrumentation is opt-in and applies to a copy of the cipher, so that other instances run at full speed.
+        """
+        assert interval >= 0, "ProfilerError: wrong arguments"
+        self.exporter = exporter
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._last_export = time.monotonic()
+        self.reset()
+
+    def instrument(self, cipher: Any) -> Any:
+        """
+        Returns a copy of the passed cipher (`Cipher`, `CustomCipher`, `FPECipher` or `RadixCipher`) whose operations are profiled
+        """
+        profiled = _copy(cipher)
+        for name in dir(cipher):
+            if name.startswith("encrypt") or name.startswith("decrypt"):
+                stage = FEISTEL if name in _FEISTEL_SLOTS else CONVERSION
+                self._wrap(profiled, name, stage, True)
+        for name in _FEISTEL_SLOTS:
+            if name.startswith("_"):
+                self._wrap(profiled, name, FEISTEL, False)
+        for name in _ROUND_SLOTS:
+            self._wrap(profiled, name, ROUND, False)
+        for name in _HASH_SLOTS:
+            self._wrap(profiled, name, HASH, False)
+        return profiled
+
+    def stats(self) -> dict:
+        """
+        Returns the counters of the profiled operations and stages, times being in seconds
+        """
+        with self._lock:
+            return {
+                "operations": {
+                    name: dict(counters, time=counters["time"] / 1e9)
+                    for name, counters in self._operations.items()
+                },
+                "stages": {
+                    stage: dict(counters, time=counters["time"] / 1e9)
+                    for stage, counters in self._stages.items()
+                },
+                "time": sum(c["time"] for c in self._operations.values()) / 1e9,
+            }
+
+    def reset(self):
+        """
+        Reset all the counters
+        """
+        with self._lock:
+            self._operations = dict[str, dict[str, int]]()
+            self._stages = {stage: {"calls": 0, "time": 0} for stage in STAGES}
+
+    def export(self):
+        """
+        Pass the current stats to the exporter, if any
+        """
+        self._last_export = time.monotonic()
+        if self.exporter is not None:
+            self.exporter(self.stats())
+
+    # private methods
+
+    def _wrap(self, cipher: Any, name: str, stage: str, public: bool):
+        fn = getattr(cipher, name, None)
+        if not callable(fn):
+            return
+        local = self._local
+
+        def timed(*args, **kwargs):
+            stack = getattr(local, "stack", None)
+            if stack is None:
+                stack = local.stack = []
+            outer = public and len(stack) == 0
+            stack.append(0)
+            start = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter_ns() - start
+                children = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                self._record(stage, elapsed - children)
+                if outer:
+                    self._record_operation(name, args, elapsed)
+
+        setattr(cipher, name, timed)
+
+    def _record(self, stage: str, elapsed: int):
+        with self._lock:
+            counters = self._stages[stage]
+            counters["calls"] += 1
+            counters["time"] += elapsed
+
+    def _record_operation(self, name: str, args: tuple, elapsed: int):
+        items, size = _measure(args[0]) if args else (0, 0)
+        with self._lock:
+            counters = self._operations.get(name)
+            if counters is None:
+                counters = self._operations[name] = {
+                    "calls": 0,
+                    "items": 0,
+                    "bytes": 0,
+                    "time": 0,
+                }
+            counters["calls"] += 1
+            counters["items"] += items
+            counters["bytes"] += size
+            counters["time"] += elapsed
+        if (
+            self.exporter is not None
+            and time.monotonic() - self._last_export >= self.interval
+        ):
+            self.export()
+
+
+def _copy(cipher: Any) -> Any:
+    # Copy of the cipher as an instance of a subclass with a `__dict__`, so that its methods may be overridden
+    # even though the ciphers use `__slots__`
+    cls = type(cipher)
+    profiled_cls = _PROFILED_CLASSES.get(cls)
+    if profiled_cls is None:
+        profiled_cls = _PROFILED_CLASSES[cls] = type(
+            cls.__name__, (cls,), {"__module__": cls.__module__}
+        )
+    profiled = object.__new__(profiled_cls)
+    for klass in cls.__mro__:
+        for name in getattr(klass, "__slots__", []):
+            if hasattr(cipher, name):
+                setattr(profiled, name, getattr(cipher, name))
+    profiled.__dict__.update(getattr(cipher, "__dict__", {}))
+    return profiled
+
+
+def format_stats(stats: dict) -> str:
+    """
+    Returns a human-readable breakdown of the passed stats (see `Profiler.stats()`)
+    """
+    total = stats["time"]
+    lines = [
+        f"{'operation':<28}{'calls':>10}{'items':>10}{'bytes':>12}{'time (s)':>12}"
+    ]
+    for name, counters in sorted(stats["operations"].items()):
+        lines.append(
+            f"{name:<28}{counters['calls']:>10}{counters['items']:>10}"
+            f"{counters['bytes']:>12}{counters['time']:>12.6f}"
+        )
+    lines.append("")
+    lines.append(f"{'stage':<28}{'calls':>10}{'time (s)':>22}{'share':>12}")
+    for stage in STAGES:
+        counters = stats["stages"][stage]
+        share = counters["time"] / total if total > 0 else 0
+        lines.append(
+            f"{stage:<28}{counters['calls']:>10}{counters['time']:>22.6f}{share:>12.1%}"
+        )
+    return "\n".join(lines)
+
+
+def _measure(value: Any) -> tuple[int, int]:
+    # Returns the number of items and bytes of an operation argument
+    if isinstance(value, (str, bytes, bytearray, memoryview)):
+        return 1, len(value)
+    if isinstance(value, int):
+        return 1, max(1, (value.bit_length() + 7) // 8)
+    if isinstance(value, (list, tuple, array)):
+        measured = [_measure(item) for item in value]
+        return sum(m[0] for m in measured), sum(m[1] for m in measured)
+    # Other iterables are consumed by the operation
+    return 0, 0
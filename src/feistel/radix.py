@@ -0,0 +1,203 @@
+from functools import lru_cache
+import string
+from typing import Iterable
+
+
+from feistel.utils import (
+    Engine,
+    hasher,
+    is_available_engine,
+    is_keyed_engine,
+    RoundFunction,
+)
+
+# Names exported by the package
+__all__ = ["ALPHANUMERIC", "DIGITS", "HEX", "RadixCipher"]
+
+ALPHANUMERIC = string.digits + string.ascii_lowercase + string.ascii_uppercase
+DIGITS = string.digits
+HEX = string.digits + "abcdef"
+
+
+class RadixCipher:
+    __slots__ = (
+        "_engine",
+        "_key",
+        "_rounds",
+        "_alphabet",
+        "_prf",
+        "_hash",
+        "_prefixes",
+        "_indexes",
+    )
+
+    def __init__(self, engine: Engine, key: str, rounds: int, alphabet: str = DIGITS):
+        """
+        The RadixCipher provides format-preserving encryption of strings made of the characters of the passed alphabet
+        (eg. `DIGITS`, `HEX`, `ALPHANUMERIC` or any custom charset): digits stay digits, hex stays hex, and the length is kept.
+        A string of length n is read as a number in the domain of the alphabet size to the power of n, which is obfuscated
+        with a Feistel network on the smallest number of bits covering the domain and cycle-walked back into it.
+        The rounds use the passed engine (hash or keyed) and the network is exactly invertible.
+        """
+        assert (
+            is_available_engine(engine)
+            and key
+            and rounds >= 2
+            and len(alphabet) >= 2
+            and len(set(alphabet)) == len(alphabet)
+        ), "RadixCipherError: wrong arguments"
+        self._engine = engine
+        self._key = key
+        self._rounds = rounds
+        self._alphabet = alphabet
+        self._prf = RoundFunction(engine, key) if is_keyed_engine(engine) else None
+        self._hash = hasher(engine) if self._prf is None else None
+        self._prefixes = [
+            idx.to_bytes(4, "big") + key.encode() for idx in range(rounds)
+        ]
+        self._indexes = {char: idx for idx, char in enumerate(alphabet)}
+
+    @property
+    def engine(self) -> Engine:
+        """
+        The hash or keyed engine of the rounds (read-only)
+        """
+        return self._engine
+
+    @property
+    def key(self) -> str:
+        """
+        The base key (read-only)
+        """
+        return self._key
+
+    @property
+    def rounds(self) -> int:
+        """
+        The number of rounds (read-only)
+        """
+        return self._rounds
+
+    @property
+    def alphabet(self) -> str:
+        """
+        The characters of the strings (read-only)
+        """
+        return self._alphabet
+
+    def encrypt(self, data: str) -> str:
+        """
+        Obfuscate the passed string into a string of the same length and alphabet
+        """
+        domain = self._domain(len(data))
+        value = self._permute(self._to_int(data), domain)
+        while value >= domain.size:
+            # Cycle-walking
+            value = self._permute(value, domain)
+        return self._to_string(value, len(data))
+
+    def encrypt_many(self, data: Iterable[str]) -> list[str]:
+        """
+        Obfuscate all the passed strings at once, returning the results in the same order
+        """
+        return [self.encrypt(item) for item in data]
+
+    def decrypt(self, obfuscated: str) -> str:
+        """
+        Deobfuscate the passed string
+        """
+        domain = self._domain(len(obfuscated))
+        value = self._invert(self._to_int(obfuscated), domain)
+        while value >= domain.size:
+            value = self._invert(value, domain)
+        return self._to_string(value, len(obfuscated))
+
+    def decrypt_many(self, obfuscated: Iterable[str]) -> list[str]:
+        """
+        Deobfuscate all the passed strings at once, returning the results in the same order
+        """
+        return [self.decrypt(item) for item in obfuscated]
+
+    def __reduce__(self):
+        # Rebuilt from its configuration, eg. in worker processes, as lazily loaded hashers are not picklable
+        return (type(self), (self._engine, self._key, self._rounds, self._alphabet))
+
+    # private methods
+
+    def _domain(self, length: int) -> "_Domain":
+        return _domain(len(self._alphabet), length)
+
+    def _permute(self, value: int, domain: "_Domain") -> int:
+        left_bits, right_bits = domain.left, domain.right
+        left, right = value >> right_bits, value & ((1 << right_bits) - 1)
+        for i in range(0, self._rounds):
+            rnd = self._round(right, right_bits, left_bits, i, domain.tweak)
+            left, right = right, left ^ rnd
+            left_bits, right_bits = right_bits, left_bits
+        return (left << right_bits) | right
+
+    def _invert(self, value: int, domain: "_Domain") -> int:
+        if self._rounds % 2 == 0:
+            left_bits, right_bits = domain.left, domain.right
+        else:
+            left_bits, right_bits = domain.right, domain.left
+        left, right = value >> right_bits, value & ((1 << right_bits) - 1)
+        for i in range(self._rounds - 1, -1, -1):
+            rnd = self._round(left, left_bits, right_bits, i, domain.tweak)
+            left, right = right ^ rnd, left
+            left_bits, right_bits = right_bits, left_bits
+        return (left << right_bits) | right
+
+    def _round(
+        self, item: int, in_bits: int, out_bits: int, idx: int, tweak: bytes
+    ) -> int:
+        if out_bits == 0:
+            return 0
+        size = (out_bits + 7) // 8
+        msg = tweak + item.to_bytes((in_bits + 7) // 8, "big")
+        if self._prf is not None:
+            output = self._prf(msg, idx, size)
+        else:
+            output = b""
+            counter = 0
+            while len(output) < size:
+                block = self._prefixes[idx] + counter.to_bytes(4, "big") + msg
+                output += self._hash(block)
+                counter += 1
+        return int.from_bytes(output[:size], "big") & ((1 << out_bits) - 1)
+
+    def _to_int(self, data: str) -> int:
+        radix = len(self._alphabet)
+        value = 0
+        try:
+            for char in data:
+                value = value * radix + self._indexes[char]
+        except KeyError as e:
+            raise ValueError(f"invalid character for the alphabet: {e.args[0]}")
+        return value
+
+    def _to_string(self, value: int, length: int) -> str:
+        radix = len(self._alphabet)
+        chars = [self._alphabet[0]] * length
+        for position in range(length - 1, -1, -1):
+            value, digit = divmod(value, radix)
+            chars[position] = self._alphabet[digit]
+        return "".join(chars)
+
+
+@lru_cache(maxsize=256)
+def _domain(radix: int, length: int) -> "_Domain":
+    # Domains shared by all the ciphers, the most recently used lengths being kept
+    return _Domain(radix, length)
+
+
+class _Domain:
+    # Number of values for a string length, and bits of the halves of the Feistel network covering them
+    __slots__ = ("size", "left", "right", "tweak")
+
+    def __init__(self, radix: int, length: int):
+        self.size = radix**length
+        bits = (self.size - 1).bit_length()
+        self.left = bits // 2
+        self.right = bits - self.left
+        self.tweak = length.to_bytes(4, "big") + radix.to_bytes(4, "big")
@@ -0,0 +1,263 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import json
+import os
+import struct
+from typing import Any
+
+from feistel.cipher import Cipher
+from feistel.custom import CustomCipher
+from feistel.fpe import FPECipher
+from feistel.parallel import apply_batch
+from feistel.utils import is_available_engine, SHA_256
+
+CUSTOM = "custom"
+FEISTEL = "feistel"
+FPE = "fpe"
+
+DEFAULT_MAX_PIPELINE = 64
+FRAME_HEADER = struct.Struct(">I")
+MAX_FRAME_SIZE = 64 << 20
+OPERATIONS = [
+    "encrypt",
+    "decrypt",
+    "encrypt_number",
+    "decrypt_number",
+    "encrypt_number_as_string",
+    "decrypt_number_as_string",
+]
+
+# Ciphers of the current worker process, set once by the pool initializer
+_worker_profiles = None
+
+
+class Server:
+    def __init__(
+        self,
+        profiles: dict[str, Any],
+        workers: int | None = None,
+        max_pipeline: int = DEFAULT_MAX_PIPELINE,
+    ):
+        """
+        The Server keeps the ciphers of the passed profiles (name -> cipher) warm and serves batches of values
+        over a Unix or TCP socket.
+        Requests are processed by a pool of `workers` processes (one per core by default), each one receiving
+        the ciphers once, or by a thread of the current process if `workers` is `0`.
+        Each connection may pipeline up to `max_pipeline` requests, responses being sent as soon as they are ready.
+
+        The protocol exchanges frames made of a 4-byte big-endian length followed by a UTF-8 JSON object:
+        - request: `{"id": 1, "profile": "users", "op": "encrypt", "values": ["a", "b"]}`;
+        - response: `{"id": 1, "values": [...]}` or `{"id": 1, "error": "..."}`.
+        With the `feistel` and `custom` ciphers, obfuscated values are passed as hexadecimal strings.
+        """
+        workers = workers if workers is not None else os.cpu_count() or 1
+        assert (
+            len(profiles) > 0 and workers >= 0 and max_pipeline >= 1
+        ), "ServerError: wrong arguments"
+        self.profiles = profiles
+        self.workers = workers
+        self.max_pipeline = max_pipeline
+        self._executor: Executor | None = None
+        self._server: asyncio.AbstractServer | None = None
+        self._connections = set[asyncio.Task]()
+
+    async def start(self, address: str) -> asyncio.AbstractServer:
+        """
+        Start listening on the passed address, ie. `unix:<path>` or `<host>:<port>`
+        """
+        if self._executor is None:
+            self._executor = (
+                ProcessPoolExecutor(
+                    self.workers, initializer=_init_worker, initargs=(self.profiles,)
+                )
+                if self.workers > 0
+                else ThreadPoolExecutor(1)
+            )
+        target = parse_address(address)
+        if isinstance(target, str):
+            self._server = await asyncio.start_unix_server(self._handle, target)
+        else:
+            self._server = await asyncio.start_server(self._handle, *target)
+        return self._server
+
+    async def serve_forever(self, address: str):
+        """
+        Listen on the passed address until cancelled
+        """
+        server = await self.start(address)
+        try:
+            await server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        """
+        Stop listening, close the open connections and shut the workers down
+        """
+        if self._server is not None:
+            self._server.close()
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        self.close()
+
+    def close(self):
+        """
+        Stop listening and shut the workers down
+        """
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    # private methods
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connection = asyncio.current_task()
+        self._connections.add(connection)
+        inflight = asyncio.Semaphore(self.max_pipeline)
+        pending = set[asyncio.Task]()
+        try:
+            while payload := await read_frame(reader):
+                await inflight.acquire()
+                task = asyncio.create_task(self._reply(payload, writer, inflight))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            writer.close()
+            self._connections.discard(connection)
+
+    async def _reply(
+        self, payload: bytes, writer: asyncio.StreamWriter, inflight: asyncio.Semaphore
+    ):
+        loop = asyncio.get_running_loop()
+        try:
+            if self.workers > 0:
+                response = await loop.run_in_executor(
+                    self._executor, _respond_in_worker, payload
+                )
+            else:
+                response = await loop.run_in_executor(
+                    self._executor, respond, self.profiles, payload
+                )
+            writer.write(FRAME_HEADER.pack(len(response)) + response)
+            await writer.drain()
+        finally:
+            inflight.release()
+
+
+def build_profiles(config: dict) -> dict[str, Any]:
+    """
+    Returns the ciphers of the passed configuration, eg.
+    `{"users": {"cipher": "fpe", "key": "...", "engine": "sha-256", "rounds": 10}}`.
+    The keys of a `custom` cipher are passed as a list.
+    """
+    profiles = dict[str, Any]()
+    for name, profile in config.items():
+        cipher_type = profile.get("cipher", FPE)
+        key = profile.get("key")
+        if not key:
+            raise Exception(f"missing mandatory key in profile: {name}")
+        rounds = int(profile.get("rounds", 10))
+        if cipher_type == FPE:
+            engine = profile.get("engine", SHA_256)
+            if not is_available_engine(engine):
+                raise Exception(f"unknown hash algorithm in profile: {name}")
+            profiles[name] = FPECipher(engine, key, rounds)
+        elif cipher_type == FEISTEL:
+            profiles[name] = Cipher(key, rounds)
+        elif cipher_type == CUSTOM:
+            profiles[name] = CustomCipher(key if isinstance(key, list) else [key])
+        else:
+            raise Exception(f"invalid cipher in profile: {name}")
+    return profiles
+
+
+def load_profiles(path: str) -> dict[str, Any]:
+    """
+    Returns the ciphers of the passed JSON configuration file (see `build_profiles()`)
+    """
+    with open(path) as f:
+        return build_profiles(json.load(f))
+
+
+def parse_address(address: str) -> str | tuple[str, int]:
+    """
+    Returns the path of a `unix:<path>` address, or the host and port of a `<host>:<port>` address
+    """
+    if address.startswith("unix:"):
+        return address[len("unix:") :]
+    host, separator, port = address.rpartition(":")
+    if not separator or not port.isdigit():
+        raise Exception(f"invalid address: {address}")
+    return (host or "localhost", int(port))
+
+
+async def read_frame(reader: asyncio.StreamReader) -> bytes:
+    """
+    Returns the payload of the next frame, or empty bytes at the end of the stream
+    """
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if len(e.partial) == 0:
+            return b""
+        raise
+    (size,) = FRAME_HEADER.unpack(header)
+    if size == 0 or size > MAX_FRAME_SIZE:
+        raise ValueError(f"invalid frame size: {size}")
+    return await reader.readexactly(size)
+
+
+def respond(profiles: dict[str, Any], payload: bytes) -> bytes:
+    """
+    Process the passed request frame against the profiles and return the response frame
+    """
+    request_id = None
+    try:
+        request = json.loads(payload)
+        request_id = request.get("id")
+        cipher = profiles.get(request.get("profile"))
+        if cipher is None:
+            raise Exception("unknown profile")
+        operation = request.get("op")
+        if operation not in OPERATIONS:
+            raise Exception("invalid operation")
+        values = request.get("values")
+        if not isinstance(values, list):
+            raise Exception("invalid values")
+
+        if not isinstance(cipher, FPECipher) and operation not in [
+            "encrypt",
+            "decrypt",
+        ]:
+            raise Exception("numbers are only supported by the FPE cipher")
+        if isinstance(cipher, FPECipher):
+            results = apply_batch(cipher, operation, values)
+        elif operation == "encrypt":
+            results = [
+                result.hex() for result in apply_batch(cipher, operation, values)
+            ]
+        else:
+            results = apply_batch(
+                cipher, operation, [bytes.fromhex(value) for value in values]
+            )
+        response = {"id": request_id, "values": results}
+    except Exception as e:
+        response = {"id": request_id, "error": str(e) or type(e).__name__}
+    return json.dumps(response, ensure_ascii=False).encode()
+
+
+def _init_worker(profiles: dict[str, Any]):
+    global _worker_profiles
+    _worker_profiles = profiles
+
+
+def _respond_in_worker(payload: bytes) -> bytes:
+    return respond(_worker_profiles, payload)
@@ -0,0 +1,150 @@
+import csv
+import json
+from itertools import islice
+from typing import Any, Iterable, Iterator, TextIO
+
+from feistel.fpe import FPECipher
+from feistel.parallel import apply_batch, DEFAULT_CHUNK_SIZE, ParallelCipher
+
+CSV = "csv"
+JSONL = "jsonl"
+
+
+class ColumnObfuscator:
+    def __init__(
+        self,
+        cipher: Any,
+        columns: list[str],
+        numbers: list[str] = [],
+        decrypt: bool = False,
+        workers: int | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        """
+        The ColumnObfuscator encrypts (or decrypts) the selected columns of a stream of rows, chunk by chunk.
+        Values of the `numbers` columns go through `encrypt_number_as_string()` (or `encrypt_number()` for integers)
+        to preserve their format, which requires an `FPECipher`.
+        With the other ciphers, obfuscated values are written as hexadecimal strings.
+        If `workers` is set, each chunk is processed by a `ParallelCipher` with that number of processes.
+        """
+        assert (
+            len(columns) + len(numbers) > 0 and chunk_size >= 1
+        ), "ColumnObfuscatorError: wrong arguments"
+        if len(numbers) > 0 and not isinstance(cipher, FPECipher):
+            raise Exception("numbers are only supported by the FPE cipher")
+        self.cipher = cipher
+        self.columns = columns
+        self.numbers = numbers
+        self.decrypt = decrypt
+        self.chunk_size = chunk_size
+        self._parallel = (
+            ParallelCipher(cipher, workers, max(1, chunk_size // workers), 0)
+            if workers is not None and workers > 1
+            else None
+        )
+
+    def transform(self, rows: Iterable[dict]) -> Iterator[dict]:
+        """
+        Yield the passed rows with the selected columns processed, in order
+        """
+        rows = iter(rows)
+        while chunk := list(islice(rows, self.chunk_size)):
+            self._process(chunk)
+            yield from chunk
+
+    def close(self):
+        """
+        Shut down the pool of processes, if any
+        """
+        if self._parallel is not None:
+            self._parallel.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    # private methods
+
+    def _process(self, chunk: list[dict]):
+        # Gather the values of the chunk by operation to apply them all at once
+        tasks = dict[str, list[tuple[dict, str, Any]]]()
+        for row in chunk:
+            for column in self.columns:
+                self._add_task(tasks, row, column, False)
+            for column in self.numbers:
+                self._add_task(tasks, row, column, True)
+
+        for operation, items in tasks.items():
+            values = [_prepare(operation, value) for _, _, value in items]
+            for (row, column, _), result in zip(items, self._map(operation, values)):
+                row[column] = _finish(operation, result)
+
+    def _add_task(self, tasks: dict, row: dict, column: str, number: bool):
+        value = row.get(column)
+        if value is None or value == "":
+            return
+        if number and isinstance(value, int) and not isinstance(value, bool):
+            operation = "number"
+        elif number and isinstance(value, str):
+            operation = "number_as_string"
+        elif not number and isinstance(value, str):
+            operation = "" if isinstance(self.cipher, FPECipher) else "hex"
+        else:
+            raise Exception(f"invalid value in column: {column}")
+        operation = ("decrypt" if self.decrypt else "encrypt") + (
+            "_" + operation if operation else ""
+        )
+        tasks.setdefault(operation, []).append((row, column, value))
+
+    def _map(self, operation: str, values: list) -> Iterable:
+        name = operation.removesuffix("_hex")
+        if self._parallel is not None:
+            return self._parallel.map(name, values)
+        return apply_batch(self.cipher, name, values)
+
+
+def obfuscate_csv(obfuscator: ColumnObfuscator, source: TextIO, sink: TextIO) -> int:
+    """
+    Stream the CSV rows of the source (with a header line) to the sink through the passed obfuscator,
+    returning the number of processed rows
+    """
+    reader = csv.DictReader(source)
+    if reader.fieldnames is None:
+        return 0
+    for column in obfuscator.columns + obfuscator.numbers:
+        if column not in reader.fieldnames:
+            raise Exception(f"unknown column: {column}")
+    writer = csv.DictWriter(sink, reader.fieldnames)
+    writer.writeheader()
+    count = 0
+    for row in obfuscator.transform(reader):
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def obfuscate_jsonl(obfuscator: ColumnObfuscator, source: TextIO, sink: TextIO) -> int:
+    """
+    Stream the JSON objects of the source (one per line) to the sink through the passed obfuscator,
+    returning the number of processed rows
+    """
+    count = 0
+    rows = (json.loads(line) for line in source if line.strip())
+    for row in obfuscator.transform(rows):
+        sink.write(json.dumps(row, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def _prepare(operation: str, value: Any) -> Any:
+    if operation == "decrypt_hex":
+        return bytes.fromhex(value)
+    return value
+
+
+def _finish(operation: str, result: Any) -> Any:
+    if operation == "encrypt_hex":
+        return result.hex()
+    return result
@@ -2,5 +2,6 @@ from .base256 import *
 from .bytearray import *
 from .hash import *
 from .padding import *
+from .schedule import *
 from .strings import *
 from .xor import *
@@ -1,18 +1,56 @@
+from typing import Iterable
+
+# Names exported by the package
+__all__ = [
+    "Readable",
+    "CHARSET",
+    "base256_char_at",
+    "index_of_base256",
+    "to_base256_readable",
+    "to_base256_readables",
+    "hex2Readable",
+    "readable2bytearray",
+    "readables2bytearrays",
+    "readable2hex",
+]
+
 # Readable
 Readable = str
 CHARSET = '!"#$%&\'()*+,-./0123456789:;<=>?@ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^`abcdefghijklmnopqrstuvwxyz{|}€¡¢£¤¥¦§¨©ª«¬®¯°±²³´µ¶·¸¹»¼½¾¿ÀÁÂÃÄÅÆÇÈÉÊËÌÍÎÏÐÑÒÓÔÕÖØÙÚÛÜÝÞßàáâãäåæçèéêëìíîïðñòóôõö÷ùúûüýÿăąĊčđĕĘğħĩĭıĵķĿŀŁłňŋŏœŖřŝşŦŧũūůŲŵſƀƁƂƄƆƇƔƕƗƙƛƜƟƢƥƦƧƩƪƭƮưƱƲƵƸƺƾǀǁǂƿǬǮǵǶǹǻǿ")'
 
 
+class _DecodingTable(dict):
+    # Maps each character of the charset to the Latin-1 character of its index, failing on any other character
+    def __missing__(self, code: int):
+        raise ValueError(f"invalid base256 character: {chr(code)!r}")
+
+
+# Lookup tables built once at import time (NB: only the first 256 characters of the charset are distinct)
+_ENCODING_TABLE = {idx: char for idx, char in enumerate(CHARSET[:256])}
+_DECODING_TABLE = _DecodingTable(
+    {ord(char): idx for idx, char in enumerate(CHARSET[:256])}
+)
+
+
 def base256_char_at(index: int) -> str:
     return CHARSET[index]
 
 
 def index_of_base256(char: str) -> int:
-    return CHARSET.index(char)
+    if len(char) != 1:
+        raise ValueError(f"invalid base256 character: {char!r}")
+    return _DECODING_TABLE[ord(char)]
 
 
 def to_base256_readable(item: bytearray) -> Readable:
-    return "".join(map(base256_char_at, item))
+    return bytes(item).decode("latin-1").translate(_ENCODING_TABLE)
+
+
+def to_base256_readables(items: Iterable[bytearray]) -> list[Readable]:
+    """
+    Returns the readable strings of all the passed byte arrays
+    """
+    return [bytes(item).decode("latin-1").translate(_ENCODING_TABLE) for item in items]
 
 
 def hex2Readable(hex: str) -> Readable:
@@ -20,7 +58,14 @@ def hex2Readable(hex: str) -> Readable:
 
 
 def readable2bytearray(readable: Readable) -> bytearray:
-    return bytearray(list(map(index_of_base256, readable)))
+    return bytearray(readable.translate(_DECODING_TABLE), "latin-1")
+
+
+def readables2bytearrays(readables: Iterable[Readable]) -> list[bytearray]:
+    """
+    Returns the byte arrays of all the passed readable strings
+    """
+    return [bytearray(r.translate(_DECODING_TABLE), "latin-1") for r in readables]
 
 
 def readable2hex(readable: Readable) -> str:
@@ -1,4 +1,7 @@
-from pyutls import flatten
+from functools import lru_cache
+
+# Names exported by the package
+__all__ = ["add_bytes", "bytearray2ints", "split_bytes"]
 
 
 def add_bytes(b1: bytearray, b2: bytearray) -> bytearray:
@@ -9,14 +12,15 @@ def add_bytes(b1: bytearray, b2: bytearray) -> bytearray:
         b2
     ), "Error: to be added, byte arrays must be of the same length"
 
-    bytes1 = bytearray2ints(b1)
-    bytes2 = bytearray2ints(b2)
-
-    arr = list[list[int]]()
-    for p1, p2 in zip(bytes1, bytes2):
-        arr.append(_value2utf8ints((p1 + p2) % 256))
+    # Byte-wise addition modulo 256 of both buffers at once, without carries between bytes
+    n = len(b1)
+    low, high = _masks(n)
+    i1 = int.from_bytes(b1, "big")
+    i2 = int.from_bytes(b2, "big")
+    added = ((i1 & low) + (i2 & low)) ^ ((i1 ^ i2) & high)
 
-    return bytearray(flatten(arr))
+    # Each byte value is the code point of a Latin-1 character, ie. one byte below 128 and two bytes above in UTF-8
+    return bytearray(added.to_bytes(n, "big").decode("latin-1"), "utf-8")
 
 
 def bytearray2ints(b: bytearray) -> list[int]:
@@ -30,15 +34,12 @@ def split_bytes(b: bytearray) -> tuple[bytearray, bytearray]:
     """
     Splits a byte array in two parts
     """
-    half = int(len(b) / 2)
+    half = len(b) // 2
     return [b[:half], b[half:]]
 
 
-# Utility to mimic transformation of byte array to UTF-8 in Golang
-def _value2utf8ints(value: int) -> list[int]:
-    if value < 128:
-        return [value]
-    elif value < 192:
-        return [194, value]
-    else:
-        return [195, value - 64]
+@lru_cache(maxsize=256)
+def _masks(length: int) -> tuple[int, int]:
+    # Masks of the low 7 bits and of the high bit of each byte of a buffer of the passed length
+    ones = int.from_bytes(b"\x01" * length, "big")
+    return ones * 0x7F, ones * 0x80
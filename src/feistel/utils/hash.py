@@ -1,5 +1,30 @@
 import hashlib
-from Crypto.Hash import keccak
+import hmac
+import threading
+from typing import Any, Callable
+
+# Names exported by the package
+__all__ = [
+    "hash",
+    "Engine",
+    "BLAKE2B",
+    "KECCAK",
+    "SHA_256",
+    "SHA_3",
+    "AES_PRF",
+    "BLAKE2B_KEYED",
+    "BLAKE2S_KEYED",
+    "HMAC_SHA_256",
+    "SHAKE_128",
+    "Hasher",
+    "Primitive",
+    "is_available_engine",
+    "is_keyed_engine",
+    "register_engine",
+    "RoundFunction",
+    "H",
+    "hasher",
+]
 
 
 def hash(input: bytearray) -> bytearray:
@@ -15,28 +40,251 @@ KECCAK = Engine("keccak-256")
 SHA_256 = Engine("sha-256")
 SHA_3 = Engine("sha-3")
 
+# Keyed engines
+AES_PRF = Engine("aes-prf")
+BLAKE2B_KEYED = Engine("blake-2b-keyed")
+BLAKE2S_KEYED = Engine("blake-2s-keyed")
+HMAC_SHA_256 = Engine("hmac-sha-256")
+SHAKE_128 = Engine("shake-128")
+
+# Hasher
+Hasher = Callable[[bytes | bytearray | memoryview], bytes]
+
+# Primitive of a keyed engine, built from the key by a factory: message -> output of the declared size,
+# or (message, length) -> output of the passed length for an extendable-output engine (declared size of `None`)
+Primitive = Callable[..., bytes]
+
 
 def is_available_engine(engine: Engine) -> bool:
-    return engine == BLAKE2B or engine == KECCAK or engine == SHA_256 or engine == SHA_3
+    return engine in _HASHERS or engine in _LAZY_HASHERS or engine in _ENGINES
+
+
+def is_keyed_engine(engine: Engine) -> bool:
+    return engine in _ENGINES
+
+
+def register_engine(
+    engine: Engine, factory: Callable[[bytes], Primitive], output_size: int | None
+):
+    """
+    Register a keyed engine, ie. a pseudo-random function whose primitive is built once per cipher by passing
+    the key (as UTF-8 bytes) to the factory.
+    The primitive returns `output_size` bytes per message, or takes the desired length as second argument
+    if `output_size` is `None` (extendable-output functions).
+    Unlike the hash engines, its output is used as it is in the rounds (see `RoundFunction`).
+    """
+    assert (
+        engine and (output_size is None or output_size > 0) and callable(factory)
+    ), "EngineError: wrong arguments"
+    if is_available_engine(engine):
+        raise Exception(f"engine already registered: {engine}")
+    _ENGINES[engine] = (factory, output_size)
+
+
+class RoundFunction:
+    __slots__ = ("output_size", "engine", "key", "_primitive")
+
+    def __init__(self, engine: Engine, key: str):
+        """
+        The RoundFunction of a keyed engine returns the bytes of a round from the round index and the item,
+        without any hexadecimal encoding: the primitive is fed with the 4-byte round index, a 4-byte block counter
+        and the item, as many blocks being computed as needed for the desired length.
+        """
+        found = _ENGINES.get(engine)
+        if found is None:
+            raise Exception("unknown keyed engine")
+        factory, self.output_size = found
+        self.engine = engine
+        self.key = key
+        self._primitive = factory(key.encode())
+
+    def __call__(
+        self, item: bytes | bytearray | memoryview, idx: int, length: int
+    ) -> bytes:
+        prefix = idx.to_bytes(4, "big")
+        if self.output_size is None:
+            return self._primitive(b"".join((prefix, _ZERO_COUNTER, item)), length)
+        if length <= self.output_size:
+            return self._primitive(b"".join((prefix, _ZERO_COUNTER, item)))[:length]
+        blocks = [
+            self._primitive(b"".join((prefix, counter.to_bytes(4, "big"), item)))
+            for counter in range(-(-length // self.output_size))
+        ]
+        return b"".join(blocks)[:length]
+
+    def __reduce__(self):
+        # Rebuilt from the registry, eg. in worker processes
+        return (RoundFunction, (self.engine, self.key))
 
 
 def H(msg: bytearray, using: Engine) -> bytearray:
     """
     Create a hash from the passed message using the specified algorithm
     """
-    if using == BLAKE2B:
-        b2b = hashlib.blake2b(digest_size=32)
-        b2b.update(msg)
-        return b2b.digest()
-    elif using == KECCAK:
-        k = keccak.new(digest_bits=256)
-        k.update(msg)
-        return k.digest()
-    elif using == SHA_256:
-        return hash(msg)
-    elif using == SHA_3:
-        s3 = hashlib.sha3_256()
-        s3.update(msg)
-        return s3.digest()
-    else:
-        raise Exception("unknown hash algorithm")
+    return hasher(using)(msg)
+
+
+def hasher(engine: Engine) -> Hasher:
+    """
+    Returns the hash function of the passed engine.
+    Resolve it once, eg. when instantiating a cipher, to avoid looking the engine up at each round.
+    """
+    found = _HASHERS.get(engine)
+    if found is None:
+        loader = _LAZY_HASHERS.get(engine)
+        if loader is None:
+            raise Exception("unknown hash algorithm")
+        found = _HASHERS[engine] = loader()
+    return found
+
+
+def _blake2b(msg: bytes | bytearray | memoryview) -> bytes:
+    return hashlib.blake2b(msg, digest_size=32).digest()
+
+
+def _sha_256(msg: bytes | bytearray | memoryview) -> bytes:
+    return hashlib.sha256(msg).digest()
+
+
+def _sha_3(msg: bytes | bytearray | memoryview) -> bytes:
+    return hashlib.sha3_256(msg).digest()
+
+
+def _load_keccak() -> Hasher:
+    # pycryptodome is only imported on first use of the engine
+    from Crypto.Hash import keccak
+
+    def _public_keccak(msg: bytes | bytearray | memoryview) -> bytes:
+        return keccak.new(digest_bits=256, data=msg).digest()
+
+    try:
+        fast = _raw_keccak(keccak)
+        # The internals of pycryptodome may change between releases: the fast path is checked once against its public API
+        if fast(b"feistel") == _public_keccak(b"feistel"):
+            return fast
+    except Exception:  # pragma: no cover
+        pass
+    # Create a new Keccak object at each call
+    return _public_keccak
+
+
+def _raw_keccak(keccak: Any) -> Hasher:
+    # Keccak driven through the private C functions of pycryptodome, reusing one state per thread
+    from Crypto.Hash.keccak import _raw_keccak_lib
+    from Crypto.Util._raw_api import (
+        c_size_t,
+        c_ubyte,
+        c_uint8_ptr,
+        create_string_buffer,
+        get_raw_buffer,
+    )
+
+    class _KeccakContext(threading.local):
+        # Keccak state prepared once per thread, then reset before each message
+        def __init__(self):
+            self.hash = keccak.new(digest_bits=256)
+            self.state = self.hash._state.get()
+            self.digest = create_string_buffer(32)
+
+    keccak_context = _KeccakContext()
+    size = c_size_t(32)
+    padding = c_ubyte(0x01)
+
+    def _keccak(msg: bytes | bytearray | memoryview) -> bytes:
+        context = keccak_context
+        if (
+            _raw_keccak_lib.keccak_reset(context.state)
+            or _raw_keccak_lib.keccak_absorb(
+                context.state, c_uint8_ptr(msg), c_size_t(len(msg))
+            )
+            or _raw_keccak_lib.keccak_digest(
+                context.state, context.digest, size, padding
+            )
+        ):
+            raise ValueError("Error while hashing with keccak")
+        return get_raw_buffer(context.digest)
+
+    return _keccak
+
+
+_HASHERS = {
+    BLAKE2B: _blake2b,
+    SHA_256: _sha_256,
+    SHA_3: _sha_3,
+}
+
+# Hashers of heavy dependencies, loaded on first use
+_LAZY_HASHERS = {
+    KECCAK: _load_keccak,
+}
+
+# Block counter of the first block of a round
+_ZERO_COUNTER = bytes(4)
+
+
+def _aes_prf(key: bytes) -> Primitive:
+    # CBC-MAC of the length-prefixed message with AES, which is a PRF for messages of any length:
+    # 16, 24 and 32-byte keys are used as they are (AES-128/192/256), other ones are hashed into an AES-256 key
+    from Crypto.Cipher import AES
+
+    cipher = AES.new(
+        key if len(key) in [16, 24, 32] else hashlib.sha256(key).digest(), AES.MODE_ECB
+    )
+
+    def primitive(msg: bytes) -> bytes:
+        data = len(msg).to_bytes(4, "big") + msg
+        data += bytes(-len(data) % 16)
+        if len(data) == 16:
+            return cipher.encrypt(data)
+        state = 0
+        for start in range(0, len(data), 16):
+            block = state ^ int.from_bytes(data[start : start + 16], "big")
+            state = int.from_bytes(cipher.encrypt(block.to_bytes(16, "big")), "big")
+        return state.to_bytes(16, "big")
+
+    return primitive
+
+
+def _blake2b_keyed(key: bytes) -> Primitive:
+    base = hashlib.blake2b(key=key if len(key) <= 64 else hashlib.blake2b(key).digest())
+
+    def primitive(msg: bytes) -> bytes:
+        h = base.copy()
+        h.update(msg)
+        return h.digest()
+
+    return primitive
+
+
+def _blake2s_keyed(key: bytes) -> Primitive:
+    base = hashlib.blake2s(key=key if len(key) <= 32 else hashlib.blake2s(key).digest())
+
+    def primitive(msg: bytes) -> bytes:
+        h = base.copy()
+        h.update(msg)
+        return h.digest()
+
+    return primitive
+
+
+def _hmac_sha_256(key: bytes) -> Primitive:
+    return lambda msg: hmac.digest(key, msg, "sha256")
+
+
+def _shake_128(key: bytes) -> Primitive:
+    base = hashlib.shake_128(len(key).to_bytes(4, "big") + key)
+
+    def primitive(msg: bytes, length: int) -> bytes:
+        h = base.copy()
+        h.update(msg)
+        return h.digest(length)
+
+    return primitive
+
+
+_ENGINES = dict[Engine, tuple[Callable[[bytes], Primitive], int | None]]()
+register_engine(AES_PRF, _aes_prf, 16)
+register_engine(BLAKE2B_KEYED, _blake2b_keyed, 64)
+register_engine(BLAKE2S_KEYED, _blake2s_keyed, 32)
+register_engine(HMAC_SHA_256, _hmac_sha_256, 32)
+register_engine(SHAKE_128, _shake_128, None)
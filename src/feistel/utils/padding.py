@@ -1,5 +1,9 @@
+# Names exported by the package
+__all__ = ["PADDING_CHARACTER", "PADDING_BYTES", "pad", "unpad"]
+
 # Unicde U+0002: start-of-text
 PADDING_CHARACTER = "\u0002"
+PADDING_BYTES = b"\x02"
 
 
 def pad(data: str) -> str:
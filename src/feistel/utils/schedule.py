@@ -0,0 +1,67 @@
+from feistel.utils.strings import extract, string2bytearray
+
+# Names exported by the package
+__all__ = ["DEFAULT_SCHEDULE_SIZE", "KeySchedule"]
+
+DEFAULT_SCHEDULE_SIZE = 256
+
+
+class KeySchedule:
+    __slots__ = ("keys", "rounds", "max_size", "_strings", "_bytes")
+
+    def __init__(
+        self, keys: list[str], rounds: int, max_size: int = DEFAULT_SCHEDULE_SIZE
+    ):
+        """
+        The KeySchedule precomputes the round keys extracted from the base key(s) of a cipher.
+        If only one key is passed, it is used for all rounds, otherwise the key at the round index is used.
+        Round keys are derived once per length for all rounds and kept in a cache holding at most `max_size` lengths.
+        NB: The cache is reset when full.
+        """
+        assert (
+            len(keys) > 0 and rounds > 0 and max_size > 0
+        ), "KeyScheduleError: wrong arguments"
+        self.keys = keys
+        self.rounds = rounds
+        self.max_size = max_size
+        self._strings = dict[int, tuple[str, ...]]()
+        self._bytes = dict[int, tuple[bytes, ...]]()
+
+    def strings(self, length: int) -> tuple[str, ...]:
+        """
+        Returns the round keys of the passed length as strings, indexed by round
+        """
+        found = self._strings.get(length)
+        if found is None:
+            found = tuple(
+                extract(self._key_at(idx), idx, length) for idx in range(self.rounds)
+            )
+            self._store(self._strings, length, found)
+        return found
+
+    def bytes(self, length: int) -> tuple[bytes, ...]:
+        """
+        Returns the round keys of the passed length as UTF-8 bytes, indexed by round
+        """
+        found = self._bytes.get(length)
+        if found is None:
+            found = tuple(bytes(string2bytearray(key)) for key in self.strings(length))
+            self._store(self._bytes, length, found)
+        return found
+
+    def __getstate__(self) -> dict:
+        # Caches are rebuilt on demand wherever the schedule gets unpickled
+        return {"keys": self.keys, "rounds": self.rounds, "max_size": self.max_size}
+
+    def __setstate__(self, state: dict):
+        self.__init__(state["keys"], state["rounds"], state["max_size"])
+
+    # private methods
+
+    def _key_at(self, idx: int) -> str:
+        return self.keys[idx] if len(self.keys) > 1 else self.keys[0]
+
+    def _store(self, cache: dict, length: int, value: tuple):
+        if len(cache) >= self.max_size:
+            cache.clear()
+        cache[length] = value
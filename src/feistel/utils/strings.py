@@ -1,3 +1,7 @@
+# Names exported by the package
+__all__ = ["add", "extract", "split", "string2bytearray"]
+
+
 def add(str1: str, str2: str) -> str:
     """
     Adds two strings in the sense that each charCode are added
@@ -1,5 +1,5 @@
-from feistel.utils import bytearray2ints
-
+# Names exported by the package
+__all__ = ["NEUTRAL", "NEUTRAL_BYTES", "xor", "xor_bytes", "xor_into"]
 
 NEUTRAL = bytearray([0]).decode("utf-8")
 NEUTRAL_BYTES = bytearray([0])
@@ -16,6 +16,18 @@ def xor_bytes(b1: bytearray, b2: bytearray) -> bytearray:
     """
     Applies XOR operation on thow byte arrays in the sense that each bit value are xored
     """
-    bytes1 = bytearray2ints(b1)
-    bytes2 = bytearray2ints(b2)
-    return bytearray([p1 ^ p2 for p1, p2 in zip(bytes1, bytes2)])
+    # XOR of both buffers at once, truncated to the shortest one
+    n = min(len(b1), len(b2))
+    xored = int.from_bytes(b1[:n], "big") ^ int.from_bytes(b2[:n], "big")
+    return bytearray(xored.to_bytes(n, "big"))
+
+
+def xor_into(target: memoryview, other: bytes | bytearray):
+    """
+    Applies XOR operation on the passed writable buffer in place with the other byte array of the same length
+    """
+    assert len(target) == len(
+        other
+    ), "Error: to be xored in place, byte arrays must be of the same length"
+    xored = int.from_bytes(target, "big") ^ int.from_bytes(other, "big")
+    target[:] = xored.to_bytes(len(target), "big")
@@ -0,0 +1,885 @@
+import argparse
+import hashlib
+import hmac
+import json
+import math
+from operator import add, xor
+import os
+import random
+import sys
+import time
+from typing import Any, Callable, Iterator
+
+from feistel.cipher import Cipher
+from feistel.custom import CustomCipher
+from feistel.fpe import FPECipher
+
+# NB: The reference implementations below only rely on the standard library (and the public API of pycryptodome),
+# so that a regression of the primitives of `feistel.utils` cannot hide itself by being shared with the references.
+
+CUSTOM = "custom"
+FEISTEL = "feistel"
+FPE = "fpe"
+
+# Hash engines
+BLAKE2B = "blake-2b-256"
+KECCAK = "keccak-256"
+SHA_256 = "sha-256"
+SHA_3 = "sha-3"
+# Keyed engines
+AES_PRF = "aes-prf"
+BLAKE2B_KEYED = "blake-2b-keyed"
+BLAKE2S_KEYED = "blake-2s-keyed"
+HMAC_SHA_256 = "hmac-sha-256"
+SHAKE_128 = "shake-128"
+
+_KEYED = [AES_PRF, BLAKE2B_KEYED, BLAKE2S_KEYED, HMAC_SHA_256, SHAKE_128]
+
+ENGINES = [
+    BLAKE2B,
+    KECCAK,
+    SHA_256,
+    SHA_3,
+    AES_PRF,
+    BLAKE2B_KEYED,
+    BLAKE2S_KEYED,
+    HMAC_SHA_256,
+    SHAKE_128,
+]
+
+# Alternative implementations checked against the reference, by cipher
+BACKENDS = {
+    FEISTEL: ["string", "bytes", "many"],
+    CUSTOM: ["string", "bytes", "many"],
+    FPE: ["string", "bytes", "into", "many", "number", "numbers", "vectorized"],
+}
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_MAX_MISMATCHES = 20
+
+EDGE_NUMBERS = [
+    -1,
+    0,
+    1,
+    127,
+    128,
+    255,
+    256,
+    257,
+    65535,
+    65536,
+    65537,
+    (1 << 24) - 1,
+    (1 << 32) - 1,
+    1 << 32,
+    (1 << 32) + 1,
+    (1 << 56) - 1,
+    (1 << 64) - 1,
+    1 << 64,
+]
+EDGE_STRINGS = [
+    "",
+    "a",
+    "ab",
+    "abc",
+    "Edgewhere",
+    "Cyril",
+    "é",
+    "hé",
+    "Ünïcödé",
+    "日本語",
+    "€uro",
+    "😀",
+    "a😀b",
+    "\x00",
+    "\u0002x",
+    "\x7f\x80",
+    "ÿ" * 5,
+]
+
+# The 256 characters of the readable strings of the FPE cipher
+BASE256 = (
+    "!\"#$%&'()*+,-./0123456789:;<=>?@ABCDEFGHIJKLMNOPQRSTUVWXYZ[\\]^`abcdefghijklmnopqrstuvwxyz{|}€¡¢£¤¥¦§¨©ª«¬®¯°±²³´µ¶·"
+    "¸¹»¼½¾¿ÀÁÂÃÄÅÆÇÈÉÊËÌÍÎÏÐÑÒÓÔÕÖØÙÚÛÜÝÞßàáâãäåæçèéêëìíîïðñòóôõö÷ùúûüýÿăąĊčđĕĘğħĩĭıĵķĿŀŁłňŋŏœŖřŝşŦŧũūůŲŵſƀƁƂƄƆƇƔƕƗƙƛƜƟƢƥƦƧƩƪƭƮưƱƲƵƸƺƾǀǁǂƿǬǮǵǶǹǻǿ"
+)
+_PADDING = "\u0002"
+
+# Characters of the random strings: ASCII, Latin-1 (2 bytes in UTF-8), BMP (3 bytes) and beyond (4 bytes)
+_ALPHABETS = [
+    "".join(chr(c) for c in range(32, 127)),
+    "".join(chr(c) for c in range(0, 32)) + "\x7f",
+    "".join(chr(c) for c in range(160, 256)),
+    "€日本語中文한국어ßΩЖ",
+    "😀🎉🚀𝄞",
+]
+
+
+class ReferenceCipher:
+    def __init__(self, keys: list[str], rounds: int):
+        """
+        The ReferenceCipher is a straightforward transcription of the original string-based Feistel cipher,
+        ie. the `Cipher` when a single key is passed and the `CustomCipher` (one key per round) otherwise.
+        It is slow on purpose and only meant to check the other implementations.
+        """
+        self.keys = keys
+        self.rounds = rounds
+
+    def encrypt(self, data: str) -> bytearray:
+        if len(data) == 0:
+            return bytearray()
+        if len(data) % 2 == 1:
+            data = _PADDING + data
+        left, right = _split(data)
+        for i in range(0, self.rounds):
+            left, right = right, _xor(left, self._round(right, i))
+        return bytearray((left + right).encode())
+
+    def decrypt(self, obfuscated: bytes | bytearray) -> str:
+        assert len(obfuscated) % 2 == 0, "CipherError: invalid obfuscated data"
+        if len(obfuscated) == 0:
+            return ""
+        b, a = _split(obfuscated.decode())
+        for i in range(0, self.rounds):
+            a, b = b, _xor(a, self._round(b, self.rounds - i - 1))
+        return (b + a).lstrip(_PADDING)
+
+    def _round(self, item: str, idx: int) -> str:
+        key = self.keys[idx] if len(self.keys) > 1 else self.keys[0]
+        addition = "".join(
+            map(
+                chr, map(add, map(ord, item), map(ord, key_stream(key, idx, len(item))))
+            )
+        )
+        hex_hashed = hashlib.sha256(addition.encode()).hexdigest()
+        return key_stream(hex_hashed, idx, len(item))
+
+
+class ReferenceFPECipher:
+    def __init__(self, engine: str, key: str, rounds: int):
+        """
+        The ReferenceFPECipher is a straightforward transcription of the original `FPECipher`, working on lists
+        of integers and copies of the halves at each round.
+        It is slow on purpose and only meant to check the other implementations.
+        """
+        self.engine = engine
+        self.key = key
+        self.rounds = rounds
+        self._prf = _keyed_engine(engine, key.encode()) if engine in _KEYED else None
+        self._hash = None if self._prf is not None else _hash_engine(engine)
+
+    def encrypt(self, data: str) -> str:
+        if len(data) == 0:
+            return ""
+        return to_readable(self.encrypt_bytes(bytearray(data, "utf-8")))
+
+    def encrypt_bytes(self, data: bytearray) -> bytearray:
+        parts = _split(data)
+        for i in range(0, self.rounds):
+            left = parts[1].copy()
+            if len(parts[1]) < len(parts[0]):
+                parts[1].append(0)
+            rnd = self._round_bytes(parts[1], i)
+            tmp = parts[0].copy()
+            crop = False
+            if len(tmp) + 1 == len(rnd):
+                tmp.append(0)
+                crop = True
+            right = _xor_bytes(tmp, rnd)
+            if crop:
+                right = right[: len(right) - 1]
+            parts = [left, right]
+        return parts[0] + parts[1]
+
+    def encrypt_number(self, n: int) -> int:
+        if n < 128:
+            if n == 0:
+                return 0
+            string = n.to_bytes(2, "big").decode()
+            return int.from_bytes(from_readable(self.encrypt(string)), "big")
+        size = math.ceil(math.log2(n) / 8)
+        bits = 8 if size > 4 else 4 if size > 2 else size
+        b = self.encrypt_bytes(bytearray(n.to_bytes(bits, "big")))
+        return int.from_bytes(b, "big")
+
+    def decrypt(self, obfuscated: str) -> str:
+        if len(obfuscated) == 0:
+            return ""
+        return self.decrypt_bytes(from_readable(obfuscated)).decode("utf-8")
+
+    def decrypt_bytes(self, data: bytearray) -> bytearray:
+        if len(data) == 0:
+            # NB: The original raised an IndexError, empty data being now returned as is like with `encrypt_bytes()`
+            return bytearray()
+        left, right = _split(data)
+        if self.rounds % 2 != 0 and len(left) != len(right):
+            left.append(right[0])
+            right = right[1:].copy()
+        for i in range(0, self.rounds):
+            left_round = left.copy()
+            if len(left) < len(right):
+                left_round.append(0)
+            rnd = self._round_bytes(left_round, self.rounds - i - 1)
+            right_round = right.copy()
+            extended = False
+            if len(right_round) + 1 == len(rnd):
+                right_round.append(left[len(left) - 1])
+                extended = True
+            if i == self.rounds - 1 and right_round[len(right_round) - 1] == 0:
+                extended = True
+            tmp = _xor_bytes(right_round, rnd)
+            right = left.copy()
+            if extended:
+                tmp = tmp[: len(tmp) - 1]
+            left = tmp.copy()
+        return left + right
+
+    def decrypt_number(self, obfuscated: int) -> int:
+        if obfuscated == 0:
+            return 0
+        size = math.ceil(math.log2(obfuscated) / 8)
+        width = 8 if size > 4 else 4 if size > 2 else 2
+        b = self.decrypt_bytes(bytearray(obfuscated.to_bytes(width, "big")))
+        return int.from_bytes(b, "big")
+
+    def _round_bytes(self, item: bytearray, idx: int) -> bytearray:
+        if self._prf is not None:
+            return bytearray(self._prf(bytes(item), idx, len(item)))
+        addition = _add_bytes(item, key_stream(self.key, idx, len(item)).encode())
+        hashed = self._hash(bytes(addition))
+        return bytearray(key_stream(hashed.hex(), idx, len(item)).encode())
+
+
+# Reference primitives
+
+
+def key_stream(key: str, start: int, length: int) -> str:
+    """
+    Returns `length` characters of the passed string repeated endlessly, from the passed start index (modulo its length)
+    """
+    start %= len(key)
+    return (key * ((start + length) // len(key) + 1))[start : start + length]
+
+
+def to_readable(data: bytes | bytearray) -> str:
+    """
+    Returns the base256 readable string of the passed bytes
+    """
+    return "".join(BASE256[b] for b in data)
+
+
+def from_readable(readable: str) -> bytearray:
+    """
+    Returns the bytes of the passed base256 readable string, raising a `ValueError` on any other character
+    """
+    try:
+        return bytearray(BASE256.index(c) for c in readable)
+    except ValueError:
+        raise ValueError(f"invalid base256 character in {readable!r}")
+
+
+def _hash_engine(engine: str) -> Callable[[bytes], bytes]:
+    if engine == BLAKE2B:
+        return lambda msg: hashlib.blake2b(msg, digest_size=32).digest()
+    if engine == KECCAK:
+        from Crypto.Hash import keccak
+
+        return lambda msg: keccak.new(digest_bits=256, data=msg).digest()
+    if engine == SHA_256:
+        return lambda msg: hashlib.sha256(msg).digest()
+    if engine == SHA_3:
+        return lambda msg: hashlib.sha3_256(msg).digest()
+    raise Exception(f"unknown engine: {engine}")
+
+
+def _keyed_engine(engine: str, key: bytes) -> Callable[[bytes, int, int], bytes]:
+    # Round function of a keyed engine: the blocks of the PRF over the round index, the block counter and the item
+    if engine == SHAKE_128:
+        prefix = len(key).to_bytes(4, "big") + key
+        return lambda item, idx, length: hashlib.shake_128(
+            prefix + idx.to_bytes(4, "big") + bytes(4) + item
+        ).digest(length)
+    prf = _prf(engine, key)
+
+    def round_function(item: bytes, idx: int, length: int) -> bytes:
+        output = b""
+        counter = 0
+        while len(output) < length:
+            output += prf(idx.to_bytes(4, "big") + counter.to_bytes(4, "big") + item)
+            counter += 1
+        return output[:length]
+
+    return round_function
+
+
+def _prf(engine: str, key: bytes) -> Callable[[bytes], bytes]:
+    if engine == AES_PRF:
+        from Crypto.Cipher import AES
+
+        aes_key = key if len(key) in [16, 24, 32] else hashlib.sha256(key).digest()
+
+        def cbc_mac(msg: bytes) -> bytes:
+            # Length-prefixed message padded with zeros, the MAC being the last block of its CBC encryption
+            data = len(msg).to_bytes(4, "big") + msg
+            data += bytes(-len(data) % 16)
+            return AES.new(aes_key, AES.MODE_CBC, iv=bytes(16)).encrypt(data)[-16:]
+
+        return cbc_mac
+    if engine == BLAKE2B_KEYED:
+        blake2b_key = key if len(key) <= 64 else hashlib.blake2b(key).digest()
+        return lambda msg: hashlib.blake2b(msg, key=blake2b_key).digest()
+    if engine == BLAKE2S_KEYED:
+        blake2s_key = key if len(key) <= 32 else hashlib.blake2s(key).digest()
+        return lambda msg: hashlib.blake2s(msg, key=blake2s_key).digest()
+    if engine == HMAC_SHA_256:
+        return lambda msg: hmac.new(key, msg, hashlib.sha256).digest()
+    raise Exception(f"unknown engine: {engine}")
+
+
+def _split(data: Any) -> list:
+    half = len(data) // 2
+    return [data[:half], data[half:]]
+
+
+def _xor(str1: str, str2: str) -> str:
+    return "".join(map(chr, map(xor, map(ord, str1), map(ord, str2))))
+
+
+def fuzz(
+    cases: int,
+    seed: int = 0,
+    ciphers: list[str] = [FEISTEL, CUSTOM, FPE],
+    backends: list[str] | None = None,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_mismatches: int = DEFAULT_MAX_MISMATCHES,
+) -> dict:
+    """
+    Check the passed number of random cases (configuration and input) against the reference implementations,
+    each case being encrypted and decrypted by all the backends of its cipher (all of them by default).
+    The cases are generated from the seed in chunks, spread over `workers` processes, so that any run is reproducible.
+    Returns a report holding the first `max_mismatches` mismatches.
+    """
+    assert cases > 0 and workers >= 1 and chunk_size > 0, "FuzzError: wrong arguments"
+    chunks = [
+        (seed, index, min(chunk_size, cases - start), ciphers, backends)
+        for index, start in enumerate(range(0, cases, chunk_size))
+    ]
+    start = time.perf_counter()
+    if workers == 1:
+        results = map(_fuzz_chunk, chunks)
+        return _report(results, cases, seed, max_mismatches, start)
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(workers) as pool:
+        results = pool.map(_fuzz_chunk, chunks)
+        return _report(results, cases, seed, max_mismatches, start)
+
+
+def generate_vectors(seed: int = 0, random_inputs: int = 6) -> list[dict]:
+    """
+    Returns the test vectors of the reference implementations for every engine, odd and even numbers of rounds,
+    the edge cases (empty, odd and multibyte UTF-8 strings, numbers around the byte widths) and random inputs.
+    Errors are recorded by type name.
+    """
+    rng = random.Random(seed)
+    key = "8ed9dcc1701c064f0fd7ae235f15143f989920e0ee9658bb7882c8d7d5f05692"
+    configs = [
+        (FPE, engine, [key], rounds) for engine in ENGINES for rounds in [2, 3, 10, 11]
+    ]
+    configs += [(FPE, SHA_256, ["short"], 10), (FPE, SHA_256, ["clé"], 10)]
+    configs += [(FEISTEL, SHA_256, [key], rounds) for rounds in [2, 3, 10, 11]]
+    configs += [(FEISTEL, SHA_256, ["clé-secrète"], 10)]
+    configs += [
+        (CUSTOM, SHA_256, ["first", "second"], 2),
+        (CUSTOM, SHA_256, [key[i : i + 8] for i in range(0, 40, 8)], 5),
+    ]
+
+    vectors = list[dict]()
+    for kind, engine, keys, rounds in configs:
+        base = {"cipher": kind}
+        if kind == FPE:
+            base.update(engine=engine, key=keys[0], rounds=rounds)
+        elif kind == FEISTEL:
+            base.update(key=keys[0], rounds=rounds)
+        else:
+            base.update(keys=keys)
+        reference = _reference(kind, engine, keys, rounds)
+        strings = EDGE_STRINGS + [_random_string(rng) for _ in range(random_inputs)]
+        for string in strings:
+            encrypted = _outcome(reference.encrypt, string)
+            vectors.append(_vector(base, "encrypt", string, encrypted))
+            if encrypted[0] == "ok":
+                decrypted = _outcome(reference.decrypt, encrypted[1])
+                vectors.append(_vector(base, "decrypt", encrypted[1], decrypted))
+        if kind != FPE:
+            continue
+        numbers = EDGE_NUMBERS + [_random_number(rng) for _ in range(random_inputs)]
+        for n in numbers:
+            vectors.append(
+                _vector(
+                    base, "encrypt_number", n, _outcome(reference.encrypt_number, n)
+                )
+            )
+            vectors.append(
+                _vector(
+                    base, "decrypt_number", n, _outcome(reference.decrypt_number, n)
+                )
+            )
+    return vectors
+
+
+def check_vector(vector: dict, cipher: Any) -> tuple[Any, Any] | None:
+    """
+    Returns the expected and found outcomes of the passed test vector with the passed cipher if they differ, or `None`
+    """
+    value = vector["input"]
+    if vector["op"] == "decrypt" and vector["cipher"] != FPE:
+        value = bytes.fromhex(value)
+    found = _outcome(getattr(cipher, vector["op"]), value)
+    expected = (
+        ("error", vector["error"]) if "error" in vector else ("ok", vector["output"])
+    )
+    if found[0] == "ok" and isinstance(found[1], bytes):
+        found = ("ok", found[1].hex())
+    return None if found == expected else (expected, found)
+
+
+def build_cipher(vector: dict) -> Cipher | CustomCipher | FPECipher:
+    """
+    Returns the cipher of the configuration of the passed test vector
+    """
+    if vector["cipher"] == FPE:
+        return FPECipher(vector["engine"], vector["key"], vector["rounds"])
+    elif vector["cipher"] == FEISTEL:
+        return Cipher(vector["key"], vector["rounds"])
+    return CustomCipher(vector["keys"])
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python3 -m tests.fuzz")
+    parser.add_argument("-n", "--cases", type=int, default=100000)
+    parser.add_argument("-s", "--seed", type=int, default=0)
+    parser.add_argument(
+        "--ciphers", help="The comma-separated ciphers [default feistel,custom,fpe]"
+    )
+    parser.add_argument(
+        "--backends",
+        help="The comma-separated backends: string,bytes,into,many,number,numbers,vectorized [default all]",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="The number of processes [default one per core]",
+    )
+    parser.add_argument(
+        "--generate",
+        help="Write the test vectors to this JSONL file instead of fuzzing",
+    )
+    args = parser.parse_args(argv)
+
+    if args.generate:
+        with open(args.generate, "w", encoding="utf-8") as f:
+            for vector in generate_vectors(args.seed):
+                f.write(json.dumps(vector, ensure_ascii=False) + "\n")
+        return 0
+
+    report = fuzz(
+        args.cases,
+        args.seed,
+        _list(args.ciphers) or [FEISTEL, CUSTOM, FPE],
+        _list(args.backends) or None,
+        args.workers,
+    )
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 1 if report["mismatch_count"] > 0 else 0
+
+
+# Checks of a chunk
+
+
+def _fuzz_chunk(chunk: tuple) -> tuple[int, int, list[dict]]:
+    seed, index, count, ciphers, backends = chunk
+    rng = random.Random(seed * 1000003 + index)
+    checks = 0
+    mismatches = list[dict]()
+    # A few configurations per chunk, so that most of the time goes to the inputs
+    configs = [_random_config(rng, ciphers) for _ in range(max(1, count // 50))]
+    for position, config in enumerate(configs):
+        size = count // len(configs) + (position < count % len(configs))
+        kind = config[0]
+        enabled = [b for b in BACKENDS[kind] if backends is None or b in backends]
+        strings = [_random_string(rng) for _ in range(size)]
+        # Duplicates and values sharing their second half, so that batches hit memoized rounds
+        strings += _shared_halves(rng, strings[: size // 4])
+        if kind == FPE:
+            numbers = [_random_number(rng) for _ in range(size // 4)]
+            found = _check_fpe(rng, config, enabled, strings, numbers)
+        else:
+            found = _check_feistel(config, enabled, strings)
+        checks += found[0]
+        mismatches += found[1]
+    return count, checks, mismatches
+
+
+def _check_feistel(config: tuple, backends: list[str], strings: list[str]) -> tuple:
+    kind, _, keys, rounds = config
+    reference = _reference(kind, SHA_256, keys, rounds)
+    cipher = Cipher(keys[0], rounds) if kind == FEISTEL else CustomCipher(keys)
+    checker = _Checker(config)
+
+    expected = [_outcome(reference.encrypt, s) for s in strings]
+    checker.items("string", "encrypt", strings, expected, cipher.encrypt)
+    checker.items(
+        "bytes",
+        "encrypt",
+        strings,
+        expected,
+        lambda s: cipher.encrypt_bytes(s.encode()),
+    )
+    checker.batch("many", "encrypt", strings, expected, cipher.encrypt_many)
+
+    obfuscated = [bytes(e[1]) for e in expected if e[0] == "ok"]
+    expected = [_outcome(reference.decrypt, o) for o in obfuscated]
+    checker.items("string", "decrypt", obfuscated, expected, cipher.decrypt)
+    checker.items(
+        "bytes",
+        "decrypt",
+        obfuscated,
+        expected,
+        lambda o: cipher.decrypt_bytes(o).decode(),
+    )
+    checker.batch("many", "decrypt", obfuscated, expected, cipher.decrypt_many)
+    return checker.result(backends)
+
+
+def _check_fpe(
+    rng: random.Random,
+    config: tuple,
+    backends: list[str],
+    strings: list[str],
+    numbers: list[int],
+) -> tuple:
+    _, engine, keys, rounds = config
+    reference = ReferenceFPECipher(engine, keys[0], rounds)
+    cipher = FPECipher(engine, keys[0], rounds)
+    vectorized = _vectorized(config) if "vectorized" in backends else None
+    checker = _Checker(config)
+
+    data = [bytearray(s, "utf-8") for s in strings]
+    expected = [_outcome(reference.encrypt, s) for s in strings]
+    checker.items("string", "encrypt", strings, expected, cipher.encrypt)
+    checker.batch("many", "encrypt", strings, expected, cipher.encrypt_many)
+    expected = [_outcome(reference.encrypt_bytes, bytearray(b)) for b in data]
+    checker.items("bytes", "encrypt", data, expected, cipher.encrypt_bytes)
+    checker.items("into", "encrypt", data, expected, _into(cipher.encrypt_into))
+    if vectorized is not None:
+        checker.batch(
+            "vectorized", "encrypt", data, expected, _rows(vectorized.encrypt_array)
+        )
+
+    # Obfuscated data and random bytes, which may not be valid UTF-8 once deobfuscated
+    obfuscated = [bytearray(e[1]) for e in expected if e[0] == "ok"]
+    obfuscated += [bytearray(rng.randbytes(len(b))) for b in data[: len(data) // 2]]
+    expected = [_outcome(reference.decrypt_bytes, bytearray(o)) for o in obfuscated]
+    checker.items("bytes", "decrypt", obfuscated, expected, cipher.decrypt_bytes)
+    checker.items("into", "decrypt", obfuscated, expected, _into(cipher.decrypt_into))
+    if vectorized is not None:
+        # Rows one byte shorter are right-aligned with a leading zero byte
+        aligned = [
+            ("ok", bytes(len(o) - len(e[1])) + e[1]) if e[0] == "ok" else e
+            for o, e in zip(obfuscated, expected)
+        ]
+        checker.batch(
+            "vectorized",
+            "decrypt",
+            obfuscated,
+            aligned,
+            _rows(vectorized.decrypt_array),
+        )
+    readables = [to_readable(o) for o in obfuscated]
+    expected = [_outcome(reference.decrypt, r) for r in readables]
+    checker.items("string", "decrypt", readables, expected, cipher.decrypt)
+    checker.batch("many", "decrypt", readables, expected, cipher.decrypt_many)
+
+    expected = [_outcome(reference.encrypt_number, n) for n in numbers]
+    checker.items("number", "encrypt_number", numbers, expected, cipher.encrypt_number)
+    checker.batch(
+        "numbers", "encrypt_number", numbers, expected, cipher.encrypt_numbers
+    )
+    if vectorized is not None:
+        checker.batch(
+            "vectorized",
+            "encrypt_number",
+            numbers,
+            expected,
+            _numbers(vectorized.encrypt_number_array),
+        )
+    obfuscated = [e[1] for e in expected if e[0] == "ok"] + numbers
+    expected = [_outcome(reference.decrypt_number, n) for n in obfuscated]
+    checker.items(
+        "number", "decrypt_number", obfuscated, expected, cipher.decrypt_number
+    )
+    checker.batch(
+        "numbers", "decrypt_number", obfuscated, expected, cipher.decrypt_numbers
+    )
+    if vectorized is not None:
+        checker.batch(
+            "vectorized",
+            "decrypt_number",
+            obfuscated,
+            expected,
+            _numbers(vectorized.decrypt_number_array),
+        )
+    return checker.result(backends)
+
+
+class _Checker:
+    # Collects the comparisons of the backends of a configuration with the reference outcomes
+    def __init__(self, config: tuple):
+        self.config = config
+        self.checks = 0
+        self.mismatches = list[dict]()
+        self._enabled: list[str] | None = None
+        self._pending = list[tuple]()
+
+    def items(self, backend: str, op: str, values: list, expected: list, fn: Callable):
+        # Each value is processed on its own, errors included
+        self._pending.append((backend, op, values, expected, fn, False))
+
+    def batch(self, backend: str, op: str, values: list, expected: list, fn: Callable):
+        # The values with a successful reference outcome are processed at once
+        self._pending.append((backend, op, values, expected, fn, True))
+
+    def result(self, backends: list[str]) -> tuple[int, list[dict]]:
+        for backend, op, values, expected, fn, batch in self._pending:
+            if backend not in backends:
+                continue
+            if batch:
+                pairs = [(v, e) for v, e in zip(values, expected) if e[0] == "ok"]
+                if not pairs:
+                    continue
+                outcome = _outcome(fn, [v for v, _ in pairs])
+                if outcome[0] == "error":
+                    self._mismatch(backend, op, pairs[0][0], pairs[0][1], outcome)
+                    continue
+                found = [("ok", _normalize(r)) for r in outcome[1]]
+            else:
+                pairs = list(zip(values, expected))
+                found = [_outcome(fn, v) for v, _ in pairs]
+            for (value, e), f in zip(pairs, found):
+                self.checks += 1
+                if f != e:
+                    self._mismatch(backend, op, value, e, f)
+        return self.checks, self.mismatches
+
+    def _mismatch(
+        self, backend: str, op: str, value: Any, expected: tuple, found: tuple
+    ):
+        kind, engine, keys, rounds = self.config
+        self.mismatches.append(
+            {
+                "cipher": kind,
+                "engine": engine,
+                "keys": keys,
+                "rounds": rounds,
+                "backend": backend,
+                "op": op,
+                "input": _printable(value),
+                "expected": _printable(expected),
+                "found": _printable(found),
+            }
+        )
+
+
+# Generators
+
+
+def _random_config(rng: random.Random, ciphers: list[str]) -> tuple:
+    kind = rng.choice(ciphers)
+    if kind == CUSTOM:
+        keys = [_random_key(rng) for _ in range(rng.randint(2, 12))]
+        return (kind, SHA_256, keys, len(keys))
+    engine = rng.choice(ENGINES) if kind == FPE else SHA_256
+    return (kind, engine, [_random_key(rng)], rng.randint(2, 16))
+
+
+def _random_key(rng: random.Random) -> str:
+    if rng.random() < 0.05:
+        # Non-ASCII keys go through the string paths (or fail the same way as the reference)
+        return _random_string(rng) or "k"
+    return "".join(rng.choices(_ALPHABETS[0], k=rng.randint(1, 80)))
+
+
+def _random_number(rng: random.Random) -> int:
+    if rng.random() < 0.2:
+        return rng.choice(EDGE_NUMBERS)
+    return rng.getrandbits(
+        rng.choice([7, 8, 9, 15, 16, 17, 24, 31, 32, 33, 48, 63, 64])
+    )
+
+
+def _shared_halves(rng: random.Random, strings: list[str]) -> list[str]:
+    # The same ASCII strings, with the first half replaced by random ASCII bytes half of the time
+    shared = list[str]()
+    for string in strings:
+        if not string.isascii() or rng.random() < 0.5:
+            shared.append(string)
+            continue
+        half = len(string) // 2
+        shared.append("".join(rng.choices(_ALPHABETS[0], k=half)) + string[half:])
+    return shared
+
+
+def _random_string(rng: random.Random) -> str:
+    if rng.random() < 0.05:
+        return rng.choice(EDGE_STRINGS)
+    length = rng.choice([rng.randint(0, 12), rng.randint(0, 48)])
+    alphabets = rng.sample(_ALPHABETS, rng.randint(1, 3))
+    if rng.random() < 0.6:
+        alphabets[0] = _ALPHABETS[0]
+    alphabet = "".join(alphabets)
+    return "".join(rng.choices(alphabet, k=length))
+
+
+# Helpers
+
+
+def _add_bytes(b1: bytearray, b2: bytearray) -> bytearray:
+    # Original list-based byte addition mimicking the UTF-8 conversion of Go
+    assert len(b1) == len(
+        b2
+    ), "Error: to be added, byte arrays must be of the same length"
+    arr = list[int]()
+    for p1, p2 in zip([x for x in b1], [x for x in b2]):
+        value = (p1 + p2) % 256
+        if value < 128:
+            arr.append(value)
+        elif value < 192:
+            arr += [194, value]
+        else:
+            arr += [195, value - 64]
+    return bytearray(arr)
+
+
+def _into(fn: Callable) -> Callable:
+    def apply(value: bytearray) -> bytes:
+        buffer = bytearray(value)
+        n = fn(buffer)
+        return bytes(buffer[len(buffer) - n :])
+
+    return apply
+
+
+def _list(value: str | None) -> list[str]:
+    return [item for item in value.split(",") if item] if value else []
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value)
+    return value
+
+
+def _numbers(fn: Callable) -> Callable:
+    # Unsigned 64-bit integers only
+    import numpy as np
+
+    def apply(values: list[int]) -> list[int]:
+        if any(not 0 <= v < 1 << 64 for v in values):
+            raise OverflowError("not an unsigned 64-bit integer")
+        return [int(v) for v in fn(np.array(values, dtype=np.uint64))]
+
+    return apply
+
+
+def _outcome(fn: Callable, *args) -> tuple[str, Any]:
+    try:
+        return ("ok", _normalize(fn(*args)))
+    except Exception as e:
+        return ("error", type(e).__name__)
+
+
+def _printable(value: Any) -> Any:
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).hex()
+    if isinstance(value, tuple):
+        return [_printable(v) for v in value]
+    return value
+
+
+def _reference(kind: str, engine: str, keys: list[str], rounds: int) -> Any:
+    if kind == FPE:
+        return ReferenceFPECipher(engine, keys[0], rounds)
+    return ReferenceCipher(keys, rounds)
+
+
+def _report(
+    results: Iterator[tuple], cases: int, seed: int, max_mismatches: int, start: float
+) -> dict:
+    checks = 0
+    count = 0
+    mismatches = list[dict]()
+    for found in results:
+        checks += found[1]
+        count += len(found[2])
+        mismatches += found[2][: max(0, max_mismatches - len(mismatches))]
+    elapsed = time.perf_counter() - start
+    return {
+        "cases": cases,
+        "seed": seed,
+        "checks": checks,
+        "elapsed": elapsed,
+        "cases_per_minute": cases / elapsed * 60,
+        "checks_per_minute": checks / elapsed * 60,
+        "mismatch_count": count,
+        "mismatches": mismatches,
+    }
+
+
+def _rows(fn: Callable) -> Callable:
+    # Applies an array method to values of the same length at once
+    import numpy as np
+
+    def apply(values: list[bytearray]) -> list[bytes]:
+        results = [b""] * len(values)
+        by_length = dict[int, list[int]]()
+        for position, value in enumerate(values):
+            by_length.setdefault(len(value), []).append(position)
+        for length, positions in by_length.items():
+            records = np.frombuffer(
+                b"".join(bytes(values[p]) for p in positions), dtype=np.uint8
+            ).reshape(len(positions), length)
+            for position, row in zip(positions, fn(records)):
+                results[position] = row.tobytes()
+        return results
+
+    return apply
+
+
+def _vector(base: dict, op: str, value: Any, outcome: tuple) -> dict:
+    vector = dict(base, op=op, input=_printable(value))
+    if outcome[0] == "ok":
+        vector["output"] = _printable(outcome[1])
+    else:
+        vector["error"] = outcome[1]
+    return vector
+
+
+def _vectorized(config: tuple) -> Any:
+    try:
+        from feistel.vectorized import VectorizedFPECipher
+    except ImportError:
+        return None
+    _, engine, keys, rounds = config
+    return VectorizedFPECipher(engine, keys[0], rounds)
+
+
+def _xor_bytes(b1: bytearray, b2: bytearray) -> bytearray:
+    # Original list-based XOR, truncated to the shortest array
+    return bytearray([p1 ^ p2 for p1, p2 in zip([x for x in b1], [x for x in b2])])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
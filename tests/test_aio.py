@@ -0,0 +1,89 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from feistel import Cipher, FPECipher, SHA_256
+from feistel.aio import AsyncCipher
+
+
+class TestAio(TestCase):
+    def test_async_cipher(self):
+        cipher = FPECipher(SHA_256, "some-32-byte-long-key-to-be-safe", 10)
+
+        async def run():
+            async with AsyncCipher(cipher, max_batch=8, max_queue=4) as facade:
+                values = [f"value-{idx}" for idx in range(50)]
+                obfuscated = await asyncio.gather(*map(facade.encrypt, values))
+                self.assertEqual(obfuscated, cipher.encrypt_many(values))
+                self.assertEqual(await facade.encrypt_number(123), 28234)
+                self.assertEqual(await facade.decrypt_many(obfuscated), values)
+
+        asyncio.run(run())
+
+    def test_errors(self):
+        cipher = Cipher("some-32-byte-long-key-to-be-safe", 10)
+
+        async def run():
+            with ThreadPoolExecutor(2) as executor:
+                async with AsyncCipher(cipher, executor) as facade:
+                    results = await asyncio.gather(
+                        facade.encrypt("Edgewhere"),
+                        facade.encrypt_number(123),
+                        return_exceptions=True,
+                    )
+                    self.assertEqual(results[0], cipher.encrypt("Edgewhere"))
+                    self.assertIsInstance(results[1], AttributeError)
+
+        asyncio.run(run())
+
+    def test_batches(self):
+        class CountingCipher(FPECipher):
+            def __init__(self, *args):
+                super().__init__(*args)
+                self.batches = list[tuple[str, int]]()
+                self.running = self.peak = 0
+
+            def encrypt_many(self, data):
+                self.running += 1
+                self.peak = max(self.peak, self.running)
+                time.sleep(0.01)
+                self.batches.append(("encrypt_many", len(data)))
+                self.running -= 1
+                return super().encrypt_many(data)
+
+            def encrypt_numbers(self, numbers):
+                self.batches.append(("encrypt_numbers", len(numbers)))
+                return super().encrypt_numbers(numbers)
+
+        cipher = CountingCipher(SHA_256, "some-32-byte-long-key-to-be-safe", 10)
+
+        async def run():
+            with ThreadPoolExecutor(4) as executor:
+                async with AsyncCipher(
+                    cipher, executor, max_batch=3, max_inflight=1
+                ) as facade:
+                    values = [f"value-{idx}" for idx in range(10)]
+                    obfuscated = await facade.encrypt_many(values)
+                    self.assertEqual(obfuscated, [cipher.encrypt(v) for v in values])
+                    # Chunks of `max_batch` values, one at a time
+                    self.assertEqual(
+                        cipher.batches,
+                        [("encrypt_many", 3)] * 3 + [("encrypt_many", 1)],
+                    )
+                    self.assertEqual(cipher.peak, 1)
+
+                    cipher.batches.clear()
+                    results = await asyncio.gather(
+                        facade.encrypt_number(123),
+                        facade.encrypt_number(-1),
+                        facade.encrypt_number(1403),
+                        return_exceptions=True,
+                    )
+                    # The failing batch is processed again value by value
+                    self.assertEqual(cipher.batches, [("encrypt_numbers", 3)])
+                    self.assertEqual(results[0], cipher.encrypt_number(123))
+                    self.assertIsInstance(results[1], OverflowError)
+                    self.assertEqual(results[2], cipher.encrypt_number(1403))
+
+        asyncio.run(run())
@@ -0,0 +1,32 @@
+from unittest import TestCase
+
+from feistel.bench import build_cases, compare, FPE, run
+
+
+class TestBench(TestCase):
+    def test_run(self):
+        cases = build_cases([FPE], ["sha-256"], [2], [2, 16], [123])
+        self.assertEqual(
+            [case.name for case in cases],
+            [
+                "fpe/sha-256/r2/encrypt/2",
+                "fpe/sha-256/r2/decrypt/2",
+                "fpe/sha-256/r2/encrypt/16",
+                "fpe/sha-256/r2/decrypt/16",
+                "fpe/sha-256/r2/encrypt_number/123",
+                "fpe/sha-256/r2/encrypt_number_as_string/123",
+            ],
+        )
+        report = run(cases[:2], min_time=0.001)
+        result = report["results"]["fpe/sha-256/r2/encrypt/2"]
+        self.assertTrue(result["ops_per_sec"] > 0)
+        self.assertTrue(result["p50_us"] <= result["p99_us"])
+
+        self.assertEqual(compare(report, report), [])
+        faster = {
+            "results": {
+                name: dict(result, ops_per_sec=result["ops_per_sec"] * 2)
+                for name, result in report["results"].items()
+            }
+        }
+        self.assertEqual(len(compare(report, faster)), 2)
@@ -0,0 +1,114 @@
+import pickle
+from unittest import TestCase
+
+from feistel import (
+    Cipher,
+    CustomCipher,
+    DIGITS,
+    FPECipher,
+    RadixCipher,
+    SHA_256,
+    SHA_3,
+)
+from feistel.cache import CachedCipher, fingerprint, ResultCache
+
+
+class TestCache(TestCase):
+    def test_cached_cipher(self):
+        cipher = FPECipher(SHA_256, "some-32-byte-long-key-to-be-safe", 128)
+        cached = CachedCipher(cipher)
+        self.assertEqual(cached.encrypt_number(123), 24359)
+        self.assertEqual(cached.encrypt_number(123), 24359)
+        self.assertEqual(cached.stats()["hits"], 1)
+
+        # Encryption primes decryption
+        self.assertEqual(cached.decrypt_number(24359), 123)
+        self.assertEqual(cached.stats()["hits"], 2)
+        self.assertEqual(cached.stats()["misses"], 1)
+
+        obfuscated = cached.encrypt_number_as_string("99")
+        self.assertEqual(obfuscated, cipher.encrypt_number_as_string("99"))
+        self.assertEqual(
+            cached.decrypt_number_as_string(obfuscated),
+            cipher.decrypt_number_as_string(obfuscated),
+        )
+
+        values = ["FR", "DE", "FR", "FR"]
+        self.assertEqual(cached.encrypt_many(values), cipher.encrypt_many(values))
+
+    def test_inexact_inverse(self):
+        cipher = FPECipher(SHA_256, "some-32-byte-long-key-to-be-safe", 10)
+        obfuscated = cipher.encrypt_number(1966103992)
+        self.assertEqual(obfuscated, 1180132317)
+        # Deciphering is not the exact inverse: the trailing zero byte is dropped
+        self.assertEqual(cipher.decrypt_number(obfuscated), 7691704)
+
+        cached = CachedCipher(cipher)
+        self.assertEqual(cached.encrypt_number(1966103992), obfuscated)
+        self.assertEqual(cached.decrypt_number(obfuscated), 7691704)
+        self.assertEqual(cached.stats()["hits"], 1)
+        self.assertEqual(CachedCipher(cipher).decrypt_number(obfuscated), 7691704)
+
+    def test_bytearray_results(self):
+        cached = CachedCipher(Cipher("some-32-byte-long-key-to-be-safe", 10))
+        first = cached.encrypt("Edgewhere")
+        first[0] = 0
+        self.assertEqual(
+            cached.encrypt("Edgewhere"), cached.cipher.encrypt("Edgewhere")
+        )
+        self.assertEqual(
+            cached.decrypt(bytes(cached.encrypt("Edgewhere"))), "Edgewhere"
+        )
+
+    def test_shared_cache(self):
+        cache = ResultCache()
+        key = "some-32-byte-long-key-to-be-safe"
+        ciphers = [
+            FPECipher(SHA_256, key, 10),
+            FPECipher(SHA_256, key, 12),
+            FPECipher(SHA_3, key, 10),
+            FPECipher(SHA_256, key + "!", 10),
+        ]
+        cached = [CachedCipher(cipher, cache) for cipher in ciphers]
+        self.assertEqual(len({c.fingerprint for c in cached}), len(ciphers))
+        for c in cached:
+            self.assertEqual(c.encrypt("Edgewhere"), c.cipher.encrypt("Edgewhere"))
+        self.assertEqual(cache.stats()["hits"], 0)
+
+    def test_non_key_state(self):
+        cache = ResultCache()
+        key = "some-32-byte-long-key-to-be-safe"
+        digits = CachedCipher(RadixCipher(SHA_256, key, 10, DIGITS), cache)
+        reversed_digits = CachedCipher(
+            RadixCipher(SHA_256, key, 10, DIGITS[::-1]), cache
+        )
+        self.assertNotEqual(digits.fingerprint, reversed_digits.fingerprint)
+        self.assertEqual(digits.encrypt("123"), digits.cipher.encrypt("123"))
+        self.assertEqual(
+            reversed_digits.encrypt("123"), reversed_digits.cipher.encrypt("123")
+        )
+        self.assertNotEqual(digits.encrypt("123"), reversed_digits.encrypt("123"))
+
+        # The same configuration still shares the entries
+        same = CachedCipher(RadixCipher(SHA_256, key, 10, DIGITS), cache)
+        self.assertEqual(same.fingerprint, digits.fingerprint)
+        for cipher in [Cipher(key, 10), CustomCipher(["abcd", "efgh"])]:
+            self.assertEqual(
+                fingerprint(cipher), fingerprint(pickle.loads(pickle.dumps(cipher)))
+            )
+        self.assertNotEqual(fingerprint(Cipher(key, 10)), fingerprint(Cipher(key, 12)))
+
+    def test_eviction(self):
+        cache = ResultCache(max_entries=4)
+        for i in range(10):
+            cache.put(i, str(i))
+        self.assertEqual(len(cache), 4)
+        self.assertEqual(cache.stats()["evictions"], 6)
+        self.assertIsNone(cache.get(0))
+        self.assertEqual(cache.get(9), "9")
+
+        cache = ResultCache(max_bytes=500)
+        for i in range(100):
+            cache.put(i, "x" * 100)
+        self.assertTrue(cache.size <= 500)
+        self.assertTrue(len(cache) < 5)
@@ -24,3 +24,29 @@ class TestCipher(TestCase):
         obfuscated = b"=|\n\x0fQAZR\x10T"
         found = cipher.decrypt(obfuscated)
         self.assertEqual(found, expected)
+
+    def test_many(self):
+        cipher = Cipher(
+            "8ed9dcc1701c064f0fd7ae235f15143f989920e0ee9658bb7882c8d7d5f05692", 10
+        )
+        data = ["Edgewhere", "", "a", "Edgewhere", "feistel-py", "ab"]
+        obfuscated = cipher.encrypt_many(data)
+        self.assertEqual(obfuscated, [cipher.encrypt(d) for d in data])
+        self.assertEqual(obfuscated[0].hex(), "3d7c0a0f51415a521054")
+        self.assertEqual(cipher.decrypt_many(obfuscated), data)
+
+    def test_bytes(self):
+        cipher = Cipher(
+            "8ed9dcc1701c064f0fd7ae235f15143f989920e0ee9658bb7882c8d7d5f05692", 10
+        )
+        buffer = bytearray(b"--Edgewhere--")
+        found = cipher.encrypt_bytes(memoryview(buffer)[2:11])
+        self.assertEqual(found.hex(), "3d7c0a0f51415a521054")
+        self.assertEqual(cipher.decrypt_bytes(found), b"Edgewhere")
+
+        # Non-ASCII data goes through strings
+        for data in ["Édgewhère", "€"]:
+            obfuscated = cipher.encrypt_bytes(data.encode())
+            self.assertEqual(obfuscated, cipher.encrypt(data))
+            self.assertEqual(cipher.decrypt_bytes(obfuscated), data.encode())
+            self.assertEqual(cipher.decrypt(obfuscated), data)
@@ -46,3 +46,33 @@ class TestCustomCipher(TestCase):
         obfuscated = bytearray.fromhex("445951465c5a19613633")
         found = cipher.decrypt(obfuscated)
         self.assertEqual(found, expected)
+
+    def test_many(self):
+        cipher = CustomCipher(
+            [
+                "1234567890abcdef1234567890abcdef1234567890abcdef1234567890abcdef",
+                "9876543210fedcba9876543210fedcba9876543210fedcba9876543210fedcba",
+                "abcdef0123456789abcdef0123456789abcdef0123456789abcdef0123456789",
+            ]
+        )
+        data = ["Edgewhere", "feistel-py", "", "Edgewhere"]
+        obfuscated = cipher.encrypt_many(data)
+        self.assertEqual(obfuscated, [cipher.encrypt(d) for d in data])
+        self.assertEqual(obfuscated[0].hex(), "445951465c5a19613633")
+        self.assertEqual(cipher.decrypt_many(obfuscated), data)
+
+    def test_bytes(self):
+        cipher = CustomCipher(
+            [
+                "1234567890abcdef1234567890abcdef1234567890abcdef1234567890abcdef",
+                "9876543210fedcba9876543210fedcba9876543210fedcba9876543210fedcba",
+                "abcdef0123456789abcdef0123456789abcdef0123456789abcdef0123456789",
+            ]
+        )
+        found = cipher.encrypt_bytes(memoryview(b"Edgewhere"))
+        self.assertEqual(found.hex(), "445951465c5a19613633")
+        self.assertEqual(cipher.decrypt_bytes(found), b"Edgewhere")
+
+        obfuscated = cipher.encrypt_bytes("Édgewhère".encode())
+        self.assertEqual(obfuscated, cipher.encrypt("Édgewhère"))
+        self.assertEqual(cipher.decrypt(obfuscated), "Édgewhère")
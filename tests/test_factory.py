@@ -0,0 +1,106 @@
+from unittest import TestCase
+
+from feistel import (
+    Cipher,
+    CipherRegistry,
+    CustomCipher,
+    evict_ciphers,
+    FPECipher,
+    get_cipher,
+    SHA_256,
+    SHA_3,
+)
+
+
+class TestCipherRegistry(TestCase):
+    def test_get(self):
+        registry = CipherRegistry()
+        cipher = registry.get("fpe", "some-32-byte-long-key-to-be-safe", SHA_256, 10)
+        self.assertIsInstance(cipher, FPECipher)
+        self.assertIs(
+            registry.get("fpe", "some-32-byte-long-key-to-be-safe", SHA_256, 10), cipher
+        )
+        self.assertIsNot(
+            registry.get("fpe", "some-32-byte-long-key-to-be-safe", SHA_3, 10), cipher
+        )
+        self.assertEqual(
+            cipher.encrypt("Edgewhere"),
+            FPECipher(SHA_256, "some-32-byte-long-key-to-be-safe", 10).encrypt(
+                "Edgewhere"
+            ),
+        )
+        self.assertIsInstance(registry.get("feistel", "some-key"), Cipher)
+        self.assertIs(
+            registry.get("feistel", "some-key", SHA_3),
+            registry.get("feistel", "some-key"),
+        )
+        custom = registry.get("custom", ["first-key", "second-key"])
+        self.assertIsInstance(custom, CustomCipher)
+        self.assertIs(registry.get("custom", ["first-key", "second-key"]), custom)
+        self.assertEqual(
+            registry.stats(), {"entries": 4, "hits": 4, "misses": 4, "evictions": 0}
+        )
+
+    def test_bounded(self):
+        registry = CipherRegistry(max_entries=2)
+        first = registry.get("feistel", "first-key")
+        registry.get("feistel", "second-key")
+        registry.get("feistel", "first-key")
+        registry.get("feistel", "third-key")
+        self.assertEqual(len(registry), 2)
+        self.assertEqual(registry.stats()["evictions"], 1)
+        self.assertIs(registry.get("feistel", "first-key"), first)
+
+    def test_evict(self):
+        registry = CipherRegistry()
+        cipher = registry.get("fpe", "old-key", SHA_256, 10)
+        registry.get("fpe", "old-key", SHA_3, 10)
+        registry.get("feistel", "new-key")
+        registry.get("custom", ["old-key", "new-key"])
+        # A key also evicts the custom ciphers using it among their keys
+        self.assertEqual(registry.evict("old-key"), 3)
+        self.assertIsNot(registry.get("fpe", "old-key", SHA_256, 10), cipher)
+        registry.get("custom", ["old-key", "new-key"])
+        registry.get("custom", ["other-key", "new-key"])
+        self.assertEqual(registry.evict(["old-key", "new-key"]), 1)
+        self.assertEqual(registry.evict("other-key"), 1)
+        self.assertEqual(registry.evict(), 2)
+        self.assertEqual(len(registry), 0)
+
+    def test_immutable(self):
+        registry = CipherRegistry()
+        keys = ["aaaa", "bbbb"]
+        cipher = registry.get("custom", keys)
+        keys[0] = "zzzz"
+        self.assertEqual(cipher.keys, ("aaaa", "bbbb"))
+        self.assertIs(registry.get("custom", ["aaaa", "bbbb"]), cipher)
+        self.assertEqual(
+            cipher.encrypt("Edgewhere"),
+            CustomCipher(["aaaa", "bbbb"]).encrypt("Edgewhere"),
+        )
+
+        fpe = registry.get("fpe", "some-32-byte-long-key-to-be-safe", SHA_256, 10)
+        for name, value in [("rounds", 3), ("key", "other"), ("engine", SHA_3)]:
+            with self.assertRaises(AttributeError):
+                setattr(fpe, name, value)
+        with self.assertRaises(AttributeError):
+            registry.get("feistel", "some-key").rounds = 3
+        with self.assertRaises(AttributeError):
+            cipher.keys = ("zzzz", "bbbb")
+
+    def test_wrong_arguments(self):
+        registry = CipherRegistry()
+        with self.assertRaises(Exception):
+            registry.get("unknown", "some-key")
+        with self.assertRaises(Exception):
+            registry.get("custom", "some-key")
+        with self.assertRaises(AssertionError):
+            registry.get("fpe", "some-key", "unknown-engine")
+        self.assertEqual(len(registry), 0)
+
+    def test_get_cipher(self):
+        cipher = get_cipher("fpe", "some-32-byte-long-key-to-be-safe", SHA_256, 10)
+        self.assertIs(
+            get_cipher("fpe", "some-32-byte-long-key-to-be-safe", SHA_256, 10), cipher
+        )
+        self.assertEqual(evict_ciphers("some-32-byte-long-key-to-be-safe"), 1)
@@ -0,0 +1,79 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from feistel import FPECipher, SHA_256
+from feistel.fixed import Field, obfuscate_fixed, parse_fields
+
+
+class TestFixed(TestCase):
+    def test_obfuscate_fixed(self):
+        cipher = FPECipher(SHA_256, "some-32-byte-long-key-to-be-safe", 10)
+        records = [
+            b"Edgewhere   \x00\x00\x01\x01XX\n",
+            b"Cyril Dever \x00\x00\x02\x07XX\n",
+            b"feistel-py  \x00\x01\x00\x01XX\n",
+        ]
+        fields = parse_fields("0:12,12:4:number")
+        self.assertEqual(len(fields), 2)
+        self.assertEqual(fields[1].kind, "number")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "source.dat")
+            with open(source, "wb") as f:
+                f.write(b"".join(records))
+
+            output = os.path.join(tmp, "output.dat")
+            self.assertEqual(obfuscate_fixed(cipher, source, 19, fields, output), 3)
+            with open(output, "rb") as f:
+                obfuscated = f.read()
+            for idx, record in enumerate(records):
+                result = obfuscated[idx * 19 : (idx + 1) * 19]
+                self.assertEqual(result[:12], cipher.encrypt_bytes(record[:12]))
+                self.assertEqual(
+                    int.from_bytes(result[12:16], "big"),
+                    cipher.encrypt_number(int.from_bytes(record[12:16], "big")),
+                )
+                self.assertEqual(result[16:], b"XX\n")
+
+            obfuscate_fixed(cipher, output, 19, fields, decrypt=True, workers=2)
+            with open(output, "rb") as f:
+                self.assertEqual(f.read(), b"".join(records))
+
+            with self.assertRaises(Exception):
+                obfuscate_fixed(cipher, source, 18, fields, output)
+            with self.assertRaises(Exception):
+                obfuscate_fixed(cipher, source, 19, [Field(0, 12), Field(8, 8)])
+
+    def test_failure(self):
+        cipher = FPECipher(SHA_256, "some-32-byte-long-key-to-be-safe", 10)
+        # 256 cannot be obfuscated as a number, which fails on the second record
+        records = [b"Edgewhere   \x00\x01", b"Cyril Dever \x01\x00"]
+        fields = parse_fields("0:12,12:2:number")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "source.dat")
+            with open(source, "wb") as f:
+                f.write(b"".join(records))
+            output = os.path.join(tmp, "output.dat")
+            with open(output, "wb") as f:
+                f.write(b"previous")
+
+            for target, workers in [(output, None), (None, None), (None, 2)]:
+                with self.assertRaises(OverflowError):
+                    obfuscate_fixed(cipher, source, 14, fields, target, workers=workers)
+                with open(source, "rb") as f:
+                    self.assertEqual(f.read(), b"".join(records))
+                with open(output, "rb") as f:
+                    self.assertEqual(f.read(), b"previous")
+                self.assertEqual(sorted(os.listdir(tmp)), ["output.dat", "source.dat"])
+
+            # Valid numbers are processed in the file itself, without any copy
+            with open(source, "wb") as f:
+                f.write(b"".join(records[:1]) * 3)
+            inode = os.stat(source).st_ino
+            self.assertEqual(obfuscate_fixed(cipher, source, 14, fields), 3)
+            self.assertEqual(os.stat(source).st_ino, inode)
+            obfuscate_fixed(cipher, source, 14, fields, decrypt=True)
+            with open(source, "rb") as f:
+                self.assertEqual(f.read(), b"".join(records[:1]) * 3)
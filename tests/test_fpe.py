@@ -1,6 +1,17 @@
+from array import array
+import pickle
 from unittest import TestCase
 
-from feistel import FPECipher, Readable, hex2Readable, BLAKE2B, SHA_256
+from feistel import (
+    BLAKE2B_KEYED,
+    FPECipher,
+    hex2Readable,
+    Readable,
+    BLAKE2B,
+    KECCAK,
+    SHA_256,
+    SHAKE_128,
+)
 
 
 class TestFPECipher(TestCase):
@@ -99,3 +110,107 @@ class TestFPECipher(TestCase):
 
         deobfuscated = cipher.decrypt_number_as_string(output)
         self.assertEqual(deobfuscated, input)
+
+    def test_many(self):
+        cipher = FPECipher(
+            SHA_256,
+            "8ed9dcc1701c064f0fd7ae235f15143f989920e0ee9658bb7882c8d7d5f05692",
+            10,
+        )
+        data = ["Edgewhere", "", "a", "Edgewhere", "feistel-py", "ab"]
+        obfuscated = cipher.encrypt_many(data)
+        self.assertEqual(obfuscated, [cipher.encrypt(d) for d in data])
+        self.assertEqual(obfuscated[0], Readable("K¡(#q|r5*"))
+        self.assertEqual(
+            cipher.decrypt_many(obfuscated), [cipher.decrypt(o) for o in obfuscated]
+        )
+
+    def test_many_shared_rounds(self):
+        class CountingFPECipher(FPECipher):
+            calls = 0
+
+            def _round_bytes(self, item, idx):
+                self.calls += 1
+                return super()._round_bytes(item, idx)
+
+        for engine in [SHA_256, SHAKE_128]:
+            cipher = CountingFPECipher(engine, "some-32-byte-long-key-to-be-safe", 10)
+            emails = [f"{user}@example.com" for user in ["abcd", "efgh", "ijkl"]]
+            data = emails * 3 + ["https://example.com/some/page"] * 4
+            expected = [cipher.encrypt(d) for d in data]
+            cipher.calls = 0
+            obfuscated = cipher.encrypt_many(data)
+            self.assertEqual(obfuscated, expected)
+            # The emails share the right half of their first round, the duplicates are only processed once
+            self.assertEqual(cipher.calls, 1 + 3 * 9 + 10)
+            deobfuscated = [cipher.decrypt(o) for o in expected]
+            cipher.calls = 0
+            self.assertEqual(cipher.decrypt_many(obfuscated), deobfuscated)
+            # Same with the last round of the decryption
+            self.assertEqual(cipher.calls, 1 + 3 * 9 + 10)
+
+    def test_numbers(self):
+        cipher = FPECipher(SHA_256, "some-32-byte-long-key-to-be-safe", 128)
+        numbers = [123456789, 0, 123, 18446744073709551615, 100, 1403, 123]
+        obfuscated = cipher.encrypt_numbers(numbers)
+        self.assertEqual(obfuscated, [cipher.encrypt_number(n) for n in numbers])
+        self.assertEqual(obfuscated[:3], [22780178, 0, 24359])
+        self.assertEqual(cipher.decrypt_numbers(obfuscated), numbers)
+
+        buffer = cipher.encrypt_numbers(array("Q", numbers))
+        self.assertEqual(buffer, array("Q", obfuscated))
+        self.assertEqual(cipher.decrypt_numbers(buffer), array("Q", numbers))
+
+        # Same results as through bytes, including the overflowing numbers
+        for n in [1, 127, 128, 255, 257, 65535, 65537, 4294967295, 4294967297]:
+            width = (
+                2
+                if n < 128
+                else 1 if n < 256 else 2 if n < 65536 else 4 if n < 2**32 else 8
+            )
+            self.assertEqual(
+                cipher.encrypt_number(n),
+                int.from_bytes(cipher.encrypt_bytes(n.to_bytes(width, "big")), "big"),
+            )
+        for n in [256, 65536, 4294967296, 18446744073709551616]:
+            with self.assertRaises(OverflowError):
+                cipher.encrypt_number(n)
+
+    def test_into(self):
+        cipher = FPECipher(SHA_256, "some-32-byte-long-key-to-be-safe", 10)
+        buffer = bytearray(b"--Edgewhere--")
+        self.assertEqual(cipher.encrypt_into(buffer, 2, 9), 9)
+        self.assertEqual(buffer, b"--" + cipher.encrypt_bytes(b"Edgewhere") + b"--")
+        self.assertEqual(cipher.decrypt_into(memoryview(buffer)[2:], 0, 9), 9)
+        self.assertEqual(buffer, bytearray(b"--Edgewhere--"))
+
+        # One byte less is right-aligned with a leading zero byte
+        buffer = bytearray(b"\x00\x00\x00/")
+        self.assertEqual(cipher.decrypt_into(buffer), 3)
+        self.assertEqual(buffer, b"\x00`hJ")
+        self.assertEqual(cipher.decrypt_bytes(b"\x00\x00\x00/"), b"`hJ")
+
+        with self.assertRaises(TypeError):
+            cipher.encrypt_into(b"Edgewhere")
+
+    def test_keyed_engines(self):
+        for engine in [BLAKE2B_KEYED, SHAKE_128]:
+            cipher = FPECipher(engine, "some-32-byte-long-key-to-be-safe", 10)
+            obfuscated = cipher.encrypt("Edgewhere")
+            self.assertEqual(len(obfuscated), 9)
+            self.assertNotEqual(
+                obfuscated,
+                FPECipher(SHA_256, "some-32-byte-long-key-to-be-safe", 10).encrypt(
+                    "Edgewhere"
+                ),
+            )
+            self.assertEqual(cipher.decrypt(obfuscated), "Edgewhere")
+            for n in [123, 1403, 123456789]:
+                self.assertEqual(cipher.decrypt_number(cipher.encrypt_number(n)), n)
+
+    def test_pickle(self):
+        for engine in [KECCAK, SHA_256, SHAKE_128]:
+            cipher = FPECipher(engine, "some-32-byte-long-key-to-be-safe", 10)
+            expected = cipher.encrypt("Edgewhere")
+            found = pickle.loads(pickle.dumps(cipher))
+            self.assertEqual(found.encrypt("Edgewhere"), expected)
@@ -0,0 +1,98 @@
+from unittest import TestCase, skipUnless
+
+try:
+    import pandas as pd
+    import pyarrow as pa
+except ImportError:
+    pa = pd = None
+
+from feistel import Cipher, FPECipher, SHA_256
+
+KEY = "8ed9dcc1701c064f0fd7ae235f15143f989920e0ee9658bb7882c8d7d5f05692"
+
+
+@skipUnless(pa and pd, "pandas or pyarrow is not installed")
+class TestFrame(TestCase):
+    def test_encrypt_column(self):
+        from feistel.frame import decrypt_column, encrypt_column
+
+        cipher = FPECipher(SHA_256, KEY, 10)
+        values = ["Edgewhere", "Cyril", None, "Edgewhere", "日本語", ""]
+        series = pd.Series(values, name="name", index=list("abcdef"))
+        found = encrypt_column(cipher, series)
+        self.assertIsInstance(found.dtype, pd.ArrowDtype)
+        self.assertEqual(found.name, "name")
+        self.assertEqual(list(found.index), list("abcdef"))
+        self.assertEqual(found["a"], "K¡(#q|r5*")
+        self.assertTrue(pd.isna(found["c"]))
+        self.assertEqual(found.tolist()[3:], [cipher.encrypt(v) for v in values[3:]])
+        self.assertEqual(
+            encrypt_column(cipher, series.astype("category")).tolist(), found.tolist()
+        )
+        self.assertEqual(decrypt_column(cipher, found).tolist()[:2], values[:2])
+
+        array = pa.chunked_array([values[:2], values[2:]])
+        self.assertEqual(
+            encrypt_column(cipher, array).to_pylist(), pa.array(found).to_pylist()
+        )
+
+    def test_numbers(self):
+        from feistel.frame import decrypt_column, encrypt_column
+
+        cipher = FPECipher(SHA_256, "some-32-byte-long-key-to-be-safe", 128)
+        numbers = pa.array([123456789, 123, None, 0, 123456789], pa.int64())
+        found = encrypt_column(cipher, numbers, True)
+        self.assertEqual(found.type, pa.uint64())
+        self.assertEqual(found.to_pylist(), [22780178, 24359, None, 0, 22780178])
+        self.assertEqual(decrypt_column(cipher, found, True), numbers.cast(pa.uint64()))
+
+        strings = encrypt_column(cipher, pa.array(["0123", "123456789"]), True)
+        self.assertEqual(strings.to_pylist(), ["24359", "022780178"])
+
+        with self.assertRaises(Exception):
+            encrypt_column(Cipher(KEY, 10), numbers, True)
+
+    def test_binary(self):
+        from feistel.frame import decrypt_column, encrypt_column
+
+        cipher = Cipher(KEY, 10)
+        found = encrypt_column(cipher, pa.array(["Edgewhere", "a", None]))
+        self.assertEqual(found.type, pa.binary())
+        self.assertEqual(found[0].as_py(), bytes(cipher.encrypt("Edgewhere")))
+        self.assertEqual(
+            decrypt_column(cipher, found).to_pylist(), ["Edgewhere", "a", None]
+        )
+        with self.assertRaises(Exception):
+            decrypt_column(cipher, pa.array([1, 2]))
+
+    def test_obfuscate_frame(self):
+        from feistel.frame import obfuscate_frame
+
+        cipher = FPECipher(SHA_256, KEY, 10)
+        frame = pd.DataFrame(
+            {"name": ["Edgewhere", "Cyril"], "id": [1, 2], "x": [3, 4]}
+        )
+        found = obfuscate_frame(cipher, frame, ["name"], ["id"])
+        self.assertEqual(found["name"].tolist()[0], "K¡(#q|r5*")
+        self.assertEqual(found["id"].tolist(), cipher.encrypt_numbers([1, 2]))
+        self.assertEqual(found["x"].tolist(), [3, 4])
+        self.assertEqual(frame["name"].tolist(), ["Edgewhere", "Cyril"])
+        back = obfuscate_frame(cipher, found, ["name"], ["id"], decrypt=True)
+        self.assertEqual(back["name"].tolist(), ["Edgewhere", "Cyril"])
+        self.assertEqual(back["id"].tolist(), [1, 2])
+
+        table = obfuscate_frame(cipher, pa.table(frame), ["name"], ["id"])
+        self.assertEqual(table.column("name").to_pylist(), found["name"].tolist())
+        self.assertEqual(table.column_names, ["name", "id", "x"])
+        with self.assertRaises(Exception):
+            obfuscate_frame(cipher, frame, ["unknown"])
+
+    def test_workers(self):
+        from feistel.frame import encrypt_column
+
+        cipher = FPECipher(SHA_256, KEY, 10)
+        values = pa.array([f"value-{i % 50}" for i in range(200)])
+        self.assertEqual(
+            encrypt_column(cipher, values, workers=2, chunk_size=10),
+            encrypt_column(cipher, values),
+        )
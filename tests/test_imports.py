@@ -0,0 +1,54 @@
+import subprocess
+import sys
+from unittest import TestCase
+
+HEAVY_MODULES = [
+    "asyncio",
+    "Crypto",
+    "concurrent.futures.process",
+    "csv",
+    "json",
+    "multiprocessing",
+    "numpy",
+    "pyutls",
+]
+
+
+def imported_modules(code: str) -> set[str]:
+    found = subprocess.run(
+        [sys.executable, "-c", f"{code}\nimport sys\nprint(' '.join(sys.modules))"],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return set(found.stdout.split())
+
+
+class TestImports(TestCase):
+    def test_lazy_dependencies(self):
+        for code in ["import feistel", "import feistel.__main__"]:
+            modules = imported_modules(code)
+            for name in HEAVY_MODULES:
+                self.assertNotIn(name, modules, code)
+
+    def test_lazy_engines(self):
+        modules = imported_modules(
+            "from feistel import FPECipher, KECCAK\nFPECipher(KECCAK, 'key', 10).encrypt('Edgewhere')"
+        )
+        self.assertIn("Crypto.Hash.keccak", modules)
+        self.assertNotIn("Crypto.Cipher", modules)
+
+    def test_lazy_modules(self):
+        import feistel
+
+        self.assertEqual(feistel.cache.CachedCipher.__name__, "CachedCipher")
+        with self.assertRaises(AttributeError):
+            feistel.unknown
+
+    def test_namespace(self):
+        import feistel
+
+        for name in ["os", "string", "threading", "deque", "Any", "FPE", "CUSTOM"]:
+            self.assertFalse(hasattr(feistel, name), name)
+        for name in ["ParallelCipher", "RadixCipher", "DIGITS", "get_cipher"]:
+            self.assertTrue(hasattr(feistel, name), name)
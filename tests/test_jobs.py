@@ -0,0 +1,136 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from feistel import DIGITS, FPECipher, RadixCipher, SHA_256
+from feistel.jobs import BulkJob, format_metrics, list_partitions
+from feistel.stream import ColumnObfuscator, obfuscate_csv
+
+OLD_KEY = "some-32-byte-long-key-to-be-safe"
+NEW_KEY = "8ed9dcc1701c064f0fd7ae235f15143f989920e0ee9658bb7882c8d7d5f05692"
+
+
+class TestBulkJob(TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.root = self._dir.name
+        self.input = os.path.join(self.root, "input")
+        self.output = os.path.join(self.root, "output")
+        os.makedirs(self.input)
+        for i in range(3):
+            with open(os.path.join(self.input, f"part-{i}.csv"), "w") as f:
+                f.write("id,name,amount\n")
+                for j in range(25):
+                    f.write(f"{i * 100 + j},name-{j},{j:05d}\n")
+        with open(os.path.join(self.input, "part-3.jsonl"), "w") as f:
+            f.write('{"name": "Edgewhere", "amount": 123}\n')
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_run(self):
+        cipher = FPECipher(SHA_256, NEW_KEY, 10)
+        partitions = list_partitions(self.input)
+        self.assertEqual(len(partitions), 4)
+        metrics = list[dict]()
+        job = BulkJob(
+            partitions,
+            self.output,
+            cipher,
+            ["name"],
+            ["amount"],
+            chunk_size=10,
+            progress=metrics.append,
+            interval=0,
+        )
+        found = job.run()
+        self.assertEqual(found["completed"], 4)
+        self.assertEqual(found["rows"], 76)
+        self.assertEqual(found["bytes"], found["total_bytes"])
+        self.assertEqual(found["eta"], 0)
+        self.assertGreater(found["rows_per_sec"], 0)
+        self.assertGreater(len(metrics), 4)
+        self.assertIn("76 rows", format_metrics(found))
+        with open(os.path.join(self.output, "part-3.jsonl")) as f:
+            row = json.loads(f.readline())
+        self.assertEqual(row["name"], cipher.encrypt("Edgewhere"))
+        self.assertEqual(row["amount"], cipher.encrypt_number(123))
+        with open(os.path.join(self.output, ".checkpoints", "part-0.csv.json")) as f:
+            self.assertEqual(json.load(f)["rows"], 25)
+        self.assertEqual(
+            sorted(os.listdir(self.output)),
+            [".checkpoints", "part-0.csv", "part-1.csv", "part-2.csv", "part-3.jsonl"],
+        )
+
+        # Completed partitions are skipped, modified ones are processed again
+        found = BulkJob(partitions, self.output, cipher, ["name"], ["amount"]).run()
+        self.assertEqual((found["skipped"], found["completed"]), (4, 0))
+        with open(partitions[1], "a") as f:
+            f.write("999,added,00001\n")
+        found = BulkJob(partitions, self.output, cipher, ["name"], ["amount"]).run()
+        self.assertEqual(
+            (found["skipped"], found["completed"], found["rows"]), (3, 1, 26)
+        )
+
+        # Another configuration does not use the checkpoints
+        found = BulkJob(partitions, self.output, cipher, ["name"]).run()
+        self.assertEqual(found["completed"], 4)
+
+    def test_cipher_configuration(self):
+        partitions = list_partitions(self.input)
+        fingerprints = [
+            BulkJob(
+                partitions,
+                self.output,
+                RadixCipher(SHA_256, NEW_KEY, 10, alphabet),
+                ["id"],
+            )._fingerprint
+            for alphabet in [DIGITS, DIGITS, DIGITS[::-1]]
+        ]
+        # A cipher differing only by its alphabet is another job
+        self.assertEqual(fingerprints[0], fingerprints[1])
+        self.assertNotEqual(fingerprints[0], fingerprints[2])
+
+    def test_resume(self):
+        cipher = FPECipher(SHA_256, NEW_KEY, 10)
+        with open(os.path.join(self.input, "part-2.csv"), "a") as f:
+            f.write("1,invalid,not-a-number\n")
+        partitions = list_partitions(self.input)
+        job = BulkJob(partitions, self.output, cipher, ["name"], ["amount"])
+        with self.assertRaises(ValueError):
+            job.run()
+        self.assertEqual(
+            sorted(os.listdir(self.output)),
+            [".checkpoints", "part-0.csv", "part-1.csv"],
+        )
+        self.assertFalse(job.is_completed(partitions[2]))
+
+        with open(partitions[2], "w") as f:
+            f.write("id,name,amount\n1,fixed,00001\n")
+        found = job.run()
+        self.assertEqual(
+            (found["skipped"], found["completed"], found["rows"]), (2, 2, 2)
+        )
+
+    def test_rekey(self):
+        old = FPECipher(SHA_256, OLD_KEY, 10)
+        new = FPECipher(SHA_256, NEW_KEY, 10)
+        partitions = list_partitions(os.path.join(self.input, "*.csv"))
+        BulkJob(partitions, self.output, old, ["name"], ["amount"]).run()
+
+        rekeyed = os.path.join(self.root, "rekeyed")
+        obfuscated = list_partitions(self.output)
+        BulkJob(obfuscated, rekeyed, new, ["name"], ["amount"], old_cipher=old).run()
+
+        expected = os.path.join(self.root, "expected.csv")
+        with (
+            open(partitions[0], newline="") as source,
+            open(expected, "w", newline="") as sink,
+        ):
+            obfuscate_csv(ColumnObfuscator(new, ["name"], ["amount"]), source, sink)
+        with open(expected) as f1, open(os.path.join(rekeyed, "part-0.csv")) as f2:
+            self.assertEqual(f1.read(), f2.read())
+
+        with self.assertRaises(Exception):
+            BulkJob(obfuscated, rekeyed, new, ["name"], old_cipher=old, decrypt=True)
@@ -0,0 +1,52 @@
+from unittest import TestCase
+
+from feistel import Cipher, FPECipher, ParallelCipher, SHA_256
+from feistel.parallel import apply_batch
+
+
+class TestParallelCipher(TestCase):
+    def test_parallel(self):
+        cipher = FPECipher(SHA_256, "some-32-byte-long-key-to-be-safe", 10)
+        data = [f"value-{i}" * (i % 5) for i in range(250)]
+        with ParallelCipher(cipher, workers=2, chunk_size=16) as parallel:
+            obfuscated = parallel.encrypt_many(data)
+            self.assertIsNotNone(parallel._pool)
+            self.assertEqual(obfuscated, cipher.encrypt_many(data))
+            self.assertEqual(
+                parallel.decrypt_many(obfuscated), cipher.decrypt_many(obfuscated)
+            )
+            numbers = list(range(0, 100000, 397))
+            self.assertEqual(
+                parallel.encrypt_numbers(numbers), cipher.encrypt_numbers(numbers)
+            )
+            self.assertEqual(
+                list(parallel.map("encrypt_number_as_string", ["00123"] * 100)),
+                [cipher.encrypt_number_as_string("00123")] * 100,
+            )
+
+    def test_serial_fallback(self):
+        cipher = Cipher("some-32-byte-long-key-to-be-safe", 10)
+        data = ["Edgewhere", "feistel-py"]
+        with ParallelCipher(cipher, workers=4) as parallel:
+            self.assertEqual(parallel.encrypt_many(data), cipher.encrypt_many(data))
+            self.assertIsNone(parallel._pool)
+
+    def test_apply_batch(self):
+        calls = []
+
+        class CountingFPECipher(FPECipher):
+            def encrypt_numbers(self, numbers):
+                calls.append(len(numbers))
+                return super().encrypt_numbers(numbers)
+
+        cipher = CountingFPECipher(SHA_256, "some-32-byte-long-key-to-be-safe", 10)
+        self.assertEqual(
+            apply_batch(cipher, "encrypt_number", [123, 0]),
+            [cipher.encrypt_number(123), 0],
+        )
+        self.assertEqual(calls, [2])
+        # Operations without batch method are applied value by value
+        self.assertEqual(
+            apply_batch(cipher, "encrypt_number_as_string", ["00123"]),
+            [cipher.encrypt_number_as_string("00123")],
+        )
@@ -0,0 +1,62 @@
+from unittest import TestCase
+
+from feistel import Cipher, CustomCipher, FPECipher, HMAC_SHA_256, SHA_256
+from feistel.profiling import format_stats, Profiler, STAGES
+
+
+class TestProfiler(TestCase):
+    def test_instrument(self):
+        profiler = Profiler()
+        for cipher in [
+            FPECipher(SHA_256, "some-32-byte-long-key-to-be-safe", 10),
+            FPECipher(HMAC_SHA_256, "some-32-byte-long-key-to-be-safe", 10),
+            Cipher("some-32-byte-long-key-to-be-safe", 10),
+            CustomCipher(["first-key", "second-key", "third-key"]),
+        ]:
+            profiled = profiler.instrument(cipher)
+            self.assertIsInstance(profiled, type(cipher))
+            self.assertEqual(profiled.encrypt("Edgewhere"), cipher.encrypt("Edgewhere"))
+            self.assertEqual(profiled.decrypt(cipher.encrypt("Edgewhere")), "Edgewhere")
+            self.assertEqual(
+                profiled.encrypt_many(["a", "bc"]), cipher.encrypt_many(["a", "bc"])
+            )
+            self.assertEqual(cipher.encrypt.__func__, type(cipher).encrypt)
+
+        stats = profiler.stats()
+        self.assertEqual(stats["operations"]["encrypt"]["calls"], 4)
+        self.assertEqual(stats["operations"]["encrypt"]["bytes"], 36)
+        self.assertEqual(stats["operations"]["encrypt_many"]["items"], 8)
+        self.assertNotIn("encrypt_bytes", stats["operations"])
+        self.assertEqual(set(stats["stages"]), set(STAGES))
+        self.assertEqual(stats["stages"]["hash"]["calls"], 132)
+        self.assertAlmostEqual(
+            sum(s["time"] for s in stats["stages"].values()), stats["time"], places=6
+        )
+        self.assertIn("conversion", format_stats(stats))
+
+        profiler.reset()
+        self.assertEqual(profiler.stats()["operations"], {})
+
+    def test_numbers(self):
+        profiler = Profiler()
+        cipher = FPECipher(SHA_256, "some-32-byte-long-key-to-be-safe", 10)
+        profiled = profiler.instrument(cipher)
+        self.assertEqual(
+            profiled.encrypt_number(123456789), cipher.encrypt_number(123456789)
+        )
+        self.assertEqual(
+            profiled.encrypt_numbers([1, 2]), cipher.encrypt_numbers([1, 2])
+        )
+        stats = profiler.stats()
+        self.assertEqual(stats["operations"]["encrypt_number"]["bytes"], 4)
+        self.assertEqual(stats["operations"]["encrypt_numbers"]["items"], 2)
+        self.assertEqual(stats["stages"]["round"]["calls"], 30)
+
+    def test_exporter(self):
+        exported = []
+        profiler = Profiler(exporter=exported.append, interval=0)
+        profiled = profiler.instrument(Cipher("some-32-byte-long-key-to-be-safe", 10))
+        profiled.encrypt("Edgewhere")
+        profiled.encrypt("Cyril")
+        self.assertEqual(len(exported), 2)
+        self.assertEqual(exported[-1]["operations"]["encrypt"]["calls"], 2)
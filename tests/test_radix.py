@@ -0,0 +1,81 @@
+from itertools import product
+import random
+from unittest import TestCase
+
+from feistel import radix
+from feistel import (
+    ALPHANUMERIC,
+    BLAKE2B_KEYED,
+    DIGITS,
+    HEX,
+    RadixCipher,
+    SHA_256,
+)
+
+
+class TestRadixCipher(TestCase):
+    def test_encrypt(self):
+        expected = "1871141155774918"
+        cipher = RadixCipher(SHA_256, "some-32-byte-long-key-to-be-safe", 10)
+        found = cipher.encrypt("4111111111111111")
+        self.assertEqual(found, expected)
+
+    def test_decrypt(self):
+        expected = "4111111111111111"
+        cipher = RadixCipher(SHA_256, "some-32-byte-long-key-to-be-safe", 10)
+        found = cipher.decrypt("1871141155774918")
+        self.assertEqual(found, expected)
+
+    def test_alphabets(self):
+        rng = random.Random(0)
+        for engine in [SHA_256, BLAKE2B_KEYED]:
+            for alphabet in [DIGITS, HEX, ALPHANUMERIC, "ab"]:
+                cipher = RadixCipher(
+                    engine, "some-32-byte-long-key-to-be-safe", 10, alphabet
+                )
+                for length in [1, 2, 7, 16, 33]:
+                    data = "".join(rng.choice(alphabet) for _ in range(length))
+                    obfuscated = cipher.encrypt(data)
+                    self.assertEqual(len(obfuscated), length)
+                    self.assertTrue(all(char in alphabet for char in obfuscated))
+                    self.assertEqual(cipher.decrypt(obfuscated), data)
+
+    def test_permutation(self):
+        for rounds in [2, 3, 10]:
+            cipher = RadixCipher(
+                SHA_256, "some-32-byte-long-key-to-be-safe", rounds, "xyz"
+            )
+            domain = ["".join(chars) for chars in product("xyz", repeat=4)]
+            obfuscated = [cipher.encrypt(data) for data in domain]
+            self.assertEqual(sorted(obfuscated), domain)
+            self.assertEqual([cipher.decrypt(o) for o in obfuscated], domain)
+
+    def test_many(self):
+        cipher = RadixCipher(SHA_256, "some-32-byte-long-key-to-be-safe", 10)
+        data = ["123", "4111111111111111", "", "0", "987"]
+        found = cipher.encrypt_many(data)
+        self.assertEqual(found, [cipher.encrypt(d) for d in data])
+        self.assertEqual(cipher.decrypt_many(found), data)
+
+    def test_slots(self):
+        cipher = RadixCipher(SHA_256, "some-32-byte-long-key-to-be-safe", 10, HEX)
+        self.assertFalse(hasattr(cipher, "__dict__"))
+        with self.assertRaises(AttributeError):
+            cipher.alphabet = DIGITS
+        self.assertEqual(cipher.alphabet, HEX)
+
+        # The domains are shared and bounded whatever the number of input lengths
+        for length in range(1, 600):
+            cipher.decrypt(cipher.encrypt("a" * length))
+        self.assertLessEqual(radix._domain.cache_info().currsize, 256)
+
+    def test_invalid_character(self):
+        cipher = RadixCipher(SHA_256, "some-32-byte-long-key-to-be-safe", 10)
+        with self.assertRaises(ValueError):
+            cipher.encrypt("12a4")
+
+    def test_wrong_arguments(self):
+        with self.assertRaises(AssertionError):
+            RadixCipher(SHA_256, "some-32-byte-long-key-to-be-safe", 10, "aa")
+        with self.assertRaises(AssertionError):
+            RadixCipher("unknown", "some-32-byte-long-key-to-be-safe", 10)
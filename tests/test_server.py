@@ -0,0 +1,115 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+from unittest import TestCase
+
+from feistel import Cipher, FPECipher, SHA_256
+from feistel.client import Client, load
+from feistel.server import build_profiles, parse_address, respond, Server
+
+KEY = "some-32-byte-long-key-to-be-safe"
+
+
+class TestServer(TestCase):
+    def test_respond(self):
+        profiles = build_profiles(
+            {
+                "fpe": {"cipher": "fpe", "key": KEY, "engine": SHA_256, "rounds": 10},
+                "feistel": {"cipher": "feistel", "key": KEY},
+            }
+        )
+        self.assertEqual(
+            respond(
+                profiles,
+                b'{"id": 1, "profile": "fpe", "op": "encrypt_number", "values": [123]}',
+            ),
+            b'{"id": 1, "values": [28234]}',
+        )
+        self.assertEqual(
+            respond(
+                profiles,
+                b'{"id": 2, "profile": "feistel", "op": "encrypt", "values": ["Edgewhere"]}',
+            ),
+            (
+                '{"id": 2, "values": ["'
+                + Cipher(KEY, 10).encrypt("Edgewhere").hex()
+                + '"]}'
+            ).encode(),
+        )
+        self.assertEqual(
+            respond(
+                profiles,
+                b'{"id": 3, "profile": "other", "op": "encrypt", "values": []}',
+            ),
+            b'{"id": 3, "error": "unknown profile"}',
+        )
+
+        # The whole batch goes through the batch methods of the cipher
+        calls = []
+
+        class CountingFPECipher(FPECipher):
+            def encrypt_many(self, data):
+                calls.append("encrypt_many")
+                return super().encrypt_many(data)
+
+            def encrypt_numbers(self, numbers):
+                calls.append("encrypt_numbers")
+                return super().encrypt_numbers(numbers)
+
+        profiles["fpe"] = CountingFPECipher(SHA_256, KEY, 10)
+        self.assertEqual(
+            respond(
+                profiles,
+                b'{"id": 4, "profile": "fpe", "op": "encrypt_number", "values": [123, 0]}',
+            ),
+            b'{"id": 4, "values": [28234, 0]}',
+        )
+        fpe = FPECipher(SHA_256, KEY, 10)
+        self.assertEqual(
+            respond(
+                profiles,
+                b'{"id": 5, "profile": "fpe", "op": "encrypt", "values": ["a", "b"]}',
+            ),
+            json.dumps(
+                {"id": 5, "values": fpe.encrypt_many(["a", "b"])}, ensure_ascii=False
+            ).encode(),
+        )
+        self.assertEqual(calls, ["encrypt_numbers", "encrypt_many"])
+        self.assertEqual(parse_address("unix:/tmp/feistel.sock"), "/tmp/feistel.sock")
+        self.assertEqual(parse_address(":8000"), ("localhost", 8000))
+
+    def test_client(self):
+        cipher = FPECipher(SHA_256, KEY, 10)
+        with tempfile.TemporaryDirectory() as tmp:
+            address = "unix:" + os.path.join(tmp, "feistel.sock")
+            server = Server({"users": cipher}, workers=0)
+            loop = asyncio.new_event_loop()
+            loop.run_until_complete(server.start(address))
+            thread = threading.Thread(target=loop.run_forever)
+            thread.start()
+            try:
+                with Client(address) as client:
+                    values = ["Edgewhere", "Cyril", "Dever"]
+                    obfuscated = client.encrypt("users", values)
+                    self.assertEqual(obfuscated, cipher.encrypt_many(values))
+                    results = client.pipeline(
+                        [
+                            ("users", "decrypt", obfuscated),
+                            ("users", "encrypt_number", [123, 0]),
+                        ]
+                    )
+                    self.assertEqual(results, [values, [28234, 0]])
+                    with self.assertRaises(Exception):
+                        client.call("users", "unknown", values)
+
+                report = load(
+                    address, "users", batch_size=10, connections=2, duration=0.2
+                )
+                self.assertGreater(report["requests"], 0)
+            finally:
+                asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+                loop.call_soon_threadsafe(loop.stop)
+                thread.join()
+                loop.close()
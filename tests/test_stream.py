@@ -0,0 +1,52 @@
+from io import StringIO
+from unittest import TestCase
+
+from feistel import Cipher, FPECipher, SHA_256
+from feistel.stream import ColumnObfuscator, obfuscate_csv, obfuscate_jsonl
+
+
+class TestStream(TestCase):
+    def test_csv(self):
+        cipher = FPECipher(SHA_256, "some-32-byte-long-key-to-be-safe", 128)
+        source = StringIO("id,name,amount\r\n1,Edgewhere,00123\r\n2,,42\r\n")
+        sink = StringIO()
+        with ColumnObfuscator(cipher, ["name"], ["amount"]) as obfuscator:
+            count = obfuscate_csv(obfuscator, source, sink)
+        self.assertEqual(count, 2)
+        self.assertEqual(
+            sink.getvalue().splitlines()[1],
+            "1," + cipher.encrypt("Edgewhere") + ",24359",
+        )
+
+        deobfuscated = StringIO()
+        with ColumnObfuscator(cipher, ["name"], ["amount"], decrypt=True) as obfuscator:
+            obfuscate_csv(obfuscator, StringIO(sink.getvalue()), deobfuscated)
+        self.assertEqual(
+            deobfuscated.getvalue(),
+            "id,name,amount\r\n1,Edgewhere,00123\r\n2,,00042\r\n",
+        )
+
+        with self.assertRaises(Exception):
+            obfuscate_csv(
+                ColumnObfuscator(cipher, ["unknown"]), StringIO("a\r\n1\r\n"), sink
+            )
+
+    def test_jsonl(self):
+        cipher = Cipher("some-32-byte-long-key-to-be-safe", 10)
+        source = StringIO('{"a": "Edgewhere", "b": 1}\n{"b": 2}\n')
+        sink = StringIO()
+        with ColumnObfuscator(cipher, ["a"], chunk_size=1) as obfuscator:
+            count = obfuscate_jsonl(obfuscator, source, sink)
+        self.assertEqual(count, 2)
+        self.assertEqual(
+            sink.getvalue(),
+            '{"a": "' + cipher.encrypt("Edgewhere").hex() + '", "b": 1}\n{"b": 2}\n',
+        )
+
+        deobfuscated = StringIO()
+        with ColumnObfuscator(cipher, ["a"], decrypt=True, workers=2) as obfuscator:
+            obfuscate_jsonl(obfuscator, StringIO(sink.getvalue()), deobfuscated)
+        self.assertEqual(deobfuscated.getvalue(), source.getvalue())
+
+        with self.assertRaises(Exception):
+            ColumnObfuscator(cipher, [], ["b"])
@@ -1,22 +1,36 @@
+import hmac
+import sys
 from unittest import TestCase
+from unittest.mock import patch
 
 
 from feistel.utils import (
     add,
+    AES_PRF,
     base256_char_at,
     BLAKE2B,
+    CHARSET,
     extract,
     H,
+    hasher,
     hex2Readable,
+    HMAC_SHA_256,
     index_of_base256,
+    is_available_engine,
     KECCAK,
+    KeySchedule,
     pad,
     readable2bytearray,
     readable2hex,
+    readables2bytearrays,
+    register_engine,
+    RoundFunction,
     SHA_256,
     SHA_3,
+    SHAKE_128,
     split,
     to_base256_readable,
+    to_base256_readables,
     unpad,
     xor,
 )
@@ -38,6 +52,18 @@ class TestUtilsBase259(TestCase):
         hex = hex2Readable("2a5d07024f5a501409")
         self.assertEqual(hex, found)
 
+    def test_readables(self):
+        items = [bytearray([42, 93, 7, 2, 79, 90, 80, 20, 9]), bytearray(range(256))]
+        readables = to_base256_readables(items)
+        self.assertEqual(readables[0], "K¡(#q|r5*")
+        self.assertEqual(readables[1], CHARSET[:256])
+        self.assertEqual(readables2bytearrays(readables), items)
+
+        with self.assertRaises(ValueError):
+            readable2bytearray("K¡(#q_r5*")
+        with self.assertRaises(ValueError):
+            index_of_base256(" ")
+
 
 class TestUtilsHash(TestCase):
     def test_hashes(self):
@@ -58,6 +84,71 @@ class TestUtilsHash(TestCase):
         sha_3 = H(data, SHA_3).hex()
         self.assertEqual(sha_3, expected)
 
+    def test_hasher(self):
+        for engine in [BLAKE2B, KECCAK, SHA_256, SHA_3]:
+            fn = hasher(engine)
+            for data in [b"", b"Edgewhere", bytearray(b"Edgewhere" * 50)]:
+                self.assertEqual(fn(data), H(data, engine))
+            self.assertEqual(fn(memoryview(b"Edgewhere")), H(b"Edgewhere", engine))
+
+        with self.assertRaises(Exception):
+            hasher("md5")
+
+    def test_keccak_fallback(self):
+        # The module is shadowed by the `hash()` function in the package
+        module = sys.modules["feistel.utils.hash"]
+
+        expected = "ac501ee78bc9b9429f6b923953946606b260a8de141eb253567342b678bc5f10"
+        for error in [ImportError, AttributeError, TypeError]:
+            # Internals of pycryptodome renamed or changed
+            with patch.object(module, "_raw_keccak", side_effect=error):
+                keccak = module._load_keccak()
+            self.assertEqual(keccak(b"Edgewhere").hex(), expected)
+        with patch.object(module, "_raw_keccak", return_value=lambda msg: b"wrong"):
+            self.assertEqual(module._load_keccak()(b"Edgewhere").hex(), expected)
+
+    def test_round_function(self):
+        fn = RoundFunction(HMAC_SHA_256, "key")
+        self.assertEqual(fn.output_size, 32)
+        self.assertEqual(
+            fn(b"Edgewhere", 1, 4),
+            hmac.digest(b"key", b"\x00\x00\x00\x01\x00\x00\x00\x00Edgewhere", "sha256")[
+                :4
+            ],
+        )
+        for engine in [AES_PRF, HMAC_SHA_256, SHAKE_128]:
+            fn = RoundFunction(engine, "key")
+            long = fn(memoryview(b"Edgewhere"), 3, 100)
+            self.assertEqual(len(long), 100)
+            self.assertEqual(long[:7], fn(b"Edgewhere", 3, 7))
+            self.assertNotEqual(fn(b"Edgewhere", 2, 7), fn(b"Edgewhere", 3, 7))
+
+        register_engine("xor-test", lambda key: lambda msg: bytes(32), 32)
+        self.assertTrue(is_available_engine("xor-test"))
+        self.assertEqual(RoundFunction("xor-test", "key")(b"ab", 0, 2), b"\x00\x00")
+        with self.assertRaises(Exception):
+            register_engine(SHA_256, lambda key: lambda msg: b"", 32)
+        with self.assertRaises(Exception):
+            RoundFunction(SHA_256, "key")
+
+
+class TestUtilsSchedule(TestCase):
+    def test_key_schedule(self):
+        schedule = KeySchedule(["This is a test"], 3)
+        self.assertEqual(
+            schedule.strings(24),
+            tuple(extract("This is a test", idx, 24) for idx in range(3)),
+        )
+        self.assertEqual(schedule.bytes(4), (b"This", b"his ", b"is i"))
+
+        custom = KeySchedule(["abcd", "efgh", "ijkl"], 3)
+        self.assertEqual(custom.strings(2), ("ab", "fg", "kl"))
+
+        bounded = KeySchedule(["This is a test"], 3, max_size=2)
+        for length in range(1, 10):
+            bounded.bytes(length)
+        self.assertTrue(len(bounded._bytes) <= 2)
+
 
 class TestUtilsStrings(TestCase):
     def test_add(self):
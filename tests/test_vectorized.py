@@ -0,0 +1,62 @@
+from unittest import TestCase, skipUnless
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from feistel import FPECipher, BLAKE2B, SHA_256
+
+
+@skipUnless(np, "numpy is not installed")
+class TestVectorizedFPECipher(TestCase):
+    def test_array(self):
+        from feistel.vectorized import VectorizedFPECipher
+
+        for engine in [SHA_256, BLAKE2B]:
+            for rounds in [10, 11]:
+                key = "8ed9dcc1701c064f0fd7ae235f15143f989920e0ee9658bb7882c8d7d5f05692"
+                cipher = FPECipher(engine, key, rounds)
+                vectorized = VectorizedFPECipher(engine, key, rounds)
+                for width in [1, 2, 9, 16]:
+                    records = np.random.randint(0, 256, (20, width), dtype=np.uint8)
+                    obfuscated = vectorized.encrypt_array(records)
+                    for record, found in zip(records, obfuscated):
+                        expected = cipher.encrypt_bytes(bytearray(record.tobytes()))
+                        self.assertEqual(found.tobytes(), bytes(expected))
+
+                    deobfuscated = vectorized.decrypt_array(obfuscated)
+                    for record, found in zip(obfuscated, deobfuscated):
+                        expected = cipher.decrypt_bytes(bytearray(record.tobytes()))
+                        self.assertEqual(
+                            int.from_bytes(found.tobytes(), "big"),
+                            int.from_bytes(expected, "big"),
+                        )
+
+        vectorized = VectorizedFPECipher(
+            SHA_256,
+            "8ed9dcc1701c064f0fd7ae235f15143f989920e0ee9658bb7882c8d7d5f05692",
+            10,
+        )
+        found = vectorized.encrypt_array(np.frombuffer(b"Edgewhere", np.uint8)[None])
+        self.assertEqual(found.tobytes().hex(), "2a5d07024f5a501409")
+
+    def test_number_array(self):
+        from feistel.vectorized import VectorizedFPECipher
+
+        cipher = VectorizedFPECipher(SHA_256, "some-32-byte-long-key-to-be-safe", 128)
+        numbers = np.array(
+            [123456789, 0, 123, 18446744073709551615, 100, 1403], dtype=np.uint64
+        )
+        obfuscated = cipher.encrypt_number_array(numbers)
+        self.assertEqual(
+            obfuscated.tolist(),
+            [22780178, 0, 24359, 17630367666640955566]
+            + [cipher.encrypt_number(100), cipher.encrypt_number(1403)],
+        )
+        self.assertEqual(
+            cipher.decrypt_number_array(obfuscated).tolist(), numbers.tolist()
+        )
+
+        with self.assertRaises(OverflowError):
+            cipher.encrypt_number_array(np.array([256], dtype=np.uint64))